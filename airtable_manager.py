@@ -1,32 +1,100 @@
+import random
+import threading
+import time
 from pyairtable import Api
+from requests.exceptions import ConnectionError, HTTPError, Timeout
+from base_sink import BaseSink
 from config import Config
 from constants import AirTableConstants
 from log_handler import logger  # <-- Import logger
+from metrics import metrics
+from product_cache import ProductCache
+from typing import Callable, List, Optional
 
 
 class AirTableManager:
-    def __init__(self):
-        self.api = Api(api_key=Config.AIRTABLE_API_KEY)
+    def __init__(self, rate_limit: float = Config.AIRTABLE_RATE_LIMIT):
+        # Retries are handled by request_with_retry so they can honour the rate limiter.
+        self.rate_limiter = TokenBucket(rate=rate_limit)
+        self.api = Api(
+            api_key=Config.AIRTABLE_API_KEY,
+            retry_strategy=False,
+            endpoint_url=Config.AIRTABLE_ENDPOINT_URL,
+        )
         self.base_id = Config.AIRTABLE_BASE_ID
-
-    def upsert_data(self, *, data):
-        logger.info("Upserting records into Air Table.")
-        table = self.api.table(
+        self.table = self.api.table(
             base_id=self.base_id, table_name=AirTableConstants.TABLE_NAME.value
         )
-        table.batch_upsert(records=[dict(fields=data)], key_fields=["product id"])
-        logger.info("Records Upserted Successfully.")
+        # Airtable rejects unknown columns, so new record fields are opt-in.
+        self.fields = [
+            field.strip()
+            for field in Config.AIRTABLE_FIELDS.split(",")
+            if field.strip()
+        ]
+
+    def request_with_retry(self, request: Callable):
+        """
+        Runs an Airtable request, retrying 429 and 5xx responses with backoff.
+
+        Every attempt, retries included, first takes a token from the rate
+        limiter, so retries never push the client over Airtable's request rate.
+
+        Args:
+            request (Callable): A zero-argument callable performing the request.
+
+        Returns:
+            The value returned by the request.
+        """
+        max_retries = AirTableConstants.MAX_RETRIES.value
+        for attempt in range(max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                return request()
+            except (HTTPError, ConnectionError, Timeout) as err:
+                status = getattr(getattr(err, "response", None), "status_code", None)
+                retry_statuses = AirTableConstants.RETRY_STATUSES.value
+                retryable = status is None or status in retry_statuses
+                if not retryable or attempt == max_retries:
+                    raise
+                delay = AirTableConstants.BACKOFF_SECONDS.value * 2**attempt
+                delay += random.uniform(0, delay / 2)
+                metrics.upsert_retries.inc()
+                logger.warning(
+                    f"Airtable request failed ({status or err}), retrying in {delay:.2f}s."
+                )
+                time.sleep(delay)
+
+    def upsert_data(self, *, data):
+        logger.debug("Upserting records into Air Table.")
+        self.batch_upsert(records=[data])
+        logger.debug("Records Upserted Successfully.")
+
+    def batch_upsert(self, *, records: List[dict]) -> None:
+        """
+        Upserts up to one Airtable batch of records keyed on 'product id'.
+
+        Args:
+            records (List[dict]): The field dicts to upsert.
+        """
+        with metrics.timed("upsert"):
+            self.request_with_retry(
+                lambda: self.table.batch_upsert(
+                    records=[
+                        dict(fields={k: data[k] for k in self.fields if k in data})
+                        for data in records
+                    ],
+                    key_fields=["product id"],
+                )
+            )
+        metrics.upserted.inc(len(records))
 
     def fetch_data(self, product_price):
         """
         Fetch all records where 'product price' matches the given value.
         """
         try:
-            table = self.api.table(
-                base_id=self.base_id, table_name=AirTableConstants.TABLE_NAME.value
-            )
             formula = f"{{product price}} = '{product_price}'"
-            records = table.all(formula=formula)
+            records = self.request_with_retry(lambda: self.table.all(formula=formula))
             logger.info(
                 f"Fetched {len(records)} records for product price: {product_price}"
             )
@@ -41,11 +109,10 @@ class AirTableManager:
         Returns the fields dict or None if not found.
         """
         try:
-            table = self.api.table(
-                base_id=self.base_id, table_name=AirTableConstants.TABLE_NAME.value
-            )
             formula = f"{{product price}} = '{product_price}'"
-            records = table.all(formula=formula, max_records=1)
+            records = self.request_with_retry(
+                lambda: self.table.all(formula=formula, max_records=1)
+            )
             if records:
                 logger.info(f"Fetched one record for product price: {product_price}")
                 return records[0]["fields"]
@@ -56,6 +123,175 @@ class AirTableManager:
             return None
 
 
+class TokenBucket:
+    """
+    A thread-safe token bucket limiting how many requests start per second.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available and consumes it.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class BufferedAirTableWriter(BaseSink):
+    """
+    Collects records and upserts them to Airtable in rate-limited batches.
+
+    Full batches are flushed by a background thread as soon as they fill up,
+    partial ones after ``flush_interval`` seconds; ``close`` flushes the rest.
+    With a product cache, unchanged records are dropped on ``add`` and the
+    cache is updated once their batch has been written.
+    """
+
+    name = "airtable"
+
+    def __init__(
+        self,
+        manager: Optional[AirTableManager] = None,
+        batch_size: int = AirTableConstants.BATCH_SIZE.value,
+        flush_interval: float = Config.AIRTABLE_FLUSH_INTERVAL,
+        rate_limit: float = Config.AIRTABLE_RATE_LIMIT,
+        product_cache: Optional[ProductCache] = None,
+    ) -> None:
+        self.manager = manager or AirTableManager(rate_limit=rate_limit)
+        if product_cache is None and Config.PRODUCT_CACHE_PATH:
+            product_cache = ProductCache()
+        self.product_cache = product_cache
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer: List[dict] = []
+        self.condition = threading.Condition()
+        self.send_lock = threading.Lock()
+        self.closed = False
+        self.written = 0
+        self.failed = 0
+        self.collapsed = 0
+        self.flush_thread = threading.Thread(
+            target=self.run, name="airtable-flush", daemon=True
+        )
+        self.flush_thread.start()
+
+    def add(self, data: dict) -> bool:
+        """
+        Queues a validated record for upsert unless it is unchanged.
+
+        Args:
+            data (dict): The record fields keyed by Airtable column name.
+
+        Returns:
+            bool: True if the record was queued, False if it was skipped.
+        """
+        if self.product_cache and not self.product_cache.is_changed(data):
+            return False
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Cannot add records to a closed Airtable writer.")
+            self.buffer.append(data)
+            if len(self.buffer) >= self.batch_size:
+                self.condition.notify()
+        return True
+
+    def take_batches(self, drain: bool) -> List[List[dict]]:
+        """
+        Removes full batches (or everything, when draining) from the buffer.
+
+        The buffer is first collapsed by product id, keeping the last record of
+        each product, since Airtable rejects an upsert that repeats a merge key.
+        Must be called with ``self.condition`` held.
+        """
+        latest = {record["product id"]: record for record in self.buffer}
+        if len(latest) < len(self.buffer):
+            self.collapsed += len(self.buffer) - len(latest)
+            self.buffer = list(latest.values())
+        batches = []
+        while len(self.buffer) >= self.batch_size or (drain and self.buffer):
+            batches.append(self.buffer[: self.batch_size])
+            del self.buffer[: self.batch_size]
+        return batches
+
+    def send(self, batches: List[List[dict]]) -> None:
+        """
+        Upserts the given batches one request at a time; the manager rate-limits
+        every request.
+        """
+        with self.send_lock:
+            for batch in batches:
+                try:
+                    self.manager.batch_upsert(records=batch)
+                    self.written += len(batch)
+                    if self.product_cache:
+                        self.product_cache.remember(batch)
+                    logger.debug("Upserted a batch of {} records.", len(batch))
+                except Exception as err:
+                    self.failed += len(batch)
+                    logger.error(f"Error while upserting {len(batch)} records: {err}")
+                    if self.product_cache:
+                        self.product_cache.forget(batch)
+
+    def run(self) -> None:
+        """
+        Background loop flushing full batches eagerly and partial ones periodically.
+        """
+        while True:
+            with self.condition:
+                if len(self.buffer) < self.batch_size and not self.closed:
+                    self.condition.wait(timeout=self.flush_interval)
+                if self.closed:
+                    return
+                batches = self.take_batches(drain=len(self.buffer) < self.batch_size)
+            if batches:
+                self.send(batches)
+
+    def flush(self) -> None:
+        """
+        Upserts everything currently buffered, blocking until it is sent.
+        """
+        with self.condition:
+            batches = self.take_batches(drain=True)
+        if batches:
+            self.send(batches)
+
+    def close(self) -> None:
+        """
+        Stops the background thread and flushes the remaining records.
+        """
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        self.flush_thread.join()
+        self.flush()
+        skipped = self.product_cache.skipped if self.product_cache else 0
+        logger.info(
+            f"Airtable writer closed: {self.written} records upserted, "
+            f"{skipped} unchanged skipped, {self.collapsed} duplicates collapsed, "
+            f"{self.failed} failed."
+        )
+        if self.product_cache:
+            self.product_cache.close()
+
+
 #### Example Usage #####
 if __name__ == "__main__":
     ob = AirTableManager()
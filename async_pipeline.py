@@ -0,0 +1,407 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from card_parser import CardParser
+from complete_carwler import AmazonCrawler
+from config import Config
+from constants import AmazonRequestConstants
+from crawl_state import CrawlStateStore, open_crawl_state
+from detail_crawler import DetailCrawler
+from lxml import etree
+from driver_pool import DriverPool
+from log_handler import logger
+from metrics import metrics
+from models import validate_records
+from normalization import normalize_records
+from page_classifier import PageBlockedError
+from sinks import build_sink, close_sink
+from typing import List, Optional, Tuple
+
+# A parsed results page: its category, number, document and next-page flag.
+ParsedPage = Tuple[str, int, etree._Element, bool]
+
+
+class PageCheckpoint:
+    """
+    A parsed results page on its way through the pipeline.
+
+    The page is checkpointed in the crawl state once the sink has accepted
+    every valid record of it; ``pending`` counts the records still in flight.
+    """
+
+    def __init__(
+        self, category: str, page_number: int, product_keys: List[str], has_next: bool
+    ) -> None:
+        self.category = category
+        self.page_number = page_number
+        self.product_keys = product_keys
+        self.has_next = has_next
+        self.pending = 0
+        self.failed = False
+
+
+class AsyncCrawlPipeline:
+    """
+    Runs fetching, parsing, validation and sinking as overlapping asyncio stages.
+
+    Stages are connected by bounded queues, so a slow stage applies
+    backpressure to the ones before it, and each stage runs a fixed number of
+    worker tasks. Every fetch worker owns an AmazonCrawler whose blocking
+    driver or HTTP calls run on a dedicated thread, so page N+1 loads while
+    page N is still being validated and written.
+    """
+
+    def __init__(
+        self,
+        fetch_workers: int = Config.PIPELINE_FETCH_WORKERS,
+        parse_workers: int = Config.PIPELINE_PARSE_WORKERS,
+        validate_workers: int = Config.PIPELINE_VALIDATE_WORKERS,
+        sink_workers: int = Config.PIPELINE_SINK_WORKERS,
+        queue_size: int = Config.PIPELINE_QUEUE_SIZE,
+        record_queue_size: int = Config.PIPELINE_RECORD_QUEUE_SIZE,
+        driver_pool: Optional[DriverPool] = None,
+        crawl_state: Optional[CrawlStateStore] = None,
+    ) -> None:
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = max(1, parse_workers)
+        self.validate_workers = max(1, validate_workers)
+        self.sink_workers = max(1, sink_workers)
+        self.queue_size = queue_size
+        self.record_queue_size = record_queue_size
+        self.driver_pool = driver_pool
+        self.crawl_state = crawl_state
+        self.sink = build_sink()
+        self.card_parser = CardParser()
+        self.detail_crawler: Optional[DetailCrawler] = None
+        if Config.DETAIL_MODE:
+            if Config.DETAIL_MODE == "tabs":
+                logger.warning(
+                    "The pipeline has no driver of its own for detail tabs; "
+                    "fetching details over HTTP instead."
+                )
+            self.detail_crawler = DetailCrawler(mode="http")
+        self.pages = 0
+        self.records = 0
+        self.invalid = 0
+        self.blocked: List[str] = []
+        self.failed: List[str] = []
+
+    def fetch_page(
+        self, crawler: AmazonCrawler, category: str, page_number: int
+    ) -> Optional[Tuple[etree._Element, bool]]:
+        """
+        Fetches and parses one results page on the fetch worker's thread, so
+        the event loop never parses HTML and every page is parsed only once.
+
+        Args:
+            crawler (AmazonCrawler): The fetch worker's crawler.
+            category (str): The search term of the category.
+            page_number (int): The 1-based results page number.
+
+        Returns:
+            Optional[Tuple[etree._Element, bool]]: The parsed page and whether it
+            links to a next page, or None if the page has no product cards.
+        """
+        page_source = crawler.fetch_search_page(category, page_number)
+        if page_source is None:
+            return None
+        document = self.card_parser.load_document(page_source)
+        return document, self.card_parser.has_next_page(document)
+
+    async def fetch_stage(
+        self,
+        crawler: AmazonCrawler,
+        categories: "asyncio.Queue[str]",
+        pages: "asyncio.Queue[ParsedPage]",
+    ) -> None:
+        """
+        Pulls categories and pushes each of their result pages, parsed.
+
+        A category whose page fails to load is skipped, and left unfinished, so
+        the other categories still get crawled.
+        """
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="fetch") as executor:
+            try:
+                started = await loop.run_in_executor(executor, crawler.start_session)
+            except Exception as err:
+                logger.error(f"Error while starting a fetch worker's session: {err}")
+                metrics.stage_errors.inc(stage="fetch")
+                started = False
+            if not started:
+                logger.error("Fetch worker could not start its session.")
+                return
+            try:
+                crawled = False
+                while not categories.empty():
+                    category = categories.get_nowait()
+                    if crawled:
+                        # Drop what the previous category left in the browser.
+                        await loop.run_in_executor(
+                            executor, crawler.try_release_memory
+                        )
+                    crawled = True
+                    page_number = 1
+                    if self.crawl_state:
+                        page_number = await asyncio.to_thread(
+                            self.crawl_state.get_next_page, category
+                        )
+                        if page_number is None:
+                            continue
+                    while True:
+                        try:
+                            page = await loop.run_in_executor(
+                                executor,
+                                self.fetch_page,
+                                crawler,
+                                category,
+                                page_number,
+                            )
+                        except PageBlockedError as err:
+                            logger.error(f"Skipping the rest of {category}: {err}")
+                            self.blocked.append(category)
+                            break
+                        except Exception as err:
+                            logger.error(
+                                f"Error while fetching page {page_number} of "
+                                f"{category}, skipping the rest of it: {err}"
+                            )
+                            metrics.stage_errors.inc(stage="fetch")
+                            self.failed.append(category)
+                            break
+                        if page is None:
+                            logger.info(f"No more pages for category: {category}")
+                            if self.crawl_state:
+                                await asyncio.to_thread(
+                                    self.crawl_state.finish_category,
+                                    category,
+                                    page_number,
+                                )
+                            break
+                        document, has_next = page
+                        await pages.put((category, page_number, document, has_next))
+                        if not has_next:
+                            break
+                        page_number += 1
+            finally:
+                await loop.run_in_executor(executor, crawler.close)
+
+    async def parse_stage(
+        self,
+        pages: "asyncio.Queue[ParsedPage]",
+        products: "asyncio.Queue[Tuple[List[dict], PageCheckpoint]]",
+    ) -> None:
+        """
+        Extracts the product cards of parsed result pages as batches of raw
+        product dicts.
+        """
+        while True:
+            category, page_number, document, has_next = await pages.get()
+            try:
+                with metrics.timed("parse_page"):
+                    parsed = await asyncio.to_thread(
+                        self.card_parser.parse_cards, document
+                    )
+                    normalize_records(parsed)
+                metrics.cards.inc(len(parsed))
+                logger.info(
+                    f"Parsed {len(parsed)} products from page {page_number} of {category}."
+                )
+                self.pages += 1
+                page = PageCheckpoint(
+                    category,
+                    page_number,
+                    [extracted_data["Product_id"] for extracted_data in parsed],
+                    has_next,
+                )
+                await products.put((parsed, page))
+            except Exception as err:
+                logger.error(
+                    f"Error while parsing page {page_number} of {category}: {err}"
+                )
+                metrics.stage_errors.inc(stage="parse")
+            finally:
+                pages.task_done()
+
+    async def validate_stage(
+        self,
+        products: "asyncio.Queue[Tuple[List[dict], PageCheckpoint]]",
+        records: "asyncio.Queue[Tuple[dict, PageCheckpoint]]",
+    ) -> None:
+        """
+        Validates each page's products in one batch, keyed by sink column name,
+        after enriching them from their detail pages if that stage is on.
+        """
+        while True:
+            batch, page = await products.get()
+            try:
+                if self.detail_crawler:
+                    await asyncio.to_thread(self.detail_crawler.enrich, batch)
+                with metrics.timed("validate"):
+                    valid, errors = validate_records(batch)
+                for error in errors:
+                    logger.error("Error while validating the data: {}", error)
+                metrics.validation_failures.inc(len(errors))
+                self.invalid += len(errors)
+                page.pending = len(valid)
+                if not valid:
+                    await self.checkpoint(page)
+                for data_dict in valid:
+                    await records.put((data_dict, page))
+            except Exception as err:
+                page.failed = True
+                logger.error(f"Error while validating a page of products: {err}")
+                metrics.stage_errors.inc(stage="validate")
+            finally:
+                products.task_done()
+
+    async def sink_stage(
+        self, records: "asyncio.Queue[Tuple[dict, PageCheckpoint]]"
+    ) -> None:
+        """
+        Hands validated records to the output sink and checkpoints each page
+        once all of its records were accepted.
+        """
+        while True:
+            data_dict, page = await records.get()
+            try:
+                await asyncio.to_thread(self.sink.add, data_dict)
+                self.records += 1
+                page.pending -= 1
+                if page.pending == 0:
+                    await self.checkpoint(page)
+            except Exception as err:
+                page.failed = True
+                logger.error(f"Error while sinking a record: {err}")
+                metrics.stage_errors.inc(stage="sink")
+            finally:
+                records.task_done()
+
+    async def checkpoint(self, page: PageCheckpoint) -> None:
+        """
+        Records a page as crawled, unless one of its records was lost on the way.
+        """
+        if not self.crawl_state or page.failed:
+            return
+        await asyncio.to_thread(
+            self.crawl_state.complete_page,
+            page.category,
+            page.page_number,
+            page.product_keys,
+            page.has_next,
+        )
+
+    async def run(self, categories: List[str]) -> bool:
+        """
+        Crawls the given categories through the pipeline.
+
+        Args:
+            categories (List[str]): The categories to crawl.
+
+        Returns:
+            bool: True once every stage has drained, False if a category was
+            left unfinished because it stayed blocked or failed to load, or if
+            the sink failed to write some records.
+        """
+        if not categories:
+            return True
+        category_queue: "asyncio.Queue[str]" = asyncio.Queue()
+        for category in categories:
+            category_queue.put_nowait(category)
+        pages: "asyncio.Queue[ParsedPage]" = asyncio.Queue(self.queue_size)
+        products: "asyncio.Queue[Tuple[List[dict], PageCheckpoint]]" = asyncio.Queue(
+            self.queue_size
+        )
+        records: "asyncio.Queue[Tuple[dict, PageCheckpoint]]" = asyncio.Queue(
+            self.record_queue_size
+        )
+
+        crawlers = [
+            AmazonCrawler(
+                sink=self.sink,
+                driver_pool=self.driver_pool,
+                crawl_state=self.crawl_state,
+            )
+            for _ in range(min(self.fetch_workers, len(categories)))
+        ]
+        stages = [
+            [
+                asyncio.create_task(self.parse_stage(pages, products))
+                for _ in range(self.parse_workers)
+            ],
+            [
+                asyncio.create_task(self.validate_stage(products, records))
+                for _ in range(self.validate_workers)
+            ],
+            [
+                asyncio.create_task(self.sink_stage(records))
+                for _ in range(self.sink_workers)
+            ],
+        ]
+        try:
+            await asyncio.gather(
+                *(self.fetch_stage(crawler, category_queue, pages) for crawler in crawlers)
+            )
+            for stage_queue, workers in zip((pages, products, records), stages):
+                await stage_queue.join()
+                for worker in workers:
+                    worker.cancel()
+        finally:
+            for workers in stages:
+                for worker in workers:
+                    worker.cancel()
+            written = await asyncio.to_thread(close_sink, self.sink)
+            if self.detail_crawler:
+                self.detail_crawler.close()
+
+        logger.info(
+            f"Pipeline finished: {self.pages} pages, {self.records} records sent, "
+            f"{self.invalid} failed validation."
+        )
+        if self.blocked:
+            logger.error(
+                f"Blocked categories left unfinished: {', '.join(self.blocked)}"
+            )
+        if self.failed:
+            logger.error(
+                f"Failed categories left unfinished: {', '.join(self.failed)}"
+            )
+        if self.blocked or self.failed or not category_queue.empty():
+            # Keep the checkpoint so the next run resumes the unfinished categories.
+            return False
+        if not written:
+            logger.error("Some records were not written, keeping the crawl state.")
+            return False
+        if self.crawl_state:
+            finished = await asyncio.to_thread(self.crawl_state.is_finished, categories)
+            if not finished:
+                logger.warning("Some categories are not recorded complete yet.")
+                return False
+            await asyncio.to_thread(self.crawl_state.reset)
+        return True
+
+
+def main(
+    workers: int = Config.PIPELINE_FETCH_WORKERS,
+    driver_pool: Optional[DriverPool] = None,
+) -> bool:
+    """
+    Runs the crawl through the asyncio pipeline.
+
+    Args:
+        workers (int): The number of concurrent page fetchers.
+        driver_pool (Optional[DriverPool]): A pool of warm sessions to borrow from.
+
+    Returns:
+        bool: True once the pipeline has drained.
+    """
+    crawl_state = open_crawl_state()
+    pipeline = AsyncCrawlPipeline(
+        fetch_workers=workers, driver_pool=driver_pool, crawl_state=crawl_state
+    )
+    try:
+        return asyncio.run(
+            pipeline.run(AmazonRequestConstants.categories_to_process.value)
+        )
+    finally:
+        if crawl_state:
+            crawl_state.close()
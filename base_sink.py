@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+
+
+class BaseSink(ABC):
+    """
+    Where validated records go. Sinks must be safe to share between threads.
+    """
+
+    name = "base"
+    # Accepted records that could not be written; sinks that write in the
+    # background count them here.
+    failed = 0
+
+    @abstractmethod
+    def add(self, data: dict) -> bool:
+        """
+        Writes or queues one record.
+
+        Args:
+            data (dict): The record fields keyed by Airtable column name.
+
+        Returns:
+            bool: True if the record was accepted, False if it was skipped.
+        """
+
+    def flush(self) -> None:
+        """
+        Pushes buffered records to their destination.
+        """
+
+    def close(self) -> None:
+        """
+        Flushes and releases the sink.
+        """
+        self.flush()
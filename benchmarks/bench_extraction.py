@@ -0,0 +1,77 @@
+"""
+Compares the WebDriver and offline HTML extraction paths on saved result pages.
+
+Usage:
+    python benchmarks/bench_extraction.py <pages_dir> [--repeat N] [--webdriver]
+
+Every ``*.html`` file in ``pages_dir`` is parsed with ``CardParser``. With
+``--webdriver`` each page is also loaded into headless Chromium from disk and
+extracted card by card, as ``AmazonCrawler.extract_card_data`` does live.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card_parser import CardParser  # noqa: E402
+from log_handler import logger  # noqa: E402
+
+
+def bench_html(pages, repeat):
+    parser = CardParser()
+    cards = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for page_source in pages.values():
+            cards += len(parser.parse_page(page_source))
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(pages)), cards // repeat
+
+
+def bench_webdriver(paths):
+    from complete_carwler import AmazonCrawler
+    from sinks import NullSink
+
+    crawler = AmazonCrawler(sink=NullSink())
+    crawler.get_driver()
+    cards = 0
+    elapsed = 0.0
+    try:
+        for path in paths:
+            crawler.driver.get(path.resolve().as_uri())
+            started = time.perf_counter()
+            for card in crawler.collect_product_cards() or []:
+                cards += crawler.extract_card_data(card) is not None
+            elapsed += time.perf_counter() - started
+    finally:
+        crawler.close()
+    return elapsed / len(paths), cards
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("pages_dir", type=Path)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--webdriver", action="store_true")
+    args = arg_parser.parse_args()
+
+    paths = sorted(args.pages_dir.glob("*.html"))
+    if not paths:
+        logger.error(f"No saved result pages found in {args.pages_dir}")
+        return 1
+    pages = {path: path.read_text(encoding="utf-8") for path in paths}
+
+    per_page, cards = bench_html(pages, args.repeat)
+    print(f"html      : {per_page * 1000:9.2f} ms/page  {cards} cards")
+    if args.webdriver:
+        per_page, cards = bench_webdriver(paths)
+        print(f"webdriver : {per_page * 1000:9.2f} ms/page  {cards} cards")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
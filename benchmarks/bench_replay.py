@@ -0,0 +1,155 @@
+"""
+Benchmarks full crawls against recorded result pages served from localhost.
+
+Usage:
+    python benchmarks/bench_replay.py <fixture_dir> [--mode ENGINE/EXTRACTION/NAV]
+        [--sink NAMES] [--latency S] [--output FILE] [--baseline FILE]
+
+Record fixtures first with ``python replay.py record <fixture_dir>``. Every
+mode crawls all recorded categories through ``AmazonCrawler`` and reports
+pages/sec, cards/sec and p50/p95 latency per stage. With ``--baseline`` the
+run fails when a mode's pages/sec drops more than ``--tolerance`` below it.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from complete_carwler import AmazonCrawler  # noqa: E402
+from config import Config  # noqa: E402
+from log_handler import logger  # noqa: E402
+from metrics import metrics, percentile  # noqa: E402
+from replay import ReplayServer  # noqa: E402
+from sinks import build_sink  # noqa: E402
+
+# fetch engine / extraction mode / navigation mode
+DEFAULT_MODES = [
+    "http/html/url",
+    "selenium/html/url",
+    "selenium/webdriver/url",
+    "selenium/webdriver/search_box",
+]
+
+
+def run_mode(mode, categories, sink):
+    engine, extraction, navigation = mode.split("/")
+    Config.FETCH_ENGINE = engine
+    Config.EXTRACTION_MODE = extraction
+    Config.NAVIGATION_MODE = navigation
+    metrics.reset()
+
+    writer = build_sink(sink)
+    crawler = AmazonCrawler(sink=writer)
+    started = time.perf_counter()
+    try:
+        if not crawler.start_session():
+            raise RuntimeError(f"Could not start a session for {mode}")
+        for category in categories:
+            crawler.crawl_category(category)
+        writer.close()
+    finally:
+        crawler.close()
+    elapsed = time.perf_counter() - started
+
+    pages = sum(metrics.pages.values.values())
+    cards = sum(metrics.cards.values.values())
+    stages = {}
+    for key, series in metrics.stage_seconds.series.items():
+        samples = series["samples"]
+        stages[dict(key)["stage"]] = {
+            "count": series["count"],
+            "p50_ms": percentile(samples, 0.5) * 1000,
+            "p95_ms": percentile(samples, 0.95) * 1000,
+        }
+    return {
+        "seconds": elapsed,
+        "pages": pages,
+        "cards": cards,
+        "pages_per_sec": pages / elapsed,
+        "cards_per_sec": cards / elapsed,
+        "stages": stages,
+    }
+
+
+def print_result(mode, result):
+    print(
+        f"{mode:32} {result['pages_per_sec']:8.2f} pages/s "
+        f"{result['cards_per_sec']:9.1f} cards/s  "
+        f"({result['pages']} pages, {result['cards']} cards)"
+    )
+    for stage, timing in sorted(result["stages"].items()):
+        print(
+            f"    {stage:24} n={timing['count']:<5} "
+            f"p50={timing['p50_ms']:8.1f}ms  p95={timing['p95_ms']:8.1f}ms"
+        )
+
+
+def find_regressions(results, baseline, tolerance):
+    regressions = []
+    for mode, result in results.items():
+        expected = baseline.get(mode, {}).get("pages_per_sec")
+        if expected and result["pages_per_sec"] < expected * (1 - tolerance):
+            regressions.append(
+                f"{mode}: {result['pages_per_sec']:.2f} pages/s, "
+                f"baseline {expected:.2f}"
+            )
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument("fixture_dir")
+    arg_parser.add_argument(
+        "--mode", action="append", help="engine/extraction/navigation to run"
+    )
+    arg_parser.add_argument(
+        "--sink", default="null", help="comma-separated sinks, e.g. jsonl,sqlite"
+    )
+    arg_parser.add_argument("--latency", type=float, default=0)
+    arg_parser.add_argument("--output", help="write the results as JSON")
+    arg_parser.add_argument("--baseline", help="JSON results of a previous run")
+    arg_parser.add_argument("--tolerance", type=float, default=0.2)
+    args = arg_parser.parse_args()
+
+    server = ReplayServer(args.fixture_dir, latency=args.latency)
+    Config.AMAZON_BASE_URL = server.start()
+    # Offline runs must not resume or checkpoint a real crawl.
+    Config.CRAWL_STATE_PATH = ""
+    Config.PRODUCT_CACHE_PATH = ""
+    categories = server.categories
+    if not categories:
+        logger.error(f"No recorded pages found in {args.fixture_dir}")
+        return 1
+
+    results = {}
+    try:
+        for mode in args.mode or DEFAULT_MODES:
+            try:
+                results[mode] = run_mode(mode, categories, args.sink)
+            except Exception as err:
+                logger.error(f"Error while benchmarking {mode}: {err}")
+                continue
+            print_result(mode, results[mode])
+    finally:
+        server.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            regressions = find_regressions(
+                results, json.load(baseline), args.tolerance
+            )
+        for regression in regressions:
+            logger.error(f"Regression: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
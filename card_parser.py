@@ -0,0 +1,221 @@
+import re
+from lxml import etree
+from lxml import html as lxml_html
+from uuid import NAMESPACE_URL, uuid5
+from constants import XpathConstants
+from log_handler import logger
+from search_urls import amazon_url
+from typing import Callable, List, Optional, Tuple
+
+ASIN_PATTERN = re.compile(r"/(?:dp|gp/product|gp/aw/d)/([A-Z0-9]{10})")
+
+
+def get_product_key(
+    asin: Optional[str], product_url: Optional[str], product_name: Optional[str]
+) -> str:
+    """
+    Derives a stable product key: the ASIN, else a UUID5 of the URL or name.
+
+    Args:
+        asin (Optional[str]): The card's data-asin attribute.
+        product_url (Optional[str]): The absolute product URL.
+        product_name (Optional[str]): The product title.
+
+    Returns:
+        str: The same key for the same product on every run.
+    """
+    if asin and asin.strip():
+        return asin.strip()
+    if product_url:
+        match = ASIN_PATTERN.search(product_url)
+        if match:
+            return match.group(1)
+    return str(uuid5(NAMESPACE_URL, product_url or product_name or ""))
+
+
+def build_product_record(
+    product_name: Optional[str],
+    product_price: Optional[str],
+    product_rating: Optional[str],
+    image_src: Optional[str],
+    product_href: Optional[str],
+    asin: Optional[str] = None,
+    review_count: Optional[str] = None,
+) -> dict:
+    """
+    Builds the raw extracted-data dict shared by every extraction path.
+
+    Args:
+        product_name (Optional[str]): The product title.
+        product_price (Optional[str]): The displayed price.
+        product_rating (Optional[str]): The displayed rating text.
+        image_src (Optional[str]): The product image source URL.
+        product_href (Optional[str]): The product link, relative or absolute.
+        asin (Optional[str]): The card's data-asin attribute.
+        review_count (Optional[str]): The displayed number of reviews.
+
+    Returns:
+        dict: The extracted data with placeholders for missing values.
+    """
+    product_url = None
+    if product_href:
+        if not product_href.startswith("http"):
+            product_url = amazon_url(product_href)
+        else:
+            product_url = product_href
+
+    return {
+        "Product_id": get_product_key(asin, product_url, product_name),
+        "Product Name": product_name.strip()
+        if product_name
+        else "Product Name Not Found",
+        "Product Price": product_price.strip()
+        if product_price
+        else "Price not found!",
+        "Product_rating": product_rating.strip()
+        if product_rating
+        else "Product rating not found",
+        "Image_URL": image_src.strip() if image_src else "Image URL Not found.",
+        "product url": product_url.strip()
+        if product_url
+        else "product url not found.",
+        "ASIN": asin.strip() if asin and asin.strip() else None,
+        "Review_count": review_count.strip() if review_count else None,
+    }
+
+
+class CardParser:
+    """
+    Parses product cards out of a search results page without touching the
+    WebDriver, using compiled lxml XPath expressions built from XpathConstants.
+    """
+
+    def __init__(self) -> None:
+        self.product_cards = etree.XPath(XpathConstants.product_cards.value)
+        self.product_name = etree.XPath(
+            f"{XpathConstants.product_element.value}/@aria-label"
+        )
+        self.product_price = etree.XPath(XpathConstants.product_price.value)
+        self.product_rating = etree.XPath(XpathConstants.product_rating.value)
+        self.review_count = etree.XPath(XpathConstants.product_review_count.value)
+        self.image_src = etree.XPath(f"{XpathConstants.image_element.value}/@src")
+        self.product_href = etree.XPath(f"{XpathConstants.product_url.value}/@href")
+        self.product_asin = etree.XPath(f"{XpathConstants.product_asin.value}/@data-asin")
+        self.next_page = etree.XPath(XpathConstants.next_page_button.value)
+
+    @staticmethod
+    def first_text(xpath: Callable, node: etree._Element) -> Optional[str]:
+        """
+        Returns the text of the first XPath match, or None if nothing matched.
+
+        Args:
+            xpath (Callable): A compiled XPath expression.
+            node (etree._Element): The node to evaluate the expression against.
+
+        Returns:
+            Optional[str]: The matched attribute value or element text.
+        """
+        matches = xpath(node)
+        if not matches:
+            return None
+        match = matches[0]
+        if isinstance(match, str):
+            return str(match)
+        return match.text_content()
+
+    def parse_card(self, card: etree._Element) -> dict:
+        """
+        Extracts product details from a single product card node.
+
+        Args:
+            card (etree._Element): The product card node.
+
+        Returns:
+            dict: The extracted product data.
+        """
+        return build_product_record(
+            product_name=self.first_text(self.product_name, card),
+            product_price=self.first_text(self.product_price, card),
+            product_rating=self.first_text(self.product_rating, card),
+            image_src=self.first_text(self.image_src, card),
+            product_href=self.first_text(self.product_href, card),
+            asin=self.first_text(self.product_asin, card),
+            review_count=self.first_text(self.review_count, card),
+        )
+
+    def parse_results_page(self, page_source: str) -> Tuple[List[dict], bool]:
+        """
+        Parses every product card on a search results page and its pagination.
+
+        Args:
+            page_source (str): The HTML of the whole page.
+
+        Returns:
+            Tuple[List[dict], bool]: The extracted data of every card that has a
+            product name, and whether the page links to a next page.
+        """
+        try:
+            document = self.load_document(page_source)
+        except (etree.ParserError, ValueError) as err:
+            logger.error(f"Error while parsing the page source: {err}")
+            return [], False
+        return self.parse_cards(document), self.has_next_page(document)
+
+    @staticmethod
+    def load_document(page_source: str) -> etree._Element:
+        """
+        Parses the HTML of a page once, for the methods that take a document.
+
+        Args:
+            page_source (str): The HTML of the whole page.
+
+        Returns:
+            etree._Element: The root of the parsed page.
+
+        Raises:
+            etree.ParserError: If the page source is empty.
+            ValueError: If the page source cannot be parsed.
+        """
+        return lxml_html.fromstring(page_source)
+
+    def parse_cards(self, document: etree._Element) -> List[dict]:
+        """
+        Parses every product card of a parsed search results page.
+
+        Args:
+            document (etree._Element): The root of the parsed page.
+
+        Returns:
+            List[dict]: The extracted data of every card that has a product name.
+        """
+        products = []
+        for card in self.product_cards(document):
+            if not self.product_name(card):
+                # Sponsored banners and widgets share the card container.
+                continue
+            products.append(self.parse_card(card))
+        return products
+
+    def parse_page(self, page_source: str) -> List[dict]:
+        """
+        Parses every product card on a search results page.
+
+        Args:
+            page_source (str): The HTML of the whole page.
+
+        Returns:
+            List[dict]: The extracted data of every card that has a product name.
+        """
+        return self.parse_results_page(page_source)[0]
+
+    def has_next_page(self, document: etree._Element) -> bool:
+        """
+        Checks whether a parsed search results page links to a next page.
+
+        Args:
+            document (etree._Element): The root of the parsed page.
+
+        Returns:
+            bool: True if a "Next" link is present, False otherwise.
+        """
+        return bool(self.next_page(document))
@@ -1,59 +1,95 @@
+import gc
+import time
+from collections import Counter
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from constants import AmazonRequestConstants, XpathConstants
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from uuid import uuid4
-from models import ValidateData
-from airtable_manager import AirTableManager
-import time
-from selenium.webdriver.chrome.service import Service
+from models import validate_records
+from card_parser import CardParser, build_product_record
+from driver_pool import (
+    BrowserSession,
+    DriverPool,
+    clear_cookies,
+    create_driver,
+    get_all_cookies,
+    get_browser_rss,
+    get_js_heap_size,
+    get_page_transfer_size,
+    get_recycle_reason,
+    release_renderer_memory,
+    restore_cookies,
+    set_session_cookies,
+    set_user_agent,
+    wait_for_page_settled,
+)
+from config import Config
+from crawl_state import CrawlStateStore, open_crawl_state
+from detail_crawler import DetailCrawler
+from http_fetcher import HttpFetcher
+from search_urls import amazon_url, build_search_url
+from sinks import BaseSink, build_sink, close_sink
 from log_handler import logger
+from metrics import metrics
+from normalization import normalize_records, summarize_records
+from page_classifier import (
+    AdaptiveThrottle,
+    PageBlockedError,
+    PageKind,
+    classify_page,
+)
 from selenium.webdriver.remote.webelement import WebElement
 from typing import Optional, Tuple, List
 
+# The fixed pause the adaptive waits replaced, used to report the time saved.
+FIXED_PAUSE_SECONDS = 1.0
+
 
 class AmazonCrawler:
     """
     A class to encapsulate Amazon crawling and data extraction logic.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        sink: Optional[BaseSink] = None,
+        driver_pool: Optional[DriverPool] = None,
+        crawl_state: Optional[CrawlStateStore] = None,
+    ) -> None:
         self.driver: Optional[webdriver.Chrome] = None
-        self.airtable_obj = AirTableManager()
+        self.crawl_state = crawl_state
+        self.page_product_keys: List[str] = []
+        # Set when the sink rejected a record of the current page.
+        self.page_failed = False
+        self.driver_pool = driver_pool
+        self.browser_session: Optional[BrowserSession] = None
+        self.pages_loaded = 0
+        # Pages, first heap sample and pending recycle reason of the current browser.
+        self.driver_pages = 0
+        self.baseline_heap: Optional[int] = None
+        self.recycle_reason: Optional[str] = None
+        self.next_page_available = False
+        self.http_fetcher = HttpFetcher() if Config.FETCH_ENGINE == "http" else None
+        self.detail_crawler = DetailCrawler() if Config.DETAIL_MODE else None
+        self.throttle = AdaptiveThrottle()
+        self.rotations = 0
+        # Worker pools pass one shared, thread-safe sink to every crawler.
+        self.sink = sink or build_sink()
+        self.card_parser = CardParser()
 
     def get_driver(self) -> None:
         """
         Initializes the Selenium Chrome WebDriver with specified options.
         """
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.binary_location = "/usr/bin/chromium"  # Chrome browser binary
-
-        service = Service("/usr/bin/chromedriver")  # ChromeDriver binary
-        self.driver = webdriver.Chrome(service=service, options=options)
+        self.driver = create_driver()
 
     def set_cookies(self) -> None:
         """
         Sets cookies in the browser session using constants.
         """
         logger.info("Setting The Cookies.")
-        for name, value in AmazonRequestConstants.cookies.value.items():
-            self.driver.execute_cdp_cmd(
-                "Network.setCookie",
-                {
-                    "name": name,
-                    "value": value,
-                    "domain": ".amazon.com",
-                    "path": "/",
-                    "httpOnly": False,
-                    "secure": True,
-                    "sameSite": "Lax",
-                },
-            )
+        set_session_cookies(self.driver)
         logger.info("Cookies Set Successfully.")
 
     def request_home_page(self) -> bool:
@@ -64,8 +100,13 @@ class AmazonCrawler:
             bool: True if the page loaded successfully, False otherwise.
         """
         logger.info("Requesting the Home Page.")
-        self.driver.get("https://www.amazon.com")
+        self.load_url(amazon_url())
         logger.info(self.driver.title)
+        kind = classify_page(self.get_page_source() or "")
+        if kind.is_block:
+            self.throttle.record(kind)
+            logger.error(f"The home page returned a {kind.value} page.")
+            return False
         if "Amazon" in self.driver.title:
             logger.info("Request to The Home Page successful.")
             return True
@@ -108,11 +149,12 @@ class AmazonCrawler:
         """
         try:
             logger.info("Extracting the product cards.")
-            product_cards = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, XpathConstants.product_cards.value)
+            with metrics.timed("collect_product_cards"):
+                product_cards = WebDriverWait(self.driver, 10).until(
+                    EC.presence_of_all_elements_located(
+                        (By.XPATH, XpathConstants.product_cards.value)
+                    )
                 )
-            )
             if product_cards:
                 logger.info(
                     f"{len(product_cards)} product cards extracted successfully."
@@ -125,248 +167,884 @@ class AmazonCrawler:
             logger.error(f"Error while extracting the product cards: {err}")
             return None
 
-    def scroll_page(self, scroll_pause_time: float = 1.0) -> None:
+    def scroll_page(self) -> float:
         """
-        Scrolls the page down to trigger lazy loading.
+        Scrolls the page down to trigger lazy loading, waiting after each scroll
+        only until the cards and network have settled.
 
-        Args:
-            scroll_pause_time (float): Time to pause between scrolls.
+        Returns:
+            float: The seconds saved compared with fixed pauses between scrolls.
         """
         last_height = self.driver.execute_script("return document.body.scrollHeight")
 
+        waited = 0.0
+        scrolls = 0
         for _ in range(3):  # Scroll multiple times to ensure lazy-load triggers
             self.driver.execute_script(
                 "window.scrollTo(0, document.body.scrollHeight);"
             )
-            time.sleep(scroll_pause_time)
+            scrolls += 1
+            with metrics.timed("settle"):
+                waited += wait_for_page_settled(
+                    self.driver, XpathConstants.product_cards.value
+                )
             new_height = self.driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
                 break
             last_height = new_height
+        return max(0.0, scrolls * FIXED_PAUSE_SECONDS - waited)
 
-    def parse_data(self, extracted_data: dict) -> Optional[ValidateData]:
+    def extract_card_data(
+        self, card: WebElement, missing: Optional[Counter] = None
+    ) -> Optional[dict]:
         """
-        Validates and parses extracted product data into a model.
+        Extracts product details from a product card through the WebDriver.
 
         Args:
-            extracted_data (dict): The raw extracted data.
+            card (WebElement): The product card element.
+            missing (Optional[Counter]): Per-page counts of the fields cards
+                lack, logged once per page instead of a warning per card.
 
         Returns:
-            Optional[ValidateData]: The validated data model, or None if validation fails.
+            Optional[dict]: The extracted data, or None if the card has no product name.
         """
         try:
-            logger.info("Validating the data.")
-            model_item = ValidateData(
-                product_id=extracted_data["Product_id"],
-                product_name=extracted_data["Product Name"],
-                product_price=extracted_data["Product Price"],
-                product_rating=extracted_data["Product_rating"],
-                image_url=extracted_data["Image_URL"],
+            product_elem = card.find_element(
+                By.XPATH, XpathConstants.product_element.value
+            )
+            product_name = product_elem.get_attribute("aria-label")
+        except Exception as err:
+            logger.error(f"Error while finding product name: {err}")
+            return None
+
+        missing_fields = []
+        product_price = None
+        try:
+            product_price = card.find_element(
+                By.XPATH, XpathConstants.product_price.value
+            ).get_attribute("innerHTML")
+        except Exception:
+            missing_fields.append("price")
+
+        product_rating = None
+        try:
+            product_rating = card.find_element(
+                By.XPATH, XpathConstants.product_rating.value
+            ).get_attribute("innerHTML")
+        except Exception:
+            missing_fields.append("rating")
+
+        image_src = None
+        try:
+            image_element = card.find_element(
+                By.XPATH, XpathConstants.image_element.value
+            )
+            image_src = image_element.get_attribute("src")
+        except Exception:
+            missing_fields.append("image url")
+
+        product_href = None
+        try:
+            product_url_elem = card.find_element(
+                By.XPATH, XpathConstants.product_url.value
             )
-            logger.info("Data model validated successfully.")
-            return model_item
+            product_href = product_url_elem.get_attribute("href")
+        except Exception:
+            missing_fields.append("url")
+
+        asin = None
+        try:
+            asin = card.find_element(
+                By.XPATH, XpathConstants.product_asin.value
+            ).get_attribute("data-asin")
+        except Exception:
+            missing_fields.append("ASIN")
+
+        review_count = None
+        try:
+            review_count = card.find_element(
+                By.XPATH, XpathConstants.product_review_count.value
+            ).get_attribute("innerHTML")
         except Exception as err:
-            logger.error(f"Error while validating the data: {err}")
+            logger.debug("Error while finding product review count: {}", err)
+
+        if missing is not None:
+            missing.update(missing_fields)
+        elif missing_fields:
+            logger.debug("Card without {}: {}", ", ".join(missing_fields), product_name)
+        return build_product_record(
+            product_name=product_name,
+            product_price=product_price,
+            product_rating=product_rating,
+            image_src=image_src,
+            product_href=product_href,
+            asin=asin,
+            review_count=review_count,
+        )
+
+    def to_record(self, extracted_data: dict) -> Optional[dict]:
+        """
+        Validates extracted product data and keys it by sink column name.
+
+        Args:
+            extracted_data (dict): The raw extracted data.
+
+        Returns:
+            Optional[dict]: The record to upsert, or None if validation fails.
+        """
+        with metrics.timed("validate"):
+            records, errors = validate_records([extracted_data])
+        if errors:
+            metrics.validation_failures.inc()
+            logger.error("Error while validating the data: {}", errors[0])
             return None
+        logger.debug("Transformed data_dict: {}", records[0])
+        return records[0]
+
+    def process_product(self, extracted_data: dict) -> bool:
+        """
+        Validates extracted product data and queues it for the Airtable writer.
+
+        Args:
+            extracted_data (dict): The raw extracted data.
+
+        Returns:
+            bool: True if validation and upsert succeed, False otherwise.
+        """
+        data_dict = self.to_record(extracted_data)
+        if not data_dict:
+            return False
+        return self.queue_record(data_dict)
 
-    def snake_to_title(self, snake_str: str) -> str:
+    def queue_record(self, data_dict: dict) -> bool:
         """
-        Converts a snake_case string to a title case string.
+        Hands a validated record to the sink and notes it for the crawl state.
 
         Args:
-            snake_str (str): The snake_case string.
+            data_dict (dict): The record keyed by sink column name.
 
         Returns:
-            str: The title case string.
+            bool: True if the sink accepted the record, False on an error.
         """
-        return snake_str.replace("_", " ")
+        try:
+            self.sink.add(data_dict)
+            self.page_product_keys.append(data_dict["product id"])
+            logger.debug("Data extracted: {}", data_dict)
+            return True
+        except Exception as err:
+            self.page_failed = True
+            logger.error(f"Error in product details method: {err}")
+            return False
 
-    def get_product_details(self, card: WebElement) -> bool:
+    def get_product_details(
+        self, card: WebElement, missing: Optional[Counter] = None
+    ) -> bool:
         """
         Extracts product details from a product card and upserts them to Airtable.
 
         Args:
             card (WebElement): The product card element.
+            missing (Optional[Counter]): Per-page counts of missing fields.
 
         Returns:
             bool: True if extraction and upsert succeed, False otherwise.
         """
+        with metrics.timed("get_product_details"):
+            extracted_data = self.extract_card_data(card, missing)
+        if not extracted_data:
+            return False
+        return self.process_product(normalize_records([extracted_data])[0])
+
+    def get_page_source(self) -> Optional[str]:
+        """
+        Fetches the HTML of the current page in a single WebDriver round trip.
+
+        Returns:
+            Optional[str]: The page source, or None if it could not be read.
+        """
         try:
-            logger.info("Getting the product details.")
-            product_elem = card.find_element(
-                By.XPATH, XpathConstants.product_element.value
-            )
-            product_name = product_elem.get_attribute("aria-label")
+            return self.driver.page_source
+        except Exception as err:
+            logger.error(f"Error while reading the page source: {err}")
+            return None
 
-            product_price = "Price not found!"
-            try:
-                product_price = card.find_element(
-                    By.XPATH, XpathConstants.product_price.value
-                ).get_attribute("innerHTML")
-            except Exception as err:
-                logger.warning(f"Error while finding product price:{err}")
+    def process_products(self, products: List[dict]) -> int:
+        """
+        Validates and upserts products parsed from a page source.
 
-            product_rating = "Product rating not found"
-            try:
-                product_rating = card.find_element(
-                    By.XPATH, XpathConstants.product_rating.value
-                ).get_attribute("innerHTML")
-            except Exception as err:
-                logger.warning(f"Error while finding product rating:{err}")
+        Args:
+            products (List[dict]): The extracted data of every card.
 
-            image_src = ""
-            try:
-                image_element = card.find_element(
-                    By.XPATH, XpathConstants.image_element.value
-                )
-                image_src = image_element.get_attribute("src")
-            except Exception as err:
-                logger.warning(f"Error while finding product Image Url element:{err}")
+        Returns:
+            int: The number of products processed successfully.
+        """
+        metrics.cards.inc(len(products))
+        started = time.perf_counter()
+        normalize_records(products)
+        if self.detail_crawler:
+            self.fetch_details(products)
+        logger.opt(lazy=True).debug(
+            "Page stats: {}", lambda: summarize_records(products)
+        )
+        with metrics.timed("validate"):
+            records, errors = validate_records(products)
+        for error in errors:
+            logger.error("Error while validating the data: {}", error)
+        metrics.validation_failures.inc(len(errors))
+        processed = sum(self.queue_record(data_dict) for data_dict in records)
+        self.log_page_summary(len(products), processed, started)
+        return processed
 
-            product_url = "product url not found."
-            try:
-                product_url_elem = card.find_element(
-                    By.XPATH, XpathConstants.product_url.value
+    def fetch_details(self, products: List[dict]) -> None:
+        """
+        Enriches a page of products from their detail pages.
+
+        Args:
+            products (List[dict]): The normalized extracted data of the page.
+        """
+        if Config.DETAIL_MODE == "tabs":
+            self.ensure_driver()
+        try:
+            self.detail_crawler.enrich(products, driver=self.driver)
+        except Exception as err:
+            logger.error(f"Error while fetching product details: {err}")
+
+    def process_page(self, cards: List[WebElement]) -> int:
+        """
+        Extracts and upserts every product on the current results page.
+
+        In "html" extraction mode the page is pulled once and parsed offline;
+        in "webdriver" mode every card is queried element by element.
+
+        Args:
+            cards (List[WebElement]): The product cards found on the page.
+
+        Returns:
+            int: The number of products processed successfully.
+        """
+        if Config.EXTRACTION_MODE == "html":
+            page_source = self.get_page_source()
+            with metrics.timed("parse_page"):
+                products = (
+                    self.card_parser.parse_page(page_source) if page_source else []
                 )
-                product_href = product_url_elem.get_attribute("href")
-                if not product_href.startswith("http"):
-                    product_url = f"https://www.amazon.com{product_href}"
-                else:
-                    product_url = product_href
-            except Exception as err:
-                logger.warning(f"Error while finding product Url element:{err}")
-
-            extracted_data = {
-                "Product_id": str(uuid4()),
-                "Product Name": product_name.strip()
-                if product_name
-                else "Product Name Not Found",
-                "Product Price": product_price.strip()
-                if product_price
-                else "Price not found!",
-                "Product_rating": product_rating.strip()
-                if product_rating
-                else "Product rating not found",
-                "Image_URL": image_src.strip() if image_src else "Image URL Not found.",
-                "product url": product_url.strip()
-                if product_url
-                else "product url not found.",
-            }
-
-            model_item = self.parse_data(extracted_data)
-            if not model_item:
-                logger.error(f"Could not validate the model data: {model_item}")
-                return False
+            return self.process_products(products)
 
-            model_dict = model_item.model_dump()
-            data_dict = {
-                self.snake_to_title(key): value for key, value in model_dict.items()
-            }
+        missing: Counter = Counter()
+        if self.detail_crawler:
+            # Details are fetched per page, so the cards are extracted first.
+            with metrics.timed("get_product_details"):
+                products = [self.extract_card_data(card, missing) for card in cards]
+            self.log_missing_fields(missing, len(cards))
+            return self.process_products(
+                [product for product in products if product]
+            )
 
-            logger.info("Calling the upsert method...")
-            logger.debug(f"Transformed data_dict: {data_dict}")
-            self.airtable_obj.upsert_data(data=data_dict)
+        metrics.cards.inc(len(cards))
+        started = time.perf_counter()
+        processed = 0
+        for idx, card in enumerate(cards, start=1):
+            logger.debug("Processing record {} of {}", idx, len(cards))
+            processed += self.get_product_details(card, missing)
+        self.log_missing_fields(missing, len(cards))
+        self.log_page_summary(len(cards), processed, started)
+        return processed
 
-            logger.info(f"Data extracted: {extracted_data}")
-            return True
-        except Exception as err:
-            logger.error(f"Error in product details method: {err}")
-            return False
+    def log_missing_fields(self, missing: Counter, cards: int) -> None:
+        """
+        Logs how many cards of a page lacked each field, in one line.
 
+        Args:
+            missing (Counter): The number of cards missing each field.
+            cards (int): The number of cards on the page.
+        """
+        if not missing:
+            return
+        logger.info(
+            "Cards missing fields on this page (of {}): {}",
+            cards,
+            ", ".join(f"{field} {count}" for field, count in missing.most_common()),
+        )
 
-def main() -> bool:
-    """
-    Main function to orchestrate the Amazon product extraction and upsert process.
+    def log_page_summary(self, cards: int, processed: int, started: float) -> None:
+        """
+        Logs one line per page in place of the per-card lines.
 
-    Returns:
-        bool: True if the process completes successfully, False otherwise.
-    """
-    STATUS = True
-    amazon_manager = AmazonCrawler()
-    try:
-        amazon_manager.get_driver()
-        amazon_manager.set_cookies()
+        Args:
+            cards (int): The number of cards found on the page.
+            processed (int): The number of them validated and queued.
+            started (float): The ``time.perf_counter()`` value processing began at.
+        """
+        logger.info(
+            "Processed {} of {} cards in {:.2f}s ({} failed).",
+            processed,
+            cards,
+            time.perf_counter() - started,
+            cards - processed,
+        )
+
+    def start_session(self) -> bool:
+        """
+        Launches the driver, primes the cookies and opens the home page.
+
+        With a driver pool the crawler borrows an already warm session instead.
+
+        Returns:
+            bool: True if the session is ready to search, False otherwise.
+        """
+        if self.driver_pool:
+            self.browser_session = self.driver_pool.acquire()
+            self.driver = self.browser_session.driver
+            return True
+        if self.http_fetcher and Config.NAVIGATION_MODE == "url":
+            # The browser is only started if a page has to fall back to Selenium.
+            return True
+
+        self.get_driver()
+        self.set_cookies()
+        if Config.NAVIGATION_MODE == "url":
+            # Search URLs are loaded directly, the home page is never needed.
+            return True
 
-        home_page_response = amazon_manager.request_home_page()
+        home_page_response = self.request_home_page()
         if not home_page_response:
             logger.error("Home Page Request Failed.")
             return False
 
-        result = amazon_manager.get_search_field()
-        if not result:
+        if not self.get_search_field():
             logger.error("Failed to get the search field.")
             return False
-        search_field, search_button = result
+        return True
+
+    def crawl_category(self, category: str) -> int:
+        """
+        Extracts every result page of a category using the configured navigation.
+
+        Args:
+            category (str): The search term of the category.
+
+        Returns:
+            int: The number of products processed for the category.
+        """
+        try:
+            if Config.NAVIGATION_MODE == "url":
+                return self.crawl_category_by_url(category)
+            return self.crawl_category_by_search_box(category)
+        finally:
+            self.try_release_memory()
+
+    def crawl_page(self, category: str, page_number: int) -> Optional[int]:
+        """
+        Loads one search results page by URL, extracts its products and
+        checkpoints the page in the crawl state, unless the sink rejected one
+        of its records.
+
+        Args:
+            category (str): The search term of the category.
+            page_number (int): The 1-based results page number.
+
+        Returns:
+            Optional[int]: The number of products processed, or None if the page
+            has no product cards.
+        """
+        self.page_product_keys = []
+        self.page_failed = False
+        processed = self.load_and_process_page(category, page_number)
+        if self.crawl_state:
+            if processed is None:
+                self.crawl_state.finish_category(category, page_number)
+            elif self.page_failed:
+                logger.warning(
+                    f"Not checkpointing page {page_number} of {category}: "
+                    "the sink rejected some of its records."
+                )
+            else:
+                self.crawl_state.complete_page(
+                    category,
+                    page_number,
+                    self.page_product_keys,
+                    self.next_page_available,
+                )
+        return processed
 
-        categories_to_process = AmazonRequestConstants.categories_to_process.value
+    def load_and_process_page(self, category: str, page_number: int) -> Optional[int]:
+        """
+        Loads one search results page by URL and extracts its products.
+
+        Args:
+            category (str): The search term of the category.
+            page_number (int): The 1-based results page number.
+
+        Returns:
+            Optional[int]: The number of products processed, or None if the page
+            has no product cards.
+        """
+        logger.info(f"Scraping page number: {page_number} for category: {category}")
+        self.next_page_available = False
+
+        if self.http_fetcher or Config.EXTRACTION_MODE == "html":
+            page_source = self.fetch_search_page(category, page_number)
+            if page_source is None:
+                return None
+            with metrics.timed("parse_page"):
+                products, self.next_page_available = (
+                    self.card_parser.parse_results_page(page_source)
+                )
+            if not products:
+                return None
+            return self.process_products(products)
+
+        cards = self.load_results_page(build_search_url(category, page_number))
+        if not cards:
+            return None
+        processed = self.process_page(cards)
+        self.record_page()
+        self.next_page_available = self.has_next_page()
+        return processed
+
+    def fetch_search_page(self, category: str, page_number: int) -> Optional[str]:
+        """
+        Fetches the HTML of a search results page over HTTP or through the driver.
+
+        Args:
+            category (str): The search term of the category.
+            page_number (int): The 1-based results page number.
+
+        Returns:
+            Optional[str]: The page source, or None if the page has no product cards.
+        """
+        url = build_search_url(category, page_number)
+        if self.http_fetcher:
+            self.throttle.wait()
+            with metrics.timed("http_fetch"):
+                page_source = self.http_fetcher.fetch(url)
+            kind = self.http_fetcher.last_kind
+            if page_source is not None:
+                self.throttle.record(kind)
+                self.record_page(via_driver=False)
+                return page_source
+            # The browser load below records this page's outcome in the throttle.
+            if kind and kind.is_block:
+                self.http_fetcher.rotate_identity(self.next_user_agent())
+            logger.warning("Falling back to Selenium for this page.")
+            self.ensure_driver()
+
+        if not self.load_results_page(url):
+            return None
+        self.record_page()
+        return self.get_page_source()
+
+    def load_results_page(
+        self, url: str, loaded: bool = False
+    ) -> Optional[List[WebElement]]:
+        """
+        Loads a results page in the driver and waits for its product cards.
+
+        Captcha and dog pages are retried on a rotated session, up to
+        ``Config.BLOCK_MAX_RETRIES`` times, with the worker's throttle applied
+        before every load.
+
+        Args:
+            url (str): The search URL to load.
+            loaded (bool): Whether the driver already shows the page, e.g. after
+                a search-box submit; it is then only reloaded to retry a block.
+
+        Returns:
+            Optional[List[WebElement]]: The product cards, or None if the page
+            genuinely has none.
+
+        Raises:
+            PageBlockedError: If the page is still blocked after the last retry.
+        """
+        if not loaded:
+            # The page is about to be replaced, so there is no position to restore.
+            self.recycle_if_needed(restore_position=False)
+        for attempt in range(Config.BLOCK_MAX_RETRIES + 1):
+            if attempt or not loaded:
+                self.throttle.wait()
+                self.load_url(url)
+            cards = self.collect_product_cards()
+            if cards:
+                self.throttle.record(PageKind.RESULTS)
+                return cards
+            kind = classify_page(self.get_page_source() or "")
+            self.throttle.record(kind)
+            if not kind.is_block:
+                return None
+            if attempt < Config.BLOCK_MAX_RETRIES:
+                self.rotate_session(level=attempt + 1)
+        raise PageBlockedError(
+            f"{url} still blocked after {Config.BLOCK_MAX_RETRIES} session rotations"
+        )
+
+    def next_user_agent(self) -> str:
+        """
+        Picks the next user agent from the constants, round-robin per crawler.
+
+        Returns:
+            str: The user agent to rotate to.
+        """
+        self.rotations += 1
+        user_agents = AmazonRequestConstants.user_agents.value
+        return user_agents[self.rotations % len(user_agents)]
 
-        for index, category in enumerate(categories_to_process, start=1):
+    def rotate_session(self, level: int) -> None:
+        """
+        Gives the crawler a new identity after a block, escalating per retry:
+        fresh cookies first, then another user agent, then a restarted browser.
+
+        Args:
+            level (int): 1 for the first retry of a page, 2 for the second, ...
+        """
+        user_agent = self.next_user_agent()
+        if self.http_fetcher:
+            self.http_fetcher.rotate_identity(user_agent)
+        if level == 1:
+            logger.info("Rotating the session: fresh cookies.")
+            clear_cookies(self.driver)
+            return
+        if level >= 3:
+            logger.info("Rotating the session: restarting the browser.")
+            self.restart_driver()
+        else:
+            logger.info("Rotating the session: new user agent.")
+        clear_cookies(self.driver)
+        set_user_agent(self.driver, user_agent)
+
+    def restart_driver(self) -> None:
+        """
+        Replaces the browser with a fresh one, through the pool if it is pooled.
+        """
+        if self.browser_session:
+            self.browser_session = self.driver_pool.recycle(self.browser_session)
+            self.driver = self.browser_session.driver
+        else:
+            try:
+                self.driver.quit()
+            except Exception as err:
+                logger.warning(f"Error while quitting the driver: {err}")
+            self.get_driver()
+        self.pages_loaded = 0
+        self.driver_pages = 0
+        self.baseline_heap = None
+        self.recycle_reason = None
+
+    def check_memory(self) -> None:
+        """
+        Samples the browser's JS heap and RSS, and schedules a recycle once the
+        heap grew by ``DRIVER_MAX_HEAP_GROWTH_MB``, the RSS passed
+        ``DRIVER_MAX_RSS_MB`` or the browser served ``DRIVER_MAX_PAGES`` pages.
+        """
+        heap = get_js_heap_size(self.driver)
+        rss = get_browser_rss(self.driver)
+        if heap is not None:
+            metrics.driver_memory.set(heap)
+            if self.baseline_heap is None:
+                self.baseline_heap = heap
+        if rss is not None:
+            metrics.driver_rss.set(rss)
+
+        reason = get_recycle_reason(
+            self.driver_pages,
+            heap,
+            self.baseline_heap,
+            rss,
+            max_pages=Config.DRIVER_MAX_PAGES,
+            max_heap_growth_mb=Config.DRIVER_MAX_HEAP_GROWTH_MB,
+            max_rss_mb=Config.DRIVER_MAX_RSS_MB,
+        )
+        if reason is None:
+            return
+        self.recycle_reason = reason
+        logger.info(
+            f"Browser due for recycling ({self.recycle_reason}): "
+            f"heap {(heap or 0) / 1048576:.1f} MB, rss {(rss or 0) / 1048576:.1f} MB, "
+            f"{self.driver_pages} pages."
+        )
+
+    def recycle_if_needed(self, restore_position: bool = True) -> bool:
+        """
+        Restarts a browser that outgrew its limits, carrying its cookies over
+        and, with ``restore_position``, reloading the page it was on.
+
+        Only call this between pages, while no WebElements of the old browser
+        are still in use.
+
+        Args:
+            restore_position (bool): Whether to reload the current URL.
+
+        Returns:
+            bool: True if the browser was recycled.
+        """
+        if not self.recycle_reason or not self.driver:
+            return False
+        reason = self.recycle_reason
+        cookies = get_all_cookies(self.driver)
+        url = self.driver.current_url if restore_position else None
+        with metrics.timed("driver_recycle"):
+            self.restart_driver()
+            restore_cookies(self.driver, cookies)
+            if url:
+                self.load_url(url)
+        metrics.driver_recycles.inc(reason=reason)
+        logger.info(f"Recycled the browser ({reason}), {len(cookies)} cookies kept.")
+        return True
+
+    def release_memory(self) -> None:
+        """
+        Drops what a finished browser category left behind: the renderer's
+        page, HTTP cache and garbage, and Python's garbage. Recycles the browser
+        if it is still over its limits.
+        """
+        if not self.driver:
+            return
+        release_renderer_memory(self.driver)
+        gc.collect()
+        self.check_memory()
+        self.recycle_if_needed(restore_position=False)
+
+    def try_release_memory(self) -> None:
+        """
+        Runs ``release_memory``, logging instead of raising, so it can run in a
+        ``finally`` without hiding the error that is already propagating.
+        """
+        try:
+            self.release_memory()
+        except Exception as err:
+            logger.error(f"Error while releasing browser memory: {err}")
+
+    def ensure_driver(self) -> None:
+        """
+        Starts a cookie-primed driver if the crawler does not have one yet.
+        """
+        if not self.driver:
+            self.get_driver()
+            self.set_cookies()
+
+    def load_url(self, url: str) -> None:
+        """
+        Navigates the driver to a URL, timing the page load.
+
+        Args:
+            url (str): The URL to load.
+        """
+        with metrics.timed("page_load"):
+            self.driver.get(url)
+
+    def record_page(self, via_driver: bool = True) -> None:
+        """
+        Counts a loaded results page and samples the driver's transfer and memory.
+
+        Args:
+            via_driver (bool): Whether the page was loaded in the browser.
+        """
+        self.pages_loaded += 1
+        metrics.pages.inc(engine="selenium" if via_driver else "http")
+        if not via_driver:
+            return
+        self.driver_pages += 1
+        self.log_page_transfer()
+        self.check_memory()
+
+    def log_page_transfer(self) -> None:
+        """
+        Logs the bytes the current page pulled over the network.
+        """
+        transferred = get_page_transfer_size(self.driver)
+        if transferred is not None:
             logger.info(
-                f"\nProcessing category {index} of {len(categories_to_process)}: {category}"
+                f"Page transferred {transferred / 1024:.1f} KiB "
+                f"({Config.BROWSER_PROFILE} profile)."
             )
 
-            # Reload home page to avoid stale elements
-            amazon_manager.driver.get("https://www.amazon.com")
-            WebDriverWait(amazon_manager.driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, "//input[contains(@id,'twotabsearchtextbox')]")
+    def has_next_page(self) -> bool:
+        """
+        Checks whether the current results page links to a next page.
+
+        Returns:
+            bool: True if a "Next" link is present, False otherwise.
+        """
+        return bool(
+            self.driver.find_elements(By.XPATH, XpathConstants.next_page_button.value)
+        )
+
+    def crawl_category_by_url(
+        self, category: str, start_page: Optional[int] = None
+    ) -> int:
+        """
+        Walks a category's result pages by loading their search URLs directly.
+
+        Args:
+            category (str): The search term of the category.
+            start_page (Optional[int]): The first results page to load; defaults
+                to the crawl state's frontier, or page one.
+
+        Returns:
+            int: The number of products processed for the category.
+        """
+        if start_page is None:
+            start_page = 1
+            if self.crawl_state:
+                start_page = self.crawl_state.get_next_page(category)
+                if start_page is None:
+                    logger.info(f"Category already crawled, skipping: {category}")
+                    return 0
+                if start_page > 1:
+                    logger.info(f"Resuming {category} from page {start_page}.")
+
+        processed = 0
+        page_number = start_page
+        while True:
+            page_processed = self.crawl_page(category, page_number)
+            if page_processed is None:
+                logger.warning(
+                    "No product cards found, ending pagination for this category."
                 )
+                break
+            processed += page_processed
+            if not self.next_page_available:
+                logger.info("No more pages for this category.")
+                break
+            page_number += 1
+        return processed
+
+    def crawl_category_by_search_box(self, category: str) -> int:
+        """
+        Searches for a category and extracts every result page of it.
+
+        Args:
+            category (str): The search term of the category.
+
+        Returns:
+            int: The number of products processed for the category.
+
+        Raises:
+            PageBlockedError: If a page stays blocked after every session rotation.
+        """
+        # Reload home page to avoid stale elements
+        self.load_url(amazon_url())
+        WebDriverWait(self.driver, 10).until(
+            EC.presence_of_element_located(
+                (By.XPATH, "//input[contains(@id,'twotabsearchtextbox')]")
             )
-            result = amazon_manager.get_search_field()
-            if not result:
-                logger.error("Search field not found on reload.")
-                continue
-            search_field, search_button = result
-
-            # Reset record flag for this category
-            records_present = True
-            search_field.clear()
-            search_field.send_keys(category)
-            search_button.click()
-
-            page_number = 1
-            while records_present:
-                logger.info(
-                    f"Scraping page number: {page_number} for category: {category}"
+        )
+        result = self.get_search_field()
+        if not result:
+            logger.error("Search field not found on reload.")
+            return 0
+        search_field, search_button = result
+
+        search_field.clear()
+        search_field.send_keys(category)
+        search_button.click()
+
+        processed = 0
+        page_number = 1
+        while True:
+            logger.info(f"Scraping page number: {page_number} for category: {category}")
+            # A blocked page is reloaded on a rotated session before giving up.
+            cards = self.load_results_page(self.driver.current_url, loaded=True)
+            if not cards:
+                logger.warning(
+                    "No product cards found, ending pagination for this category."
                 )
-                cards = amazon_manager.collect_product_cards()
-                if not cards:
-                    logger.warning(
-                        "No product cards found, ending pagination for this category."
-                    )
-                    break
+                break
 
-                for idx, card in enumerate(cards, start=1):
-                    logger.info(f"Processing record {idx} of {len(cards)}")
-                    amazon_manager.get_product_details(card)
+            processed += self.process_page(cards)
+            self.record_page()
 
-                try:
-                    next_button = WebDriverWait(amazon_manager.driver, 10).until(
-                        EC.element_to_be_clickable(
-                            (By.XPATH, XpathConstants.next_page_button.value)
-                        )
-                    )
-                    amazon_manager.driver.execute_script(
-                        "arguments[0].scrollIntoView({block: 'center'});", next_button
-                    )
-                    time.sleep(1)  # Optional small pause
-                    amazon_manager.driver.execute_script(
-                        "arguments[0].click();", next_button
+            try:
+                next_button = WebDriverWait(self.driver, 10).until(
+                    EC.element_to_be_clickable(
+                        (By.XPATH, XpathConstants.next_page_button.value)
                     )
+                )
+                self.driver.execute_script(
+                    "arguments[0].scrollIntoView({block: 'center'});", next_button
+                )
+                self.driver.execute_script("arguments[0].click();", next_button)
 
-                    amazon_manager.scroll_page()
-                    WebDriverWait(amazon_manager.driver, 10).until(
-                        EC.staleness_of(cards[0])
-                    )
-                    page_number += 1
-                except Exception as error:
-                    logger.info(f"No more pages for this category: {error}")
-                    break  # Exit pagination for this category
+                WebDriverWait(self.driver, 10).until(EC.staleness_of(cards[0]))
+                # The fixed pause that used to precede the click is saved too.
+                saved = FIXED_PAUSE_SECONDS + self.scroll_page()
+                metrics.wait_saved.inc(saved)
+                logger.info(f"Page settled, {saved:.2f}s saved over fixed sleeps.")
+                page_number += 1
+                # The next page is loaded and no old cards are used any more.
+                if self.recycle_if_needed():
+                    self.scroll_page()
+            except Exception as error:
+                logger.info(f"No more pages for this category: {error}")
+                break  # Exit pagination for this category
+        return processed
 
+    def close(self) -> None:
+        """
+        Quits the driver, or hands a borrowed session back to its pool.
+        """
+        if self.browser_session:
+            self.driver_pool.release(self.browser_session, pages=self.pages_loaded)
+            self.browser_session = None
+        elif self.driver:
+            self.driver.quit()
+        if self.http_fetcher:
+            self.http_fetcher.close()
+        if self.detail_crawler:
+            self.detail_crawler.close()
+        self.driver = None
+        self.pages_loaded = 0
+
+
+def main(driver_pool: Optional[DriverPool] = None) -> bool:
+    """
+    Main function to orchestrate the Amazon product extraction and upsert process.
+
+    Args:
+        driver_pool (Optional[DriverPool]): A pool of warm sessions to borrow from.
+
+    Returns:
+        bool: True if the process completes successfully, False otherwise.
+    """
+    crawl_state = open_crawl_state()
+    amazon_manager = AmazonCrawler(driver_pool=driver_pool, crawl_state=crawl_state)
+    categories_to_process = AmazonRequestConstants.categories_to_process.value
+    blocked = []
+    try:
+        try:
+            if not amazon_manager.start_session():
+                return False
+
+            for index, category in enumerate(categories_to_process, start=1):
+                logger.info(
+                    f"\nProcessing category {index} of "
+                    f"{len(categories_to_process)}: {category}"
+                )
+                try:
+                    amazon_manager.crawl_category(category)
+                except PageBlockedError as err:
+                    logger.error(f"Skipping the rest of {category}: {err}")
+                    blocked.append(category)
+        finally:
+            # The last batches are flushed here, before the frontier is judged.
+            written = close_sink(amazon_manager.sink)
+            amazon_manager.close()
+
+        if blocked:
+            # Keep the checkpoint so the next run resumes the blocked categories.
+            logger.error(f"Blocked categories left unfinished: {', '.join(blocked)}")
+            return False
+        if not written:
+            logger.error("Some records were not written, keeping the crawl state.")
+            return False
+        if crawl_state:
+            if not crawl_state.is_finished(categories_to_process):
+                logger.warning("Some categories are not recorded complete yet.")
+                return False
+            crawl_state.reset()
         return True
     finally:
-        if amazon_manager.driver:
-            amazon_manager.driver.quit()
+        if crawl_state:
+            crawl_state.close()
 
 
 if __name__ == "__main__":
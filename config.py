@@ -5,5 +5,113 @@ load_dotenv()
 
 
 class Config:
+    # "production" logs through background queues and drops per-card DEBUG lines.
+    LOG_MODE = os.getenv("LOG_MODE", "development")
+
     AIRTABLE_API_KEY = os.getenv("AIRTABLE_API_KEY")
     AIRTABLE_BASE_ID = os.getenv("AIRTABLE_BASE_ID")
+    AIRTABLE_ENDPOINT_URL = os.getenv("AIRTABLE_ENDPOINT_URL", "https://api.airtable.com")
+    AIRTABLE_RATE_LIMIT = float(os.getenv("AIRTABLE_RATE_LIMIT", "5"))
+    AIRTABLE_FLUSH_INTERVAL = float(os.getenv("AIRTABLE_FLUSH_INTERVAL", "2"))
+    # Columns sent to Airtable; other record fields only reach the local sinks.
+    AIRTABLE_FIELDS = os.getenv(
+        "AIRTABLE_FIELDS",
+        "product id,product name,product price,product rating,image url",
+    )
+
+    # Comma-separated output sinks: airtable, jsonl, parquet, sqlite, null.
+    OUTPUT_SINKS = os.getenv("OUTPUT_SINKS", "airtable")
+    JSONL_SINK_PATH = os.getenv("JSONL_SINK_PATH", "data/output/products.jsonl")
+    SINK_FSYNC_INTERVAL = float(os.getenv("SINK_FSYNC_INTERVAL", "1"))
+    # strftime pattern; every run writes a new Parquet file.
+    PARQUET_SINK_PATH = os.getenv(
+        "PARQUET_SINK_PATH", "data/output/products-%Y%m%d-%H%M%S.parquet"
+    )
+    PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "5000"))
+    SQLITE_SINK_PATH = os.getenv("SQLITE_SINK_PATH", "data/output/products.sqlite3")
+    SQLITE_SINK_BATCH_SIZE = int(os.getenv("SQLITE_SINK_BATCH_SIZE", "500"))
+
+    # SQLite file of last-written content hashes per product; empty disables skipping.
+    PRODUCT_CACHE_PATH = os.getenv("PRODUCT_CACHE_PATH", "data/product_cache.sqlite3")
+
+    # SQLite mirror of the Airtable table used for indexed local lookups.
+    LOCAL_MIRROR_PATH = os.getenv("LOCAL_MIRROR_PATH", "data/airtable_mirror.sqlite3")
+
+    # SQLite crawl frontier for resuming interrupted URL-navigated crawls.
+    CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", "data/crawl_state.sqlite3")
+    CRAWL_LEASE_SECONDS = float(os.getenv("CRAWL_LEASE_SECONDS", "600"))
+    # How long a worker waits before retrying a page another worker has leased.
+    CRAWL_LEASE_POLL_SECONDS = float(os.getenv("CRAWL_LEASE_POLL_SECONDS", "5"))
+
+    # Shared work queue for --role coordinator/worker: a SQLite path on a shared
+    # volume, or a redis:// URL. Leases not heartbeated in time are reclaimed.
+    CRAWLER_ROLE = os.getenv("CRAWLER_ROLE", "standalone")
+    WORK_QUEUE_URL = os.getenv("WORK_QUEUE_URL", "data/work_queue.sqlite3")
+    WORK_LEASE_SECONDS = float(os.getenv("WORK_LEASE_SECONDS", "120"))
+    WORK_HEARTBEAT_SECONDS = float(os.getenv("WORK_HEARTBEAT_SECONDS", "30"))
+    WORK_MAX_ATTEMPTS = int(os.getenv("WORK_MAX_ATTEMPTS", "3"))
+    WORK_POLL_SECONDS = float(os.getenv("WORK_POLL_SECONDS", "5"))
+
+    # Origin the crawler browses; point it at a replay server for offline runs.
+    AMAZON_BASE_URL = os.getenv("AMAZON_BASE_URL", "https://www.amazon.com")
+
+    # "url" loads /s?k=...&page=N directly, "search_box" types into the home page UI.
+    NAVIGATION_MODE = os.getenv("NAVIGATION_MODE", "url")
+    # Pages per category to schedule as independent units (0 = follow "Next").
+    MAX_PAGES = int(os.getenv("MAX_PAGES", "0"))
+
+    # "http" pulls result pages with requests and falls back to Selenium on a bot wall.
+    FETCH_ENGINE = os.getenv("FETCH_ENGINE", "selenium")
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "15"))
+
+    # "html" parses one page_source snapshot per page, "webdriver" queries each card.
+    EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "html")
+
+    CHROME_BIN = os.getenv("CHROME_BIN", "/usr/bin/chromium")
+    CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
+    # "lean" blocks images, media, fonts, ads and trackers; "default" loads everything.
+    BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "lean")
+
+    # Warm driver pool: attach to a running chromedriver and keep per-slot profiles.
+    CHROMEDRIVER_URL = os.getenv("CHROMEDRIVER_URL")
+    CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", "data/chrome-profiles")
+    DRIVER_MAX_PAGES = int(os.getenv("DRIVER_MAX_PAGES", "200"))
+    DRIVER_MAX_HEAP_GROWTH_MB = float(os.getenv("DRIVER_MAX_HEAP_GROWTH_MB", "512"))
+    # Resident memory of a crawler's own browser processes before it is recycled.
+    DRIVER_MAX_RSS_MB = float(os.getenv("DRIVER_MAX_RSS_MB", "1536"))
+
+    # Block handling: per-worker delay bounds and page retries with a rotated session.
+    THROTTLE_MIN_STEP = float(os.getenv("THROTTLE_MIN_STEP", "2"))
+    THROTTLE_MAX_DELAY = float(os.getenv("THROTTLE_MAX_DELAY", "60"))
+    THROTTLE_DECAY = float(os.getenv("THROTTLE_DECAY", "0.8"))
+    BLOCK_MAX_RETRIES = int(os.getenv("BLOCK_MAX_RETRIES", "3"))
+
+    # Adaptive page waits: return once nothing changed for WAIT_QUIET_SECONDS,
+    # but never wait longer than WAIT_MAX_SECONDS.
+    WAIT_QUIET_SECONDS = float(os.getenv("WAIT_QUIET_SECONDS", "0.3"))
+    WAIT_MAX_SECONDS = float(os.getenv("WAIT_MAX_SECONDS", "3"))
+
+    # Number of parallel Chromium workers; overridden by main.py --workers.
+    CRAWLER_WORKERS = int(os.getenv("CRAWLER_WORKERS", "1"))
+
+    # Asyncio pipeline: worker tasks per stage and bounded queue sizes.
+    PIPELINE_FETCH_WORKERS = int(os.getenv("PIPELINE_FETCH_WORKERS", "2"))
+    PIPELINE_PARSE_WORKERS = int(os.getenv("PIPELINE_PARSE_WORKERS", "1"))
+    PIPELINE_VALIDATE_WORKERS = int(os.getenv("PIPELINE_VALIDATE_WORKERS", "2"))
+    PIPELINE_SINK_WORKERS = int(os.getenv("PIPELINE_SINK_WORKERS", "1"))
+    PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "4"))
+    PIPELINE_RECORD_QUEUE_SIZE = int(os.getenv("PIPELINE_RECORD_QUEUE_SIZE", "200"))
+
+    # Optional product detail stage: "" (off), "http" or "tabs" (one driver,
+    # DETAIL_CONCURRENCY tabs at a time). Details are cached per ASIN.
+    DETAIL_MODE = os.getenv("DETAIL_MODE", "")
+    DETAIL_CONCURRENCY = int(os.getenv("DETAIL_CONCURRENCY", "4"))
+    DETAIL_TIMEOUT = float(os.getenv("DETAIL_TIMEOUT", "15"))
+    DETAIL_CACHE_PATH = os.getenv("DETAIL_CACHE_PATH", "data/detail_cache.sqlite3")
+    DETAIL_CACHE_TTL_HOURS = float(os.getenv("DETAIL_CACHE_TTL_HOURS", "24"))
+
+    # Port of the Prometheus-style /metrics endpoint (0 = disabled) and the
+    # address it binds to; use 0.0.0.0 to let a scraper in another container in.
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
@@ -24,6 +24,35 @@ class AmazonRequestConstants(Enum):
         "csm-hit": "tb:SVB5DVJY072ZDBJ9WW84+s-HKZ7EF7BQZDNYDZ35CSY|1747741452456&t:1747741452457&adb:adblk_no",
     }
 
+    # Strings that only appear on captcha / robot-check pages.
+    bot_wall_markers = [
+        "/errors/validateCaptcha",
+        "Type the characters you see in this image",
+        "To discuss automated access to Amazon data please contact",
+    ]
+
+    # The "Sorry! Something went wrong" dog page Amazon serves when throttling.
+    dog_page_markers = [
+        "Sorry! Something went wrong!",
+        "Dogs of Amazon",
+        "api-services-support@amazon.com",
+    ]
+
+    # Markup only present when a results page actually lists products.
+    results_markers = [
+        'data-component-type="s-search-result"',
+        'role="listitem"',
+    ]
+
+    # User agents rotated through when a session gets blocked.
+    user_agents = [
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:138.0) Gecko/20100101 Firefox/138.0",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+    ]
+
     headers = {
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
         "accept-language": "en-US,en;q=0.9",
@@ -50,16 +79,71 @@ class AmazonRequestConstants(Enum):
     }
 
 
+class BrowserProfileConstants(Enum):
+    lean_arguments = [
+        "--disable-gpu",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-background-timer-throttling",
+        "--disable-component-update",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--metrics-recording-only",
+        "--mute-audio",
+        "--no-first-run",
+        "--blink-settings=imagesEnabled=false",
+    ]
+
+    # Patterns for CDP Network.setBlockedURLs; "*" matches any run of characters.
+    blocked_urls = [
+        "*.jpg*",
+        "*.jpeg*",
+        "*.png*",
+        "*.gif*",
+        "*.webp*",
+        "*.svg*",
+        "*.ico*",
+        "*.mp4*",
+        "*.webm*",
+        "*.m3u8*",
+        "*.woff*",
+        "*.ttf*",
+        "*.otf*",
+        "*amazon-adsystem.com*",
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*fls-na.amazon.com*",
+        "*unagi.amazon.com*",
+        "*unagi-na.amazon.com*",
+        "*aax-us-east.amazon-adsystem.com*",
+        "*/rd/uedata*",
+        "*/1/batch/1/OE/*",
+    ]
+
+
 class AirTableConstants(Enum):
     TABLE_NAME = "selenium_extracted_data"
+    BATCH_SIZE = 10  # Airtable's per-request record limit
+    MAX_RETRIES = 5
+    BACKOFF_SECONDS = 0.5
+    RETRY_STATUSES = [429, 500, 502, 503, 504]
 
 
 class XpathConstants(Enum):
     product_cards = "//div[contains(@role,'listitem')]/div/div"
-    product_url = "//a[contains(@class,'a-link-normal s-no-outline')]"
+    product_asin = "./ancestor-or-self::*[@data-asin][1]"
+    product_url = ".//a[contains(@class,'a-link-normal s-no-outline')]"
     product_element = ".//h2[@aria-label]"
     product_price = ".//span[@class='a-price']/span[@class='a-offscreen']"
     product_rating = ".//i[@data-cy='reviews-ratings-slot']/span[@class='a-icon-alt']"
+    product_review_count = ".//a[contains(@href,'customerReviews')]//span[contains(@class,'s-underline-text')]"
     image_element = ".//div[contains(@class,'a-section aok-relative s-image-fixed-height')]/img[contains(@class,'s-image')]"
     pagination_element = "//span[contains(@class,'s-pagination-item s-pagination-previous s-pagination-disabled ')]"
     next_page_button = "//li[contains(@class,'s-list-item-margin-right-adjustment')]/span/a[contains(text(),'Next')]"
+    # Product detail page
+    detail_seller = "//a[@id='sellerProfileTriggerId'] | //div[@id='merchantInfoFeature_feature_div']//span[contains(@class,'offer-display-feature-text-message')]"
+    detail_availability = "//div[@id='availability']/span"
+    detail_review_count = "//span[@id='acrCustomerReviewText']"
+    detail_features = "//div[@id='feature-bullets']//li//span[contains(@class,'a-list-item')]"
@@ -0,0 +1,284 @@
+import os
+import sqlite3
+import threading
+import time
+from enum import Enum
+from config import Config
+from log_handler import logger
+from typing import Iterable, Optional, Tuple, Union
+
+
+class UnitClaim(Enum):
+    """
+    The outcome of claiming a (category, page) unit.
+    """
+
+    CLAIMED = "claimed"
+    # Done already, or past the end of its category.
+    FINISHED = "finished"
+    # Held by a live lease of another worker; the unit is still unfinished.
+    LEASED = "leased"
+
+
+class CrawlStateStore:
+    """
+    A persistent crawl frontier so interrupted crawls resume where they stopped.
+
+    Every completed (category, page) unit and the product keys it emitted are
+    committed in one SQLite transaction, so a crash never leaves a page half
+    recorded. Workers in other threads or processes claim units through
+    short leases, which keeps them from crawling the same page twice.
+    """
+
+    def __init__(self, path: str = Config.CRAWL_STATE_PATH) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS units (
+                category TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                lease_until REAL,
+                products INTEGER NOT NULL DEFAULT 0,
+                completed_at REAL,
+                PRIMARY KEY (category, page)
+            );
+            CREATE TABLE IF NOT EXISTS category_ends (
+                category TEXT PRIMARY KEY,
+                end_page INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS emitted (
+                product_key TEXT PRIMARY KEY,
+                category TEXT NOT NULL,
+                page INTEGER NOT NULL
+            );
+            """
+        )
+        self.lock = threading.Lock()
+
+    def get_next_page(self, category: str) -> Optional[int]:
+        """
+        Returns the first page of a category that has not been crawled yet.
+
+        Args:
+            category (str): The category to look up.
+
+        Returns:
+            Optional[int]: The page to resume from, or None if the category is done.
+        """
+        with self.lock:
+            done_pages = {
+                page
+                for (page,) in self.connection.execute(
+                    "SELECT page FROM units WHERE category = ? AND status = 'done'",
+                    (category,),
+                )
+            }
+            end_page = self.get_end_page(category)
+        next_page = 1
+        while next_page in done_pages:
+            next_page += 1
+        if end_page is not None and next_page >= end_page:
+            return None
+        return next_page
+
+    def get_end_page(self, category: str) -> Optional[int]:
+        """
+        Returns the first page past the end of a category, if it is known yet.
+        """
+        row = self.connection.execute(
+            "SELECT end_page FROM category_ends WHERE category = ?", (category,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def claim_unit(self, category: str, page: int, worker: str) -> UnitClaim:
+        """
+        Leases a (category, page) unit unless it is done or leased by another worker.
+
+        Args:
+            category (str): The unit's category.
+            page (int): The unit's page number.
+            worker (str): The identifier of the claiming worker.
+
+        Returns:
+            UnitClaim: CLAIMED if the worker now holds the unit, FINISHED if
+            there is nothing left to crawl, LEASED if another worker holds it.
+        """
+        now = time.time()
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute(
+                    "SELECT status, worker, lease_until FROM units "
+                    "WHERE category = ? AND page = ?",
+                    (category, page),
+                ).fetchone()
+                end_page = self.get_end_page(category)
+                if (end_page is not None and page >= end_page) or (
+                    row and row[0] == "done"
+                ):
+                    # Crawled already, or the category ran out of pages before it.
+                    self.connection.execute("COMMIT")
+                    return UnitClaim.FINISHED
+                if row and row[1] != worker and row[2] and row[2] > now:
+                    self.connection.execute("COMMIT")
+                    return UnitClaim.LEASED
+                self.connection.execute(
+                    "INSERT INTO units (category, page, status, worker, lease_until) "
+                    "VALUES (?, ?, 'leased', ?, ?) ON CONFLICT(category, page) "
+                    "DO UPDATE SET status = 'leased', worker = excluded.worker, "
+                    "lease_until = excluded.lease_until",
+                    (category, page, worker, now + Config.CRAWL_LEASE_SECONDS),
+                )
+                self.connection.execute("COMMIT")
+                return UnitClaim.CLAIMED
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def complete_page(
+        self,
+        category: str,
+        page: int,
+        product_keys: Iterable[str],
+        has_next: bool,
+    ) -> None:
+        """
+        Atomically records a crawled page, its products and the new frontier.
+
+        Args:
+            category (str): The page's category.
+            page (int): The page number.
+            product_keys (Iterable[str]): The keys of the products it emitted.
+            has_next (bool): Whether the category continues after this page.
+        """
+        product_keys = list(product_keys)
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute(
+                    "INSERT INTO units (category, page, status, products, "
+                    "completed_at) VALUES (?, ?, 'done', ?, ?) "
+                    "ON CONFLICT(category, page) DO UPDATE "
+                    "SET status = 'done', products = excluded.products, "
+                    "completed_at = excluded.completed_at, lease_until = NULL",
+                    (category, page, len(product_keys), time.time()),
+                )
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO emitted VALUES (?, ?, ?)",
+                    [(key, category, page) for key in product_keys],
+                )
+                if not has_next:
+                    self.set_end_page(category, page + 1)
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def finish_category(self, category: str, end_page: int) -> None:
+        """
+        Marks a category as exhausted from ``end_page`` on.
+
+        Args:
+            category (str): The category.
+            end_page (int): The first page that came back without products.
+        """
+        with self.lock:
+            self.set_end_page(category, end_page)
+
+    def set_end_page(self, category: str, end_page: int) -> None:
+        self.connection.execute(
+            "INSERT INTO category_ends VALUES (?, ?) ON CONFLICT(category) "
+            "DO UPDATE SET end_page = MIN(end_page, excluded.end_page)",
+            (category, end_page),
+        )
+
+    def release_leases(self, worker_prefix: str) -> int:
+        """
+        Drops the leases of workers whose identifier starts with
+        ``worker_prefix``, e.g. the ones a crashed run on this host left behind.
+
+        Args:
+            worker_prefix (str): The identifier prefix of the restarted workers.
+
+        Returns:
+            int: The number of leases released.
+        """
+        with self.lock:
+            released = self.connection.execute(
+                "UPDATE units SET worker = NULL, lease_until = NULL "
+                "WHERE status = 'leased' AND substr(worker, 1, ?) = ?",
+                (len(worker_prefix), worker_prefix),
+            ).rowcount
+        if released:
+            logger.info(f"Took over {released} stale leases of {worker_prefix}*.")
+        return released
+
+    def is_page_finished(self, category: str, page: int) -> bool:
+        """
+        Checks whether a page is recorded done or lies past its category's end.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM units WHERE category = ? AND page = ? "
+                "AND status = 'done'",
+                (category, page),
+            ).fetchone()
+            end_page = self.get_end_page(category)
+        return bool(row) or (end_page is not None and page >= end_page)
+
+    def is_finished(self, units: Iterable[Union[str, Tuple[str, int]]]) -> bool:
+        """
+        Checks that every unit of a crawl is recorded complete.
+
+        Args:
+            units (Iterable[Union[str, Tuple[str, int]]]): Whole categories, which
+                are complete once their end is known and every page before it is
+                done, or (category, page) pairs.
+
+        Returns:
+            bool: True if nothing is left to crawl, so the state may be reset.
+        """
+        for unit in units:
+            if isinstance(unit, str):
+                if self.get_next_page(unit) is not None:
+                    return False
+            elif not self.is_page_finished(*unit):
+                return False
+        return True
+
+    def reset(self) -> None:
+        """
+        Clears the frontier once a crawl has finished, so the next run starts fresh.
+        """
+        with self.lock:
+            self.connection.executescript(
+                "BEGIN; DELETE FROM units; DELETE FROM category_ends; "
+                "DELETE FROM emitted; COMMIT;"
+            )
+        logger.info("Crawl finished, frontier cleared.")
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+def open_crawl_state() -> Optional[CrawlStateStore]:
+    """
+    Opens the crawl state store when checkpointing applies to this run.
+
+    Only URL navigation can jump straight to a resumed page, so the search-box
+    flow always starts from page one.
+
+    Returns:
+        Optional[CrawlStateStore]: The store, or None if checkpointing is off.
+    """
+    if not Config.CRAWL_STATE_PATH or Config.NAVIGATION_MODE != "url":
+        return None
+    return CrawlStateStore()
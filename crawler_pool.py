@@ -0,0 +1,212 @@
+import queue
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from complete_carwler import AmazonCrawler
+from config import Config
+from crawl_state import CrawlStateStore, UnitClaim, open_crawl_state
+from driver_pool import DriverPool
+from constants import AmazonRequestConstants
+from log_handler import logger
+from metrics import metrics
+from search_urls import build_work_units
+from sinks import BaseSink, build_sink, close_sink
+from typing import Dict, List, Optional, Tuple, Union
+
+WorkUnit = Union[str, Tuple[str, int]]
+
+
+class CrawlerPool:
+    """
+    Crawls categories in parallel on a pool of independent AmazonCrawler workers.
+
+    Every worker owns its own headless Chromium driver and pulls units from a
+    shared queue; all of them write through one thread-safe output sink.
+    A unit is either a whole category or, with URL
+    navigation and ``max_pages`` set, a single (category, page) pair.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        sink: Optional[BaseSink] = None,
+        driver_pool: Optional[DriverPool] = None,
+        crawl_state: Optional[CrawlStateStore] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.driver_pool = driver_pool
+        self.crawl_state = crawl_state
+        self.sink = sink or build_sink()
+        self.units: "queue.Queue[WorkUnit]" = queue.Queue()
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.failed_units: List[WorkUnit] = []
+        self.dead_workers = 0
+        # Lowest page found empty per category; later pages of it are skipped.
+        self.last_pages: Dict[str, int] = {}
+        # Lease owners are stable across restarts, so a rerun on this host can
+        # take over the leases a crashed run left behind.
+        self.worker_prefix = f"{socket.gethostname()}:"
+
+    def crawl_unit(self, crawler: AmazonCrawler, unit: WorkUnit, worker: str) -> int:
+        """
+        Crawls one unit: a whole category or a single (category, page) pair.
+
+        A page leased by another worker is put back on the queue, so it stays
+        unfinished until that worker completes it or its lease expires.
+
+        Args:
+            crawler (AmazonCrawler): The worker's crawler.
+            unit (WorkUnit): The unit to crawl.
+            worker (str): The worker's identifier, used to lease page units.
+
+        Returns:
+            int: The number of products processed.
+        """
+        if isinstance(unit, str):
+            return crawler.crawl_category(unit)
+
+        category, page_number = unit
+        with self.lock:
+            if page_number > self.last_pages.get(category, page_number):
+                return 0
+        if self.crawl_state:
+            claim = self.crawl_state.claim_unit(category, page_number, worker)
+            if claim is UnitClaim.FINISHED:
+                logger.info(f"Skipping {unit}: already crawled.")
+                return 0
+            if claim is UnitClaim.LEASED:
+                logger.info(f"{unit} is leased by another worker, retrying later.")
+                if self.units.empty():
+                    metrics.sleep(Config.CRAWL_LEASE_POLL_SECONDS)
+                self.units.put(unit)
+                return 0
+        processed = crawler.crawl_page(category, page_number)
+        if processed is None:
+            with self.lock:
+                last_page = self.last_pages.get(category, page_number)
+                self.last_pages[category] = min(last_page, page_number)
+            return 0
+        return processed
+
+    def run_worker(self, worker_id: int) -> None:
+        """
+        Starts a crawler session and processes units until the queue is empty.
+
+        Args:
+            worker_id (int): The index of the worker, used in log lines.
+        """
+        crawler = AmazonCrawler(
+            sink=self.sink,
+            driver_pool=self.driver_pool,
+            crawl_state=self.crawl_state,
+        )
+        worker = f"{self.worker_prefix}{worker_id}"
+        last_category = None
+        try:
+            if not crawler.start_session():
+                logger.error(f"Worker {worker_id} could not start its session.")
+                with self.lock:
+                    self.dead_workers += 1
+                return
+            while True:
+                try:
+                    unit = self.units.get_nowait()
+                except queue.Empty:
+                    return
+                logger.info(f"Worker {worker_id} processing unit: {unit}")
+                # Whole categories release their memory themselves.
+                category = unit[0] if isinstance(unit, tuple) else None
+                if category and last_category and category != last_category:
+                    crawler.try_release_memory()
+                last_category = category
+                try:
+                    processed = self.crawl_unit(crawler, unit, worker)
+                    with self.lock:
+                        self.processed += processed
+                except Exception as err:
+                    logger.error(f"Worker {worker_id} failed on unit {unit}: {err}")
+                    with self.lock:
+                        self.failed_units.append(unit)
+        finally:
+            crawler.close()
+
+    def run(self, units: List[WorkUnit]) -> bool:
+        """
+        Crawls the given units across the worker pool.
+
+        Args:
+            units (List[WorkUnit]): Categories or (category, page) pairs to crawl.
+
+        Returns:
+            bool: True if every unit was crawled and written and no worker died,
+            False otherwise.
+        """
+        if self.crawl_state:
+            self.crawl_state.release_leases(self.worker_prefix)
+        for unit in units:
+            self.units.put(unit)
+
+        workers = min(self.workers, len(units))
+        logger.info(f"Crawling {len(units)} units with {workers} workers.")
+        try:
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="crawler"
+            ) as executor:
+                futures = [
+                    executor.submit(self.run_worker, worker_id)
+                    for worker_id in range(1, workers + 1)
+                ]
+            for worker_id, future in enumerate(futures, start=1):
+                try:
+                    future.result()
+                except Exception as err:
+                    logger.error(f"Worker {worker_id} died: {err}")
+                    with self.lock:
+                        self.dead_workers += 1
+        finally:
+            written = close_sink(self.sink)
+
+        unfinished = self.failed_units + list(self.units.queue)
+        logger.info(
+            f"Worker pool finished: {self.processed} products processed, "
+            f"{len(unfinished)} units unfinished, {self.dead_workers} workers died."
+        )
+        if self.dead_workers:
+            return False
+        if not written:
+            logger.error("Some records were not written, keeping the crawl state.")
+            return False
+        if self.crawl_state and not unfinished:
+            if not self.crawl_state.is_finished(units):
+                logger.warning("Some units are not recorded complete yet.")
+                return False
+            self.crawl_state.reset()
+        return not unfinished
+
+
+def main(workers: int, driver_pool: Optional[DriverPool] = None) -> bool:
+    """
+    Runs the crawl on a pool of ``workers`` parallel crawlers.
+
+    Args:
+        workers (int): The number of Chromium workers to start.
+        driver_pool (Optional[DriverPool]): A pool of warm sessions to borrow from.
+
+    Returns:
+        bool: True if every category was crawled, False otherwise.
+    """
+    categories = AmazonRequestConstants.categories_to_process.value
+    units: List[WorkUnit] = categories
+    if Config.NAVIGATION_MODE == "url" and Config.MAX_PAGES:
+        units = build_work_units(categories, Config.MAX_PAGES)
+
+    crawl_state = open_crawl_state()
+    pool = CrawlerPool(
+        workers=workers, driver_pool=driver_pool, crawl_state=crawl_state
+    )
+    try:
+        return pool.run(units)
+    finally:
+        if crawl_state:
+            crawl_state.close()
@@ -0,0 +1,378 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+from lxml import html as lxml_html
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+from card_parser import CardParser
+from config import Config
+from constants import XpathConstants
+from http_fetcher import HttpFetcher
+from log_handler import logger
+from metrics import metrics
+from normalization import parse_review_count
+from page_classifier import classify_page
+from typing import Dict, List, Optional
+
+
+def clean_text(text: Optional[str]) -> Optional[str]:
+    """
+    Collapses the whitespace of scraped text.
+
+    Args:
+        text (Optional[str]): The raw text.
+
+    Returns:
+        Optional[str]: The cleaned text, or None if nothing is left of it.
+    """
+    if not text:
+        return None
+    return " ".join(text.split()) or None
+
+
+class DetailCache:
+    """
+    Remembers the details fetched per product, so detail pages seen within
+    ``ttl_hours`` are not fetched again.
+    """
+
+    def __init__(
+        self,
+        path: str = Config.DETAIL_CACHE_PATH,
+        ttl_hours: float = Config.DETAIL_CACHE_TTL_HOURS,
+    ) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS details ("
+            "product_key TEXT PRIMARY KEY, details TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+        self.ttl = ttl_hours * 3600
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the cached details of a product if they are still fresh.
+
+        Args:
+            key (str): The ASIN, or the product key of products without one.
+
+        Returns:
+            Optional[dict]: The details, or None if missing or expired.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT details FROM details WHERE product_key = ? AND fetched_at > ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, details: Dict[str, dict]) -> None:
+        """
+        Stores freshly fetched details in one transaction.
+
+        Args:
+            details (Dict[str, dict]): The details keyed by ASIN or product key.
+        """
+        if not details:
+            return
+        now = time.time()
+        rows = [(key, json.dumps(value), now) for key, value in details.items()]
+        with self.lock:
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO details VALUES (?, ?, ?)", rows
+                    )
+            except sqlite3.Error as err:
+                logger.error(f"Error while updating the detail cache: {err}")
+
+    def close(self) -> None:
+        """
+        Closes the cache's database connection.
+        """
+        with self.lock:
+            self.connection.close()
+
+
+class DetailParser:
+    """
+    Extracts seller, availability, review count and feature bullets from a
+    product detail page with compiled lxml XPath expressions.
+    """
+
+    def __init__(self) -> None:
+        self.seller = etree.XPath(XpathConstants.detail_seller.value)
+        self.availability = etree.XPath(XpathConstants.detail_availability.value)
+        self.review_count = etree.XPath(XpathConstants.detail_review_count.value)
+        self.features = etree.XPath(XpathConstants.detail_features.value)
+
+    def parse(self, page_source: str) -> Optional[dict]:
+        """
+        Parses a product detail page.
+
+        Args:
+            page_source (str): The HTML of the page.
+
+        Returns:
+            Optional[dict]: The details keyed like the raw extracted data, or
+            None if the page could not be parsed.
+        """
+        try:
+            document = lxml_html.fromstring(page_source)
+        except (etree.ParserError, ValueError) as err:
+            logger.error(f"Error while parsing a detail page: {err}")
+            return None
+
+        features = [
+            clean_text(node.text_content()) for node in self.features(document)
+        ]
+        return {
+            "Seller": clean_text(CardParser.first_text(self.seller, document)),
+            "Availability": clean_text(
+                CardParser.first_text(self.availability, document)
+            ),
+            "Review Count": parse_review_count(
+                CardParser.first_text(self.review_count, document)
+            ),
+            "Features": [feature for feature in features if feature] or None,
+        }
+
+
+def fetch_in_tabs(
+    driver: webdriver.Chrome, urls: Dict[str, str], tabs: int
+) -> Dict[str, Optional[str]]:
+    """
+    Loads pages concurrently in up to ``tabs`` extra tabs of one driver.
+
+    Every tab of a batch is opened with ``window.open`` before any of them is
+    read, so the browser loads them in parallel while WebDriver commands stay
+    serial. The crawler's own tab is left untouched and focused again after.
+
+    Args:
+        driver (webdriver.Chrome): The crawler's driver.
+        urls (Dict[str, str]): The URLs to load, by product key.
+        tabs (int): The number of tabs open at a time.
+
+    Returns:
+        Dict[str, Optional[str]]: The page sources by product key, None where a
+        page failed to load.
+    """
+    main_window = driver.current_window_handle
+    items = list(urls.items())
+    pages: Dict[str, Optional[str]] = {}
+    try:
+        for start in range(0, len(items), max(1, tabs)):
+            opened = {}
+            for key, url in items[start : start + tabs]:
+                known = set(driver.window_handles)
+                driver.execute_script("window.open(arguments[0], '_blank');", url)
+                new_windows = set(driver.window_handles) - known
+                if new_windows:
+                    opened[key] = new_windows.pop()
+                else:
+                    logger.warning(f"Could not open a tab for {url}")
+                    pages[key] = None
+            for key, window in opened.items():
+                try:
+                    driver.switch_to.window(window)
+                except Exception as err:
+                    # Still focused on another window, which must stay open.
+                    logger.warning(f"Error while switching to a detail tab: {err}")
+                    pages[key] = None
+                    continue
+                try:
+                    WebDriverWait(driver, Config.DETAIL_TIMEOUT).until(
+                        lambda d: d.execute_script("return document.readyState")
+                        == "complete"
+                    )
+                    pages[key] = driver.page_source
+                except Exception as err:
+                    logger.warning(f"Error while loading {urls[key]} in a tab: {err}")
+                    pages[key] = None
+                finally:
+                    try:
+                        driver.close()
+                    except Exception as err:
+                        logger.warning(f"Error while closing a detail tab: {err}")
+    finally:
+        driver.switch_to.window(main_window)
+    return pages
+
+
+DETAIL_MODES = ("http", "tabs")
+
+
+class DetailCrawler:
+    """
+    Enriches extracted products with details from their product pages.
+
+    Pages are fetched concurrently over HTTP (``mode="http"``) or in several
+    tabs of the crawler's driver (``mode="tabs"``). Details fetched within the
+    cache TTL are reused without a request.
+
+    HTTP fetches run on a long-lived thread pool, and every thread keeps its
+    own HttpFetcher, since a requests session must not be shared between
+    threads.
+    """
+
+    def __init__(
+        self,
+        mode: str = Config.DETAIL_MODE,
+        concurrency: int = Config.DETAIL_CONCURRENCY,
+        cache: Optional[DetailCache] = None,
+    ) -> None:
+        if mode not in DETAIL_MODES:
+            raise ValueError(f"Unknown detail mode: {mode}")
+        self.mode = mode
+        self.concurrency = max(1, concurrency)
+        self.cache = cache
+        if cache is None and Config.DETAIL_CACHE_PATH:
+            self.cache = DetailCache()
+        self.parser = DetailParser()
+        self.local = threading.local()
+        self.http_fetchers: List[HttpFetcher] = []
+        self.lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+        if mode == "http":
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="detail"
+            )
+
+    @staticmethod
+    def detail_key(product: dict) -> str:
+        """
+        Returns the key a product's details are cached under.
+
+        Args:
+            product (dict): The raw extracted data of a product.
+
+        Returns:
+            str: The ASIN, or the product key of products without one.
+        """
+        return product.get("ASIN") or product["Product_id"]
+
+    def fetch_page(self, url: str) -> Optional[str]:
+        """
+        Fetches a detail page with the calling thread's own HttpFetcher.
+
+        Args:
+            url (str): The product page URL.
+
+        Returns:
+            Optional[str]: The page HTML, or None if it failed or was blocked.
+        """
+        http_fetcher = getattr(self.local, "http_fetcher", None)
+        if http_fetcher is None:
+            http_fetcher = self.local.http_fetcher = HttpFetcher()
+            with self.lock:
+                self.http_fetchers.append(http_fetcher)
+        return http_fetcher.fetch(url)
+
+    @staticmethod
+    def apply(product: dict, details: dict) -> None:
+        """
+        Merges details into a product, keeping the review count of its card.
+        """
+        for field, value in details.items():
+            if field == "Review Count" and product.get(field) is not None:
+                continue
+            product[field] = value
+
+    def fetch_pages(
+        self, urls: Dict[str, str], driver: Optional[webdriver.Chrome]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Loads detail pages concurrently over HTTP or in tabs of the driver.
+
+        Args:
+            urls (Dict[str, str]): The URLs to load, by product key.
+            driver (Optional[webdriver.Chrome]): The driver for "tabs" mode.
+
+        Returns:
+            Dict[str, Optional[str]]: The page sources by product key, None where
+            a page failed to load.
+        """
+        if self.executor:
+            sources = self.executor.map(self.fetch_page, urls.values())
+            return dict(zip(urls, sources))
+        return fetch_in_tabs(driver, urls, self.concurrency)
+
+    def enrich(
+        self, products: List[dict], driver: Optional[webdriver.Chrome] = None
+    ) -> int:
+        """
+        Adds seller, availability, features and, where the card had none, the
+        review count to raw extracted products, in place.
+
+        Args:
+            products (List[dict]): The raw extracted data of one page.
+            driver (Optional[webdriver.Chrome]): The driver to open tabs in;
+                required in "tabs" mode.
+
+        Returns:
+            int: The number of products enriched.
+        """
+        waiting: Dict[str, List[dict]] = {}
+        urls: Dict[str, str] = {}
+        enriched = 0
+        for product in products:
+            url = product.get("product url") or ""
+            if not url.startswith("http"):
+                continue
+            key = self.detail_key(product)
+            cached = self.cache.get(key) if self.cache else None
+            if cached is not None:
+                self.apply(product, cached)
+                metrics.details.inc(source="cache")
+                enriched += 1
+                continue
+            waiting.setdefault(key, []).append(product)
+            urls[key] = url
+        if not urls:
+            return enriched
+
+        with metrics.timed("detail_fetch"):
+            pages = self.fetch_pages(urls, driver)
+        fetched = {}
+        for key, page_source in pages.items():
+            if not page_source or classify_page(page_source).is_block:
+                metrics.details.inc(source="failed")
+                continue
+            details = self.parser.parse(page_source)
+            if details is None:
+                metrics.details.inc(source="failed")
+                continue
+            fetched[key] = details
+            for product in waiting[key]:
+                self.apply(product, details)
+                enriched += 1
+            metrics.details.inc(source="fetched")
+        if self.cache:
+            self.cache.put(fetched)
+        logger.info(
+            f"Fetched {len(fetched)} of {len(urls)} detail pages ({self.mode}), "
+            f"{enriched} products enriched."
+        )
+        return enriched
+
+    def close(self) -> None:
+        """
+        Stops the fetch threads and closes their sessions and the cache.
+        """
+        if self.executor:
+            self.executor.shutdown()
+        with self.lock:
+            for http_fetcher in self.http_fetchers:
+                http_fetcher.close()
+            self.http_fetchers = []
+        if self.cache:
+            self.cache.close()
@@ -0,0 +1,654 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from config import Config
+from constants import AmazonRequestConstants, BrowserProfileConstants
+from log_handler import logger
+from search_urls import amazon_url
+from typing import Dict, List, Optional
+
+
+class RemoteChromeDriver(webdriver.Remote):
+    """
+    A WebDriver session on an already running chromedriver that keeps CDP access.
+    """
+
+    def __init__(self, driver_url: str, options: Options) -> None:
+        executor = ChromiumRemoteConnection(
+            remote_server_addr=driver_url, vendor_prefix="goog", browser_name="chrome"
+        )
+        super().__init__(command_executor=executor, options=options)
+
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})[
+            "value"
+        ]
+
+
+def build_chrome_options(user_data_dir: Optional[str] = None) -> Options:
+    """
+    Builds the Chromium options shared by every crawler session.
+
+    Args:
+        user_data_dir (Optional[str]): A profile directory to persist between runs.
+
+    Returns:
+        Options: The configured Chromium options.
+    """
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+    if Config.BROWSER_PROFILE == "lean":
+        for argument in BrowserProfileConstants.lean_arguments.value:
+            options.add_argument(argument)
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+    options.binary_location = Config.CHROME_BIN  # Chrome browser binary
+    return options
+
+
+def create_driver(
+    user_data_dir: Optional[str] = None, driver_url: Optional[str] = None
+) -> webdriver.Chrome:
+    """
+    Starts a Chromium session, on a running chromedriver if ``driver_url`` is set.
+
+    Args:
+        user_data_dir (Optional[str]): A profile directory to persist between runs.
+        driver_url (Optional[str]): The URL of a long-lived chromedriver.
+
+    Returns:
+        webdriver.Chrome: The new WebDriver session.
+    """
+    options = build_chrome_options(user_data_dir)
+    if driver_url:
+        driver = RemoteChromeDriver(driver_url, options)
+    else:
+        service = Service(Config.CHROMEDRIVER_PATH)  # ChromeDriver binary
+        driver = webdriver.Chrome(service=service, options=options)
+    try:
+        # Performance.getMetrics only reports once the domain is enabled.
+        driver.execute_cdp_cmd("Performance.enable", {})
+    except Exception as err:
+        logger.warning(f"Error while enabling performance metrics: {err}")
+    if Config.BROWSER_PROFILE == "lean":
+        block_resources(driver)
+    return driver
+
+
+def block_resources(driver: webdriver.Chrome) -> None:
+    """
+    Blocks images, media, fonts and known ad/tracking hosts for a session.
+
+    Only the HTML and the scripts that render the result cards are fetched;
+    image ``src`` attributes are still present in the DOM.
+
+    Args:
+        driver (webdriver.Chrome): The session to restrict.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs",
+            {"urls": BrowserProfileConstants.blocked_urls.value},
+        )
+    except Exception as err:
+        logger.warning(f"Error while blocking resources: {err}")
+
+
+def clear_cookies(driver: webdriver.Chrome) -> None:
+    """
+    Drops every cookie of a session, so the site issues fresh ones.
+
+    Args:
+        driver (webdriver.Chrome): The session to reset.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except Exception as err:
+        logger.warning(f"Error while clearing cookies: {err}")
+
+
+def set_user_agent(driver: webdriver.Chrome, user_agent: str) -> None:
+    """
+    Overrides the user agent a session sends from the next request on.
+
+    Args:
+        driver (webdriver.Chrome): The session to change.
+        user_agent (str): The user agent string.
+    """
+    try:
+        driver.execute_cdp_cmd(
+            "Network.setUserAgentOverride", {"userAgent": user_agent}
+        )
+    except Exception as err:
+        logger.warning(f"Error while setting the user agent: {err}")
+
+
+def get_page_transfer_size(driver: webdriver.Chrome) -> Optional[int]:
+    """
+    Sums the bytes transferred for the current document and its resources.
+
+    Cross-origin resources without Timing-Allow-Origin report zero, so the
+    value is a lower bound.
+
+    Args:
+        driver (webdriver.Chrome): The session to inspect.
+
+    Returns:
+        Optional[int]: The transferred bytes, or None if they could not be read.
+    """
+    try:
+        return int(
+            driver.execute_script(
+                "return performance.getEntriesByType('navigation')"
+                ".concat(performance.getEntriesByType('resource'))"
+                ".reduce((total, entry) => total + (entry.transferSize || 0), 0);"
+            )
+        )
+    except Exception as err:
+        logger.warning(f"Error while reading the page transfer size: {err}")
+        return None
+
+
+# Resolves once the DOM and the resource list have been quiet for ``quietMs``
+# and the card count has stopped growing, or after ``maxMs`` at the latest.
+WAIT_FOR_SETTLED_SCRIPT = """
+const [cardXpath, quietMs, maxMs, done] = arguments;
+const started = performance.now();
+const countCards = () => document.evaluate(
+    `count(${cardXpath})`, document, null, XPathResult.NUMBER_TYPE, null
+).numberValue;
+const countResources = () => performance.getEntriesByType("resource").length;
+let cards = countCards();
+let resources = countResources();
+let lastChange = performance.now();
+const observer = new MutationObserver(() => { lastChange = performance.now(); });
+observer.observe(document.documentElement, {childList: true, subtree: true});
+const timer = setInterval(() => {
+    const now = performance.now();
+    const currentCards = countCards();
+    const currentResources = countResources();
+    if (currentCards !== cards || currentResources !== resources) {
+        cards = currentCards;
+        resources = currentResources;
+        lastChange = now;
+    }
+    if ((document.readyState === "complete" && now - lastChange >= quietMs)
+            || now - started >= maxMs) {
+        clearInterval(timer);
+        observer.disconnect();
+        done({cards: cards, elapsed: (now - started) / 1000});
+    }
+}, 50);
+"""
+
+
+def wait_for_page_settled(
+    driver: webdriver.Chrome,
+    card_xpath: str,
+    quiet_seconds: float = Config.WAIT_QUIET_SECONDS,
+    max_seconds: float = Config.WAIT_MAX_SECONDS,
+) -> float:
+    """
+    Waits until the page stops rendering new cards and requesting resources.
+
+    Args:
+        driver (webdriver.Chrome): The session to wait on.
+        card_xpath (str): The XPath of the product cards to count.
+        quiet_seconds (float): How long nothing may change before returning.
+        max_seconds (float): The longest the wait may take.
+
+    Returns:
+        float: The seconds actually waited.
+    """
+    started = time.perf_counter()
+    try:
+        driver.set_script_timeout(max_seconds + 5)
+        driver.execute_async_script(
+            WAIT_FOR_SETTLED_SCRIPT,
+            card_xpath,
+            quiet_seconds * 1000,
+            max_seconds * 1000,
+        )
+    except Exception as err:
+        logger.warning(f"Error while waiting for the page to settle: {err}")
+    return time.perf_counter() - started
+
+
+def set_session_cookies(driver: webdriver.Chrome) -> None:
+    """
+    Sets every cookie from the constants with a single CDP call.
+
+    Args:
+        driver (webdriver.Chrome): The session to prime.
+    """
+    cookies = [
+        {
+            "name": name,
+            "value": value,
+            "domain": ".amazon.com",
+            "path": "/",
+            "httpOnly": False,
+            "secure": True,
+            "sameSite": "Lax",
+        }
+        for name, value in AmazonRequestConstants.cookies.value.items()
+    ]
+    driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+
+
+def get_performance_metrics(driver: webdriver.Chrome) -> Dict[str, float]:
+    """
+    Reads the renderer's counters through CDP ``Performance.getMetrics``, e.g.
+    "JSHeapUsedSize", "Nodes" or "Documents".
+
+    Args:
+        driver (webdriver.Chrome): The session to inspect.
+
+    Returns:
+        Dict[str, float]: The metrics by name, empty if they could not be read.
+    """
+    try:
+        metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    except Exception as err:
+        logger.warning(f"Error while reading the performance metrics: {err}")
+        return {}
+    return {metric["name"]: metric["value"] for metric in metrics}
+
+
+def get_js_heap_size(driver: webdriver.Chrome) -> Optional[int]:
+    """
+    Reads the renderer's used JS heap size.
+
+    Args:
+        driver (webdriver.Chrome): The session to inspect.
+
+    Returns:
+        Optional[int]: The heap size in bytes, or None if it could not be read.
+    """
+    heap = get_performance_metrics(driver).get("JSHeapUsedSize")
+    return int(heap) if heap is not None else None
+
+
+def get_browser_rss(driver: webdriver.Chrome) -> Optional[int]:
+    """
+    Sums the resident memory of the chromedriver a session launched and every
+    browser process under it, read from /proc.
+
+    Sessions on a shared chromedriver (the warm pool) cannot be told apart
+    from their siblings, so only their JS heap is watched.
+
+    Args:
+        driver (webdriver.Chrome): The session to inspect.
+
+    Returns:
+        Optional[int]: The RSS in bytes, or None if it cannot be measured here.
+    """
+    process = getattr(getattr(driver, "service", None), "process", None)
+    if process is None or not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat_file:
+                # The command name may contain spaces, so split after its ")".
+                parent = int(stat_file.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(parent, []).append(int(entry))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    rss = 0
+    pending = [process.pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/statm") as statm_file:
+                rss += int(statm_file.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return rss
+
+
+def get_recycle_reason(
+    pages: int,
+    heap: Optional[int],
+    baseline_heap: Optional[int],
+    rss: Optional[int] = None,
+    max_pages: int = Config.DRIVER_MAX_PAGES,
+    max_heap_growth_mb: float = Config.DRIVER_MAX_HEAP_GROWTH_MB,
+    max_rss_mb: float = Config.DRIVER_MAX_RSS_MB,
+) -> Optional[str]:
+    """
+    Decides whether a browser outgrew its limits and has to be recycled.
+
+    Args:
+        pages (int): The pages the browser has loaded.
+        heap (Optional[int]): Its current JS heap size in bytes, if known.
+        baseline_heap (Optional[int]): Its JS heap size when it was fresh.
+        rss (Optional[int]): The resident memory of its processes, if known.
+        max_pages (int): The page limit (0 = unlimited).
+        max_heap_growth_mb (float): The allowed heap growth (0 = unlimited).
+        max_rss_mb (float): The allowed resident memory (0 = unlimited).
+
+    Returns:
+        Optional[str]: "heap", "rss" or "pages", or None while within limits.
+    """
+    if (
+        max_heap_growth_mb
+        and heap is not None
+        and baseline_heap is not None
+        and heap - baseline_heap > max_heap_growth_mb * 1048576
+    ):
+        return "heap"
+    if max_rss_mb and rss is not None and rss > max_rss_mb * 1048576:
+        return "rss"
+    if max_pages and pages >= max_pages:
+        return "pages"
+    return None
+
+
+def get_all_cookies(driver: webdriver.Chrome) -> List[dict]:
+    """
+    Reads every cookie of a session, for every domain, through CDP.
+    """
+    try:
+        return driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+    except Exception as err:
+        logger.warning(f"Error while reading the session cookies: {err}")
+        return []
+
+
+# Fields of a CDP Network.Cookie that Network.setCookies accepts back.
+COOKIE_PARAMS = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+    "expires",
+    "priority",
+)
+
+
+def restore_cookies(driver: webdriver.Chrome, cookies: List[dict]) -> None:
+    """
+    Sets cookies read with ``get_all_cookies`` on another session.
+
+    Args:
+        driver (webdriver.Chrome): The session to restore them on.
+        cookies (List[dict]): The CDP cookies.
+    """
+    if not cookies:
+        return
+    params = [
+        {name: cookie[name] for name in COOKIE_PARAMS if name in cookie}
+        for cookie in cookies
+    ]
+    for param in params:
+        if param.get("expires", 0) < 0:
+            # Session cookies are reported with expires -1.
+            del param["expires"]
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": params})
+    except Exception as err:
+        logger.warning(f"Error while restoring the session cookies: {err}")
+
+
+def release_renderer_memory(driver: webdriver.Chrome) -> None:
+    """
+    Unloads the current page, empties the HTTP cache and forces a JS garbage
+    collection, so a long-lived session starts the next category lean.
+
+    Args:
+        driver (webdriver.Chrome): The session to trim.
+    """
+    try:
+        driver.get("about:blank")
+        driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+    except Exception as err:
+        logger.warning(f"Error while releasing renderer memory: {err}")
+
+
+class BrowserSession:
+    """
+    A pre-warmed, cookie-primed browser session handed out by DriverPool.
+    """
+
+    def __init__(self, slot: int, driver: webdriver.Chrome) -> None:
+        self.slot = slot
+        self.driver = driver
+        self.pages_served = 0
+        self.created_at = time.monotonic()
+        self.baseline_heap = get_js_heap_size(driver)
+
+
+class DriverPool:
+    """
+    Keeps warm browser sessions alive so crawls skip Chromium startup.
+
+    Sessions run on one long-lived chromedriver (or ``CHROMEDRIVER_URL``) and
+    optionally keep a per-slot profile under ``CHROME_PROFILE_DIR``. They are
+    health-checked on acquire and recycled after ``max_pages`` pages or once
+    their JS heap has grown by ``max_heap_growth_mb``.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_pages: int = Config.DRIVER_MAX_PAGES,
+        max_heap_growth_mb: float = Config.DRIVER_MAX_HEAP_GROWTH_MB,
+    ) -> None:
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_heap_growth_mb = max_heap_growth_mb
+        self.idle: "queue.Queue[BrowserSession]" = queue.Queue()
+        # Slots without a live session; acquire refills them on demand.
+        self.free_slots: List[int] = list(range(self.size))
+        self.service: Optional[Service] = None
+        self.driver_url = Config.CHROMEDRIVER_URL
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def start_service(self) -> str:
+        """
+        Starts the shared chromedriver once and returns its URL.
+        """
+        with self.lock:
+            if not self.driver_url:
+                self.service = Service(Config.CHROMEDRIVER_PATH)
+                self.service.start()
+                self.driver_url = self.service.service_url
+                logger.info(f"Started a long-lived chromedriver at {self.driver_url}")
+            return self.driver_url
+
+    def profile_dir(self, slot: int) -> Optional[str]:
+        """
+        Returns the persistent profile directory of a slot, or None if
+        ``CHROME_PROFILE_DIR`` is unset.
+        """
+        if not Config.CHROME_PROFILE_DIR:
+            return None
+        return os.path.join(Config.CHROME_PROFILE_DIR, f"slot-{slot}")
+
+    def new_session(self, slot: int) -> BrowserSession:
+        """
+        Launches a browser for a slot, primes its cookies and loads the home page.
+
+        Args:
+            slot (int): The pool slot the session belongs to.
+
+        Returns:
+            BrowserSession: The warm session.
+        """
+        started = time.perf_counter()
+        driver = create_driver(
+            user_data_dir=self.profile_dir(slot), driver_url=self.start_service()
+        )
+        try:
+            set_session_cookies(driver)
+            driver.get(amazon_url())
+        except Exception:
+            driver.quit()
+            raise
+        logger.info(
+            f"Warmed browser session for slot {slot} in {time.perf_counter() - started:.2f}s."
+        )
+        return BrowserSession(slot, driver)
+
+    def warm(self) -> None:
+        """
+        Starts every session of the pool in parallel.
+        """
+        with self.lock:
+            slots, self.free_slots = self.free_slots, []
+        if not slots:
+            return
+        with ThreadPoolExecutor(max_workers=len(slots)) as executor:
+            futures = {slot: executor.submit(self.new_session, slot) for slot in slots}
+        for slot, future in futures.items():
+            try:
+                self.idle.put(future.result())
+            except Exception as err:
+                logger.error(f"Error while warming a browser session: {err}")
+                with self.lock:
+                    self.free_slots.append(slot)
+
+    def fill_slot(self) -> Optional[BrowserSession]:
+        """
+        Starts a session in a slot that has none, e.g. one that failed to warm.
+
+        Returns:
+            Optional[BrowserSession]: The new session, or None if every slot is
+            taken.
+        """
+        with self.lock:
+            if not self.free_slots:
+                return None
+            slot = self.free_slots.pop()
+        try:
+            return self.new_session(slot)
+        except Exception:
+            with self.lock:
+                self.free_slots.append(slot)
+            raise
+
+    def is_healthy(self, session: BrowserSession) -> bool:
+        """
+        Checks that a session still responds and has not outgrown its limits.
+
+        Args:
+            session (BrowserSession): The session to check.
+
+        Returns:
+            bool: True if the session can be reused, False if it must be recycled.
+        """
+        try:
+            session.driver.execute_script("return 1")
+        except Exception as err:
+            logger.warning(f"Browser session in slot {session.slot} is dead: {err}")
+            return False
+        heap = get_js_heap_size(session.driver)
+        reason = get_recycle_reason(
+            session.pages_served,
+            heap,
+            session.baseline_heap,
+            max_pages=self.max_pages,
+            max_heap_growth_mb=self.max_heap_growth_mb,
+        )
+        if reason:
+            logger.info(
+                f"Recycling slot {session.slot} ({reason}): "
+                f"heap {(heap or 0) / 1048576:.1f} MB, {session.pages_served} pages."
+            )
+            return False
+        return True
+
+    def recycle(self, session: BrowserSession) -> BrowserSession:
+        """
+        Replaces a session with a freshly warmed one in the same slot. If the
+        new session fails to start, the slot is left free for ``acquire``.
+        """
+        try:
+            session.driver.quit()
+        except Exception as err:
+            logger.warning(f"Error while quitting slot {session.slot}: {err}")
+        try:
+            return self.new_session(session.slot)
+        except Exception:
+            with self.lock:
+                self.free_slots.append(session.slot)
+            raise
+
+    def acquire(self, timeout: Optional[float] = None) -> BrowserSession:
+        """
+        Hands out a healthy warm session, recycling it first if needed.
+
+        Without an idle session, a slot that failed to warm or recycle is
+        refilled; only when every slot is checked out does it wait.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for an idle session.
+
+        Returns:
+            BrowserSession: A session ready to crawl.
+
+        Raises:
+            queue.Empty: If no session became idle within ``timeout``.
+        """
+        try:
+            session = self.idle.get_nowait()
+        except queue.Empty:
+            session = self.fill_slot()
+            if session is None:
+                session = self.idle.get(timeout=timeout)
+        if not self.is_healthy(session):
+            session = self.recycle(session)
+        return session
+
+    def release(self, session: BrowserSession, pages: int = 0) -> None:
+        """
+        Returns a session to the pool.
+
+        Args:
+            session (BrowserSession): The session to return.
+            pages (int): The number of pages loaded while it was checked out.
+        """
+        session.pages_served += pages
+        if self.closed:
+            session.driver.quit()
+            return
+        self.idle.put(session)
+
+    def close(self) -> None:
+        """
+        Quits every idle session and stops the shared chromedriver.
+        """
+        self.closed = True
+        sessions: List[BrowserSession] = []
+        while not self.idle.empty():
+            sessions.append(self.idle.get_nowait())
+        for session in sessions:
+            try:
+                session.driver.quit()
+            except Exception as err:
+                logger.warning(f"Error while quitting slot {session.slot}: {err}")
+        if self.service:
+            self.service.stop()
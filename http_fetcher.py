@@ -0,0 +1,88 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+from constants import AmazonRequestConstants
+from log_handler import logger
+from page_classifier import PageKind, classify_page
+from typing import Optional
+
+
+class HttpFetcher:
+    """
+    Fetches search result pages over a pooled keep-alive HTTP session.
+
+    The session replays the Chrome headers and cookie jar from the constants,
+    so most result pages can be pulled without starting a browser at all.
+    """
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=Config.HTTP_POOL_SIZE,
+            pool_maxsize=Config.HTTP_POOL_SIZE,
+            # Robot checks come back as 503s, so 503 is never retried blindly:
+            # fetch classifies the body and rotates the identity instead. The
+            # last response is returned rather than raised once retries run out.
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(AmazonRequestConstants.headers.value)
+        for name, value in AmazonRequestConstants.cookies.value.items():
+            self.session.cookies.set(name, value, domain=".amazon.com", path="/")
+        self.last_kind: Optional[PageKind] = None
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Fetches a page, returning None if it failed or was blocked.
+
+        The page's classification is left in ``last_kind``.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            Optional[str]: The page HTML, or None if the browser should be used.
+        """
+        self.last_kind = None
+        try:
+            response = self.session.get(url, timeout=Config.HTTP_TIMEOUT)
+        except requests.RequestException as err:
+            logger.warning(f"Error while fetching {url} over HTTP: {err}")
+            return None
+
+        self.last_kind = classify_page(response.text)
+        if self.last_kind.is_block:
+            logger.warning(f"HTTP fetch of {url} hit a {self.last_kind.value} page.")
+            return None
+        if response.status_code != 200:
+            logger.warning(f"HTTP fetch of {url} returned {response.status_code}.")
+            return None
+        logger.info(f"Fetched {url} over HTTP ({len(response.content) / 1024:.1f} KiB).")
+        return response.text
+
+    def rotate_identity(self, user_agent: str) -> None:
+        """
+        Drops the session's cookies and switches to another user agent.
+
+        The Chrome client hints are dropped too, since they would contradict
+        the new user agent.
+
+        Args:
+            user_agent (str): The user agent to send from now on.
+        """
+        self.session.cookies.clear()
+        for header in list(self.session.headers):
+            if header.lower().startswith("sec-ch-"):
+                del self.session.headers[header]
+        self.session.headers["user-agent"] = user_agent
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from airtable_manager import AirTableManager
+from config import Config
+from log_handler import logger
+from normalization import parse_price_cents, parse_rating
+from typing import List, Optional
+
+
+class LocalTableMirror:
+    """
+    A local SQLite mirror of the Airtable table with secondary indexes.
+
+    Lookups by price, price range, rating and name are answered from indexed
+    columns on disk instead of formula scans over the network. ``sync`` pulls
+    only the records modified since the previous sync.
+    """
+
+    def __init__(self, path: str = Config.LOCAL_MIRROR_PATH) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                record_id TEXT PRIMARY KEY,
+                product_id TEXT,
+                product_name TEXT COLLATE NOCASE,
+                product_price TEXT,
+                price_cents INTEGER,
+                rating REAL,
+                fields TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS records_product_id ON records (product_id);
+            CREATE INDEX IF NOT EXISTS records_product_price ON records (product_price);
+            CREATE INDEX IF NOT EXISTS records_price_cents ON records (price_cents);
+            CREATE INDEX IF NOT EXISTS records_rating ON records (rating);
+            CREATE INDEX IF NOT EXISTS records_product_name ON records (product_name);
+            CREATE TABLE IF NOT EXISTS sync_state (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self.connection.commit()
+        self.lock = threading.Lock()
+
+    def get_last_sync(self) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT value FROM sync_state WHERE name = 'last_sync'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def sync(
+        self, manager: Optional[AirTableManager] = None, full: bool = False
+    ) -> int:
+        """
+        Pulls records modified since the last sync, or the whole table.
+
+        A full sync also drops local records that no longer exist in Airtable.
+
+        Args:
+            manager (Optional[AirTableManager]): The Airtable connection to use.
+            full (bool): Whether to re-pull the whole table.
+
+        Returns:
+            int: The number of records pulled.
+        """
+        manager = manager or AirTableManager()
+        # Overlap the window slightly so clock skew never skips a record.
+        started_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        last_sync = None if full else self.get_last_sync()
+        formula = None
+        if last_sync:
+            formula = f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{last_sync}'))"
+
+        logger.info(f"Syncing the local mirror since {last_sync or 'the beginning'}.")
+        records = manager.request_with_retry(
+            lambda: manager.table.all(formula=formula)
+        )
+        rows = [
+            (
+                record["id"],
+                record["fields"].get("product id"),
+                record["fields"].get("product name"),
+                record["fields"].get("product price"),
+                record["fields"].get("price cents")
+                or parse_price_cents(record["fields"].get("product price")),
+                record["fields"].get("rating")
+                or parse_rating(record["fields"].get("product rating")),
+                json.dumps(record["fields"]),
+            )
+            for record in records
+        ]
+        with self.lock:
+            if full:
+                self.connection.execute("DELETE FROM records")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES ('last_sync', ?)",
+                (started_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),),
+            )
+            self.connection.commit()
+        logger.info(f"Synced {len(rows)} records into the local mirror.")
+        return len(rows)
+
+    def query(
+        self, where: str, params: tuple, limit: Optional[int] = None
+    ) -> List[dict]:
+        sql = f"SELECT fields FROM records WHERE {where}"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self.lock:
+            rows = self.connection.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def fetch_data(self, product_price: str) -> List[dict]:
+        """
+        Fetch all records where 'product price' matches the given value.
+        """
+        return self.query("product_price = ?", (product_price,))
+
+    def fetch_one(self, product_price: str) -> Optional[dict]:
+        """
+        Fetch the first record where 'product price' matches the given value.
+        Returns the fields dict or None if not found.
+        """
+        records = self.query("product_price = ?", (product_price,), limit=1)
+        return records[0] if records else None
+
+    def fetch_price_range(self, min_price: float, max_price: float) -> List[dict]:
+        """
+        Fetch all records priced between two dollar amounts, inclusive.
+        """
+        return self.query(
+            "price_cents BETWEEN ? AND ? ORDER BY price_cents",
+            (round(min_price * 100), round(max_price * 100)),
+        )
+
+    def fetch_min_rating(self, min_rating: float) -> List[dict]:
+        """
+        Fetch all records rated at least ``min_rating`` stars.
+        """
+        return self.query("rating >= ? ORDER BY rating DESC", (min_rating,))
+
+    def fetch_name_prefix(self, prefix: str) -> List[dict]:
+        """
+        Fetch all records whose product name starts with ``prefix``, ignoring case.
+        """
+        # A range scan on the NOCASE column uses its index, unlike LIKE ... ESCAPE.
+        return self.query(
+            "product_name >= ? AND product_name < ? ORDER BY product_name",
+            (prefix, prefix + chr(0x10FFFF)),
+        )
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Airtable mirror")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser("sync", help="pull modified records")
+    sync_parser.add_argument("--full", action="store_true", help="re-pull everything")
+    range_parser = subparsers.add_parser("price-range", help="query by price")
+    range_parser.add_argument("min_price", type=float)
+    range_parser.add_argument("max_price", type=float)
+    args = parser.parse_args()
+
+    mirror = LocalTableMirror()
+    if args.command == "sync":
+        mirror.sync(full=args.full)
+    else:
+        results = mirror.fetch_price_range(args.min_price, args.max_price)
+        logger.info(f"Fetched {len(results)} records: {results}")
+    mirror.close()
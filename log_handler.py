@@ -1,4 +1,5 @@
 from loguru import logger
+from config import Config
 import sys
 import os
 
@@ -7,19 +8,27 @@ LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
 
+# Production crawls hand records to a background thread instead of blocking on
+# I/O, keep DEBUG out of the file and skip the costly exception introspection.
+PRODUCTION = Config.LOG_MODE == "production"
+
 logger.remove()  # Remove default logger
 logger.add(
     sys.stdout,
     level="INFO",
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level}</level> | <cyan>{module}</cyan>:<cyan>{function}</cyan> - <level>{message}</level>",
+    enqueue=PRODUCTION,
+    diagnose=not PRODUCTION,
 )
 logger.add(
     LOG_FILE,
     rotation="1 week",
     retention="4 weeks",
-    level="DEBUG",
+    level="INFO" if PRODUCTION else "DEBUG",
     encoding="utf-8",
     format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {module}:{function} - {message}",
+    enqueue=PRODUCTION,
+    diagnose=not PRODUCTION,
 )
 
 # Usage example:
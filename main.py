@@ -1,9 +1,95 @@
+import argparse
+import time
+from async_pipeline import main as pipeline_executer
 from complete_carwler import main as main_executer
+from crawler_pool import main as pool_executer
+from config import Config
+from driver_pool import DriverPool
+from log_handler import logger
+from metrics import metrics, start_metrics_server
+from work_queue import main as queue_executer
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Amazon product crawler")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="number of parallel Chromium workers, or of page fetchers with "
+        "--pipeline (default: CRAWLER_WORKERS, or PIPELINE_FETCH_WORKERS)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap fetching, parsing, validation and upserts with asyncio stages",
+    )
+    parser.add_argument(
+        "--warm-pool",
+        action="store_true",
+        help="keep pre-warmed browser sessions on one long-lived chromedriver",
+    )
+    parser.add_argument(
+        "--every",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="stay alive and re-run the crawl every SECONDS, reusing warm sessions",
+    )
+    parser.add_argument(
+        "--role",
+        choices=["standalone", "coordinator", "worker"],
+        default=Config.CRAWLER_ROLE,
+        help="coordinator seeds the shared work queue (WORK_QUEUE_URL) and waits; "
+        "workers in any number of containers crawl it (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=Config.METRICS_PORT,
+        help="serve Prometheus metrics on this port (default: disabled)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default=Config.METRICS_HOST,
+        help="address the metrics endpoint binds to (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    if args.workers is None:
+        if args.pipeline and args.role == "standalone":
+            args.workers = Config.PIPELINE_FETCH_WORKERS
+        else:
+            args.workers = Config.CRAWLER_WORKERS
+
     print("Starting The Craweler for Amazon products...")
-    main_executer()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port, host=args.metrics_host)
+    driver_pool = None
+    if (args.warm_pool or args.every) and args.role != "coordinator":
+        driver_pool = DriverPool(size=args.workers)
+        driver_pool.warm()
+
+    try:
+        while True:
+            started = time.monotonic()
+            if args.role != "standalone":
+                queue_executer(
+                    role=args.role, workers=args.workers, driver_pool=driver_pool
+                )
+            elif args.pipeline:
+                pipeline_executer(workers=args.workers, driver_pool=driver_pool)
+            elif args.workers > 1:
+                pool_executer(workers=args.workers, driver_pool=driver_pool)
+            else:
+                main_executer(driver_pool=driver_pool)
+            metrics.log_summary()
+            if not args.every:
+                break
+            idle = max(0.0, args.every - (time.monotonic() - started))
+            logger.info(f"Crawl finished, next run in {idle:.0f}s.")
+            time.sleep(idle)
+    finally:
+        if driver_pool:
+            driver_pool.close()
 
 
 if __name__ == "__main__":
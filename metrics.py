@@ -0,0 +1,289 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from log_handler import logger
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+# Samples kept per histogram series for the end-of-run percentiles.
+MAX_SAMPLES = 10000
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def format_labels(labels: LabelKey) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[LabelKey, float] = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series: Dict[LabelKey, dict] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                    "samples": [],
+                }
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+            if len(series["samples"]) < MAX_SAMPLES:
+                series["samples"].append(value)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    labels = format_labels(key + (("le", str(bound)),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = format_labels(key + (("le", "+Inf"),))
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                lines.append(f"{self.name}_sum{format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{format_labels(key)} {series['count']}")
+        return lines
+
+    def summary(self) -> List[str]:
+        lines = []
+        with self.lock:
+            for key, series in sorted(self.series.items()):
+                samples = series["samples"]
+                if not samples:
+                    continue
+                lines.append(
+                    f"{self.name}{format_labels(key)}: n={series['count']} "
+                    f"total={series['sum']:.2f}s "
+                    f"p50={percentile(samples, 0.5) * 1000:.1f}ms "
+                    f"p95={percentile(samples, 0.95) * 1000:.1f}ms"
+                )
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the crawler's counters, gauges and per-stage latency histograms.
+    """
+
+    def __init__(self) -> None:
+        self.stage_seconds = Histogram(
+            "crawler_stage_seconds", "Time spent per crawl stage."
+        )
+        self.pages = Counter("crawler_pages_total", "Result pages crawled.")
+        self.cards = Counter("crawler_cards_total", "Product cards extracted.")
+        self.validation_failures = Counter(
+            "crawler_validation_failures_total", "Cards that failed validation."
+        )
+        self.upserted = Counter(
+            "crawler_upserted_records_total", "Records upserted to Airtable."
+        )
+        self.upsert_retries = Counter(
+            "crawler_upsert_retries_total", "Airtable requests retried."
+        )
+        self.page_kinds = Counter(
+            "crawler_page_kinds_total", "Loaded pages by classification."
+        )
+        self.details = Counter(
+            "crawler_details_total", "Product details fetched, cached or failed."
+        )
+        self.wait_saved = Counter(
+            "crawler_wait_saved_seconds_total",
+            "Idle time adaptive waits saved over fixed sleeps.",
+        )
+        self.driver_memory = Gauge(
+            "crawler_driver_js_heap_bytes", "Used JS heap of the browser renderer."
+        )
+        self.driver_rss = Gauge(
+            "crawler_driver_rss_bytes", "Resident memory of the browser processes."
+        )
+        self.driver_recycles = Counter(
+            "crawler_driver_recycles_total", "Browsers restarted mid-crawl."
+        )
+        self.stage_errors = Counter(
+            "crawler_stage_errors_total", "Pipeline items a stage failed on."
+        )
+        self.started_at = time.monotonic()
+
+    @property
+    def families(self) -> list:
+        return [
+            self.stage_seconds,
+            self.pages,
+            self.cards,
+            self.validation_failures,
+            self.upserted,
+            self.upsert_retries,
+            self.page_kinds,
+            self.details,
+            self.wait_saved,
+            self.driver_memory,
+            self.driver_rss,
+            self.driver_recycles,
+            self.stage_errors,
+        ]
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """
+        Times the wrapped block into the ``crawler_stage_seconds`` histogram.
+
+        Args:
+            stage (str): The stage label, e.g. "page_load" or "upsert".
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_seconds.observe(time.perf_counter() - started, stage=stage)
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Sleeps while recording the idle time as the "sleep" stage.
+        """
+        with self.timed("sleep"):
+            time.sleep(seconds)
+
+    def reset(self) -> None:
+        """
+        Drops every recorded value, e.g. between benchmark runs.
+        """
+        for family in self.families:
+            with family.lock:
+                if isinstance(family, Histogram):
+                    family.series.clear()
+                else:
+                    family.values.clear()
+        self.started_at = time.monotonic()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for family in self.families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+    def log_summary(self) -> None:
+        """
+        Logs per-stage latencies and totals at the end of a run.
+        """
+        elapsed = time.monotonic() - self.started_at
+        logger.info(f"Run metrics after {elapsed:.1f}s:")
+        for line in self.stage_seconds.summary():
+            logger.info(f"  {line}")
+        for family in self.families[1:]:
+            for line in family.render()[2:]:
+                logger.info(f"  {line}")
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def start_metrics_server(
+    port: int, host: str = "127.0.0.1"
+) -> Optional[ThreadingHTTPServer]:
+    """
+    Serves the metrics in the Prometheus text format on a background thread.
+
+    Args:
+        port (int): The port to listen on.
+        host (str): The address to bind to; loopback only by default.
+
+    Returns:
+        Optional[ThreadingHTTPServer]: The server, or None if it could not start.
+    """
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as err:
+        logger.error(f"Error while starting the metrics endpoint: {err}")
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+metrics = MetricsRegistry()
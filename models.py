@@ -1,9 +1,74 @@
-from pydantic import BaseModel
+from pydantic import Field, TypeAdapter, ValidationError
+from typing import List, Optional, Tuple
+from typing_extensions import Annotated, NotRequired, TypedDict
 
 
-class ValidateData(BaseModel):
-    product_id: str
-    product_name: str
-    product_price: str
-    product_rating: str
-    image_url: str
+# The product schema, keyed by sink column name and read from the raw extracted
+# keys, so a batch validates straight into output dicts without building a
+# model per record.
+ProductRecord = TypedDict(
+    "ProductRecord",
+    {
+        "product id": Annotated[str, Field(validation_alias="Product_id")],
+        "product name": Annotated[str, Field(validation_alias="Product Name")],
+        "product price": Annotated[str, Field(validation_alias="Product Price")],
+        "product rating": Annotated[str, Field(validation_alias="Product_rating")],
+        "image url": Annotated[str, Field(validation_alias="Image_URL")],
+        "asin": NotRequired[Annotated[Optional[str], Field(validation_alias="ASIN")]],
+        "price cents": NotRequired[
+            Annotated[Optional[int], Field(validation_alias="Price Cents")]
+        ],
+        "currency": NotRequired[
+            Annotated[Optional[str], Field(validation_alias="Currency")]
+        ],
+        "rating": NotRequired[
+            Annotated[Optional[float], Field(validation_alias="Rating")]
+        ],
+        "review count": NotRequired[
+            Annotated[Optional[int], Field(validation_alias="Review Count")]
+        ],
+        "product url": NotRequired[
+            Annotated[Optional[str], Field(validation_alias="product url")]
+        ],
+        "seller": NotRequired[
+            Annotated[Optional[str], Field(validation_alias="Seller")]
+        ],
+        "availability": NotRequired[
+            Annotated[Optional[str], Field(validation_alias="Availability")]
+        ],
+        "features": NotRequired[
+            Annotated[Optional[List[str]], Field(validation_alias="Features")]
+        ],
+    },
+)
+PRODUCT_RECORDS = TypeAdapter(List[ProductRecord])
+
+
+def validate_records(products: List[dict]) -> Tuple[List[dict], List[str]]:
+    """
+    Validates a batch of extracted products in one call.
+
+    If any product is invalid, the valid ones are validated again as a batch
+    without it, so one bad card does not drop or slow down the whole page.
+
+    Args:
+        products (List[dict]): The raw extracted data, e.g. one results page.
+
+    Returns:
+        Tuple[List[dict], List[str]]: The records keyed by sink column name, and
+        a description of every product that failed validation.
+    """
+    try:
+        return PRODUCT_RECORDS.validate_python(products), []
+    except ValidationError as err:
+        failed = {}
+        for error in err.errors():
+            index, *field = error["loc"]
+            failed.setdefault(index, []).append(
+                f"{'.'.join(str(part) for part in field)}: {error['msg']}"
+            )
+    valid = [product for index, product in enumerate(products) if index not in failed]
+    errors = [
+        f"record {index}: {'; '.join(messages)}" for index, messages in failed.items()
+    ]
+    return PRODUCT_RECORDS.validate_python(valid), errors
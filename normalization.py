@@ -0,0 +1,129 @@
+import re
+from typing import List, Optional
+
+PRICE_PATTERN = re.compile(r"(\d[\d,]*)(?:\.(\d{1,2}))?")
+RATING_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*out of\s*5")
+CURRENCY_PATTERN = re.compile(r"[$€£¥]|\b[A-Z]{3}\b")
+REVIEW_COUNT_PATTERN = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([KkMm])?")
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+COUNT_MULTIPLIERS = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_price_cents(product_price: Optional[str]) -> Optional[int]:
+    """
+    Converts a displayed price such as "$1,019.99" into integer cents.
+
+    Args:
+        product_price (Optional[str]): The displayed price.
+
+    Returns:
+        Optional[int]: The price in cents, or None for placeholders.
+    """
+    if not product_price:
+        return None
+    match = PRICE_PATTERN.search(product_price)
+    if not match:
+        return None
+    dollars = int(match.group(1).replace(",", ""))
+    cents = int((match.group(2) or "0").ljust(2, "0"))
+    return dollars * 100 + cents
+
+
+def parse_rating(product_rating: Optional[str]) -> Optional[float]:
+    """
+    Converts a rating such as "4.5 out of 5 stars" into a float.
+
+    Args:
+        product_rating (Optional[str]): The displayed rating text.
+
+    Returns:
+        Optional[float]: The rating, or None for placeholders.
+    """
+    if not product_rating:
+        return None
+    match = RATING_PATTERN.search(product_rating)
+    return float(match.group(1)) if match else None
+
+
+def parse_currency(product_price: Optional[str]) -> Optional[str]:
+    """
+    Reads the ISO currency code from a displayed price such as "$19.99".
+
+    Args:
+        product_price (Optional[str]): The displayed price.
+
+    Returns:
+        Optional[str]: The currency code, e.g. "USD", or None if none is shown.
+    """
+    if not product_price:
+        return None
+    match = CURRENCY_PATTERN.search(product_price)
+    if not match:
+        return None
+    return CURRENCY_SYMBOLS.get(match.group(0), match.group(0))
+
+
+def parse_review_count(review_count: Optional[str]) -> Optional[int]:
+    """
+    Converts a review count such as "1,234" or "(12.3K)" into an integer.
+
+    Args:
+        review_count (Optional[str]): The displayed review count.
+
+    Returns:
+        Optional[int]: The number of reviews, or None for placeholders.
+    """
+    if not review_count:
+        return None
+    match = REVIEW_COUNT_PATTERN.search(review_count)
+    if not match:
+        return None
+    multiplier = COUNT_MULTIPLIERS.get((match.group(2) or "").lower(), 1)
+    return round(float(match.group(1).replace(",", "")) * multiplier)
+
+
+def normalize_records(products: List[dict]) -> List[dict]:
+    """
+    Adds typed price, currency, rating and review count fields to a batch of
+    extracted products, so downstream code never re-parses the display strings.
+
+    Placeholders such as "Price not found!" become None.
+
+    Args:
+        products (List[dict]): The raw extracted data of a page or a run.
+
+    Returns:
+        List[dict]: The same dicts, updated in place with "Price Cents",
+        "Currency", "Rating" and "Review Count".
+    """
+    for product in products:
+        product_price = product.get("Product Price")
+        product["Price Cents"] = parse_price_cents(product_price)
+        product["Currency"] = parse_currency(product_price)
+        product["Rating"] = parse_rating(product.get("Product_rating"))
+        product["Review Count"] = parse_review_count(product.get("Review_count"))
+    return products
+
+
+def summarize_records(products: List[dict]) -> dict:
+    """
+    Computes aggregate stats over normalized products from their typed fields.
+
+    Args:
+        products (List[dict]): Products passed through ``normalize_records``.
+
+    Returns:
+        dict: Counts, price range and mean, mean rating and total reviews.
+    """
+    prices = [p["Price Cents"] for p in products if p.get("Price Cents") is not None]
+    ratings = [p["Rating"] for p in products if p.get("Rating") is not None]
+    reviews = [p["Review Count"] for p in products if p.get("Review Count")]
+    return {
+        "products": len(products),
+        "priced": len(prices),
+        "min_price_cents": min(prices, default=None),
+        "max_price_cents": max(prices, default=None),
+        "mean_price_cents": round(sum(prices) / len(prices)) if prices else None,
+        "mean_rating": round(sum(ratings) / len(ratings), 2) if ratings else None,
+        "total_reviews": sum(reviews),
+    }
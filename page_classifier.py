@@ -0,0 +1,101 @@
+import threading
+from enum import Enum
+from config import Config
+from constants import AmazonRequestConstants
+from log_handler import logger
+from metrics import metrics
+
+
+class PageKind(Enum):
+    RESULTS = "results"
+    CAPTCHA = "captcha"
+    DOG_PAGE = "dog_page"
+    EMPTY = "empty"
+
+    @property
+    def is_block(self) -> bool:
+        return self in (PageKind.CAPTCHA, PageKind.DOG_PAGE)
+
+
+class PageBlockedError(Exception):
+    """
+    Raised when a page stays blocked after every session rotation, so the
+    unit is left unfinished instead of being mistaken for the end of a category.
+    """
+
+
+def classify_page(page_source: str) -> PageKind:
+    """
+    Tells a results page apart from a captcha, a dog page or an empty page.
+
+    Args:
+        page_source (str): The HTML of the loaded page.
+
+    Returns:
+        PageKind: What the page is.
+    """
+    if any(
+        marker in page_source
+        for marker in AmazonRequestConstants.bot_wall_markers.value
+    ):
+        return PageKind.CAPTCHA
+    if any(
+        marker in page_source
+        for marker in AmazonRequestConstants.dog_page_markers.value
+    ):
+        return PageKind.DOG_PAGE
+    if any(
+        marker in page_source
+        for marker in AmazonRequestConstants.results_markers.value
+    ):
+        return PageKind.RESULTS
+    return PageKind.EMPTY
+
+
+class AdaptiveThrottle:
+    """
+    Spaces out one worker's page loads according to how often it gets blocked.
+
+    Every block doubles the delay (starting from ``min_step``, capped at
+    ``max_delay``); every clean page shrinks it by ``decay``. The smoothed
+    block rate is kept for logging.
+    """
+
+    def __init__(
+        self,
+        min_step: float = Config.THROTTLE_MIN_STEP,
+        max_delay: float = Config.THROTTLE_MAX_DELAY,
+        decay: float = Config.THROTTLE_DECAY,
+    ) -> None:
+        self.min_step = min_step
+        self.max_delay = max_delay
+        self.decay = decay
+        self.delay = 0.0
+        self.block_rate = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self) -> None:
+        """
+        Sleeps for the current delay before the next page load.
+        """
+        if self.delay >= 0.01:
+            metrics.sleep(self.delay)
+
+    def record(self, kind: PageKind) -> None:
+        """
+        Adjusts the delay after a page load.
+
+        Args:
+            kind (PageKind): How the loaded page was classified.
+        """
+        metrics.page_kinds.inc(kind=kind.value)
+        with self.lock:
+            self.block_rate = 0.9 * self.block_rate + 0.1 * kind.is_block
+            if kind.is_block:
+                self.delay = min(self.max_delay, max(self.min_step, self.delay * 2))
+                logger.warning(
+                    f"Hit a {kind.value} page; throttling to {self.delay:.1f}s "
+                    f"between pages (block rate {self.block_rate:.0%})."
+                )
+            else:
+                self.delay *= self.decay
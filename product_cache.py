@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from config import Config
+from log_handler import logger
+from typing import Dict, List
+
+
+class ProductCache:
+    """
+    Remembers the last content hash written for every product key.
+
+    Records whose name, price and rating are unchanged since the last
+    successful write are skipped, so reruns only send real changes downstream.
+    """
+
+    HASHED_FIELDS = ("product name", "product price", "product rating")
+
+    def __init__(self, path: str = Config.PRODUCT_CACHE_PATH) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            "product_key TEXT PRIMARY KEY, content_hash TEXT NOT NULL, "
+            "last_seen REAL NOT NULL)"
+        )
+        self.connection.commit()
+        self.lock = threading.Lock()
+        # Hashes of records accepted but not yet confirmed as written.
+        self.pending: Dict[str, str] = {}
+        self.skipped = 0
+
+    @classmethod
+    def content_hash(cls, record: dict) -> str:
+        """
+        Hashes the fields whose change should trigger a write.
+
+        Args:
+            record (dict): The record keyed by Airtable column name.
+
+        Returns:
+            str: The hex digest of the hashed fields.
+        """
+        payload = json.dumps([record.get(field) for field in cls.HASHED_FIELDS])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def is_changed(self, record: dict) -> bool:
+        """
+        Checks whether a record is new or differs from its last written version.
+
+        Args:
+            record (dict): The record keyed by Airtable column name.
+
+        Returns:
+            bool: True if the record should be written, False to skip it.
+        """
+        key = record["product id"]
+        content_hash = self.content_hash(record)
+        with self.lock:
+            if self.pending.get(key) == content_hash:
+                self.skipped += 1
+                return False
+            row = self.connection.execute(
+                "SELECT content_hash FROM products WHERE product_key = ?", (key,)
+            ).fetchone()
+            if row and row[0] == content_hash:
+                self.skipped += 1
+                return False
+            self.pending[key] = content_hash
+            return True
+
+    def remember(self, records: List[dict]) -> None:
+        """
+        Stores the content hashes of records that were written successfully.
+
+        Args:
+            records (List[dict]): The written records keyed by Airtable column name.
+        """
+        now = time.time()
+        rows = [
+            (record["product id"], self.content_hash(record), now)
+            for record in records
+        ]
+        with self.lock:
+            try:
+                self.connection.executemany(
+                    "INSERT INTO products (product_key, content_hash, last_seen) "
+                    "VALUES (?, ?, ?) ON CONFLICT(product_key) DO UPDATE SET "
+                    "content_hash = excluded.content_hash, last_seen = excluded.last_seen",
+                    rows,
+                )
+                self.connection.commit()
+            except sqlite3.Error as err:
+                logger.error(f"Error while updating the product cache: {err}")
+            for key, _, _ in rows:
+                self.pending.pop(key, None)
+
+    def forget(self, records: List[dict]) -> None:
+        """
+        Drops pending hashes of records whose write failed, so they are retried.
+
+        Args:
+            records (List[dict]): The failed records keyed by Airtable column name.
+        """
+        with self.lock:
+            for record in records:
+                self.pending.pop(record["product id"], None)
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,310 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urljoin, urlsplit
+from lxml import html as lxml_html
+from card_parser import CardParser
+from complete_carwler import AmazonCrawler
+from config import Config
+from constants import AmazonRequestConstants
+from http_fetcher import HttpFetcher
+from log_handler import logger
+from search_urls import amazon_url
+from sinks import NullSink
+from typing import Dict, Iterable, Optional
+
+MANIFEST_NAME = "manifest.json"
+ASSET_XPATH = "//img/@src | //script/@src | //link[@rel='stylesheet']/@href"
+# Served for "/" when no home page was recorded, so search-box navigation works.
+STUB_HOME_PAGE = (
+    "<html><head><title>Amazon.com (replay)</title></head><body>"
+    '<form action="/s" method="get">'
+    '<input id="twotabsearchtextbox" name="k" type="text">'
+    '<input id="nav-search-submit-button" type="submit" value="Go">'
+    "</form></body></html>"
+)
+# Served for pages past the recording, which ends pagination like a real empty page.
+EMPTY_RESULTS_PAGE = "<html><head><title>Amazon.com</title></head><body></body></html>"
+
+
+def page_key(category: str, page: int) -> str:
+    return f"{category}|{page}"
+
+
+class FixtureRecorder:
+    """
+    Saves live search result pages, and optionally their assets, as fixtures.
+
+    Pages are fetched with the configured engine through ``AmazonCrawler`` and
+    stored under ``pages/``; images, scripts and stylesheets go to ``assets/``
+    and the HTML is rewritten to point at them, so a replay never leaves the
+    machine. ``manifest.json`` maps each (category, page) to its file.
+    """
+
+    def __init__(self, fixture_dir: str, with_assets: bool = True) -> None:
+        self.fixture_dir = fixture_dir
+        self.with_assets = with_assets
+        os.makedirs(os.path.join(fixture_dir, "pages"), exist_ok=True)
+        os.makedirs(os.path.join(fixture_dir, "assets"), exist_ok=True)
+        self.manifest = self.load_manifest()
+        self.asset_fetcher: Optional[HttpFetcher] = None
+        self.recorded_assets: Dict[str, str] = {}
+
+    def load_manifest(self) -> dict:
+        path = os.path.join(self.fixture_dir, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        return {"home": None, "pages": {}}
+
+    def save_manifest(self) -> None:
+        path = os.path.join(self.fixture_dir, MANIFEST_NAME)
+        with open(path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=2, sort_keys=True)
+
+    def save_asset(self, url: str) -> Optional[str]:
+        """
+        Downloads one asset into the fixture, once per URL.
+
+        Args:
+            url (str): The absolute asset URL.
+
+        Returns:
+            Optional[str]: The local path the page should reference, or None.
+        """
+        if url in self.recorded_assets:
+            return self.recorded_assets[url]
+        if self.asset_fetcher is None:
+            self.asset_fetcher = HttpFetcher()
+        try:
+            response = self.asset_fetcher.session.get(url, timeout=Config.HTTP_TIMEOUT)
+            response.raise_for_status()
+        except Exception as err:
+            logger.warning(f"Error while recording asset {url}: {err}")
+            return None
+        extension = os.path.splitext(urlsplit(url).path)[1][:8]
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + extension
+        with open(os.path.join(self.fixture_dir, "assets", name), "wb") as asset:
+            asset.write(response.content)
+        self.recorded_assets[url] = f"/assets/{name}"
+        return self.recorded_assets[url]
+
+    def localize_assets(self, page_source: str, page_url: str) -> str:
+        """
+        Records the assets a page references and rewrites it to use the copies.
+        """
+        try:
+            references = set(lxml_html.fromstring(page_source).xpath(ASSET_XPATH))
+        except Exception as err:
+            logger.warning(f"Error while collecting assets of {page_url}: {err}")
+            return page_source
+        for reference in references:
+            if reference.startswith("data:"):
+                continue
+            local_path = self.save_asset(urljoin(page_url, reference))
+            if local_path:
+                page_source = page_source.replace(
+                    f'"{html.escape(reference)}"', f'"{local_path}"'
+                ).replace(f'"{reference}"', f'"{local_path}"')
+        return page_source
+
+    def write_page(self, name: str, page_source: str, page_url: str) -> str:
+        if self.with_assets:
+            page_source = self.localize_assets(page_source, page_url)
+        relative_path = os.path.join("pages", name)
+        with open(
+            os.path.join(self.fixture_dir, relative_path), "w", encoding="utf-8"
+        ) as page_file:
+            page_file.write(page_source)
+        return relative_path
+
+    def record(self, categories: Iterable[str], max_pages: int) -> int:
+        """
+        Records up to ``max_pages`` result pages for each category.
+
+        Args:
+            categories (Iterable[str]): The search terms to record.
+            max_pages (int): The number of pages to record per category.
+
+        Returns:
+            int: The number of pages recorded.
+        """
+        crawler = AmazonCrawler(sink=NullSink())
+        card_parser = CardParser()
+        recorded = 0
+        try:
+            if not crawler.http_fetcher:
+                crawler.ensure_driver()
+                crawler.load_url(amazon_url())
+                self.manifest["home"] = self.write_page(
+                    "home.html", crawler.get_page_source(), amazon_url()
+                )
+            for category in categories:
+                for page in range(1, max_pages + 1):
+                    page_source = crawler.fetch_search_page(category, page)
+                    if page_source is None:
+                        logger.warning(f"No results to record for {category} p{page}.")
+                        break
+                    digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:10]
+                    self.manifest["pages"][page_key(category, page)] = self.write_page(
+                        f"{digest}-{page:03d}.html",
+                        page_source,
+                        amazon_url("/s"),
+                    )
+                    self.save_manifest()
+                    recorded += 1
+                    logger.info(f"Recorded {category} page {page}.")
+                    _, has_next = card_parser.parse_results_page(page_source)
+                    if not has_next:
+                        break
+        finally:
+            crawler.close()
+            if self.asset_fetcher:
+                self.asset_fetcher.close()
+        self.save_manifest()
+        logger.info(
+            f"Recorded {recorded} pages and {len(self.recorded_assets)} assets "
+            f"into {self.fixture_dir}."
+        )
+        return recorded
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server: "ReplayServer"
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path.startswith("/assets/"):
+            self.send_file(os.path.basename(url.path), "assets")
+            return
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        manifest = self.server.manifest
+        if url.path in ("", "/"):
+            home = manifest.get("home")
+            if home:
+                self.send_file(home)
+            else:
+                self.send_body(STUB_HOME_PAGE.encode("utf-8"))
+            return
+        if url.path == "/s":
+            query = parse_qs(url.query)
+            category = query.get("k", [""])[0]
+            page = int(query.get("page", ["1"])[0])
+            path = manifest["pages"].get(page_key(category, page))
+            if path:
+                self.send_file(path)
+            else:
+                self.send_body(EMPTY_RESULTS_PAGE.encode("utf-8"))
+            return
+        self.send_error(404)
+
+    def send_file(self, relative_path: str, directory: str = "") -> None:
+        path = os.path.join(self.server.fixture_dir, directory, relative_path)
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as fixture:
+            body = fixture.read()
+        content_type = "text/html; charset=utf-8" if path.endswith(".html") else None
+        self.send_body(body, content_type)
+
+    def send_body(self, body: bytes, content_type: Optional[str] = None) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type or "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Serves recorded fixtures on localhost as if it were amazon.com.
+
+    Search URLs are matched on their ``k`` and ``page`` parameters only, so the
+    extra parameters the search box and "Next" links add do not matter.
+    Unrecorded pages come back empty, which ends pagination.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixture_dir: str, port: int = 0, latency: float = 0) -> None:
+        with open(os.path.join(fixture_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        super().__init__(("127.0.0.1", port), ReplayHandler)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def categories(self) -> list:
+        categories = []
+        for key in self.manifest["pages"]:
+            category = key.rsplit("|", 1)[0]
+            if category not in categories:
+                categories.append(category)
+        return categories
+
+    def start(self) -> str:
+        """
+        Starts serving on a background thread.
+
+        Returns:
+            str: The base URL to set as ``Config.AMAZON_BASE_URL``.
+        """
+        threading.Thread(target=self.serve_forever, name="replay", daemon=True).start()
+        logger.info(f"Replaying {self.fixture_dir} on {self.base_url}")
+        return self.base_url
+
+    def close(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record and replay result pages")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="save live result pages")
+    record_parser.add_argument("fixture_dir")
+    record_parser.add_argument("--pages", type=int, default=3, help="pages per category")
+    record_parser.add_argument(
+        "--no-assets", action="store_true", help="only save the HTML"
+    )
+    record_parser.add_argument(
+        "--category", action="append", help="category to record (default: all)"
+    )
+    serve_parser = subparsers.add_parser("serve", help="serve recorded pages")
+    serve_parser.add_argument("fixture_dir")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument(
+        "--latency", type=float, default=0, help="seconds added to every page"
+    )
+    args = parser.parse_args()
+
+    if args.command == "record":
+        categories = (
+            args.category or AmazonRequestConstants.categories_to_process.value
+        )
+        FixtureRecorder(args.fixture_dir, with_assets=not args.no_assets).record(
+            categories, args.pages
+        )
+    else:
+        server = ReplayServer(args.fixture_dir, port=args.port, latency=args.latency)
+        logger.info(
+            f"Run the crawler with AMAZON_BASE_URL={server.base_url} to replay."
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
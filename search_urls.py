@@ -0,0 +1,54 @@
+from urllib.parse import urlencode
+from config import Config
+from typing import Iterable, List, Tuple
+
+
+def amazon_url(path: str = "/") -> str:
+    """
+    Joins a path onto the configured Amazon origin.
+
+    Args:
+        path (str): The absolute path, e.g. "/s".
+
+    Returns:
+        str: The URL under ``Config.AMAZON_BASE_URL``.
+    """
+    return Config.AMAZON_BASE_URL.rstrip("/") + path
+
+
+def build_search_url(category: str, page: int = 1) -> str:
+    """
+    Builds the URL of one search results page, as the search box would.
+
+    Args:
+        category (str): The search term.
+        page (int): The 1-based results page number.
+
+    Returns:
+        str: The absolute search URL.
+    """
+    params = {"k": category}
+    if page > 1:
+        params["page"] = page
+    return f"{amazon_url('/s')}?{urlencode(params)}"
+
+
+def build_work_units(
+    categories: Iterable[str], max_pages: int
+) -> List[Tuple[str, int]]:
+    """
+    Expands categories into (category, page) units for pages 1..max_pages.
+
+    Args:
+        categories (Iterable[str]): The categories to crawl.
+        max_pages (int): The number of result pages to schedule per category.
+
+    Returns:
+        List[Tuple[str, int]]: The units, ordered page-first across categories.
+    """
+    categories = list(categories)
+    return [
+        (category, page)
+        for page in range(1, max_pages + 1)
+        for category in categories
+    ]
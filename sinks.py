@@ -0,0 +1,376 @@
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from airtable_manager import BufferedAirTableWriter
+from base_sink import BaseSink
+from config import Config
+from log_handler import logger
+from models import ProductRecord
+from typing import List, Optional, Union, get_args, get_origin, get_type_hints
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional.
+    pa = pq = None
+
+
+def ensure_parent_dir(path: str) -> None:
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+
+class NullSink(BaseSink):
+    """
+    Discards records, only counting them; useful for benchmarks.
+    """
+
+    name = "null"
+
+    def __init__(self) -> None:
+        self.written = 0
+
+    def add(self, data: dict) -> bool:
+        self.written += 1
+        return True
+
+
+class JsonlSink(BaseSink):
+    """
+    Appends one JSON object per line, fsyncing at most every ``fsync_interval``.
+
+    A crash loses at most the records since the last fsync and never leaves
+    more than one partial line at the end of the file.
+    """
+
+    name = "jsonl"
+
+    def __init__(
+        self,
+        path: str = Config.JSONL_SINK_PATH,
+        fsync_interval: float = Config.SINK_FSYNC_INTERVAL,
+    ) -> None:
+        ensure_parent_dir(path)
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        self.fsync_interval = fsync_interval
+        self.synced_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def add(self, data: dict) -> bool:
+        line = json.dumps(data, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.written += 1
+            if time.monotonic() - self.synced_at >= self.fsync_interval:
+                self.sync()
+        return True
+
+    def sync(self) -> None:
+        """
+        Flushes Python's buffer and fsyncs the file. Call with the lock held.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.synced_at = time.monotonic()
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.file.closed:
+                self.sync()
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file.closed:
+                return
+            self.sync()
+            self.file.close()
+        logger.info(f"JSONL sink closed: {self.written} records in {self.path}.")
+
+
+def build_parquet_schema() -> "pa.Schema":
+    """
+    Builds the Parquet schema from the ProductRecord fields, so every file has
+    the same columns and types whichever fields its first rows happen to carry.
+
+    Returns:
+        pa.Schema: One column per record field; only optional fields are nullable.
+    """
+    arrow_types = {str: pa.string(), int: pa.int64(), float: pa.float64()}
+    fields = []
+    for name, hint in get_type_hints(ProductRecord).items():
+        if get_origin(hint) is Union:
+            hint = next(arg for arg in get_args(hint) if arg is not type(None))
+        if get_origin(hint) is list:
+            arrow_type = pa.list_(arrow_types[get_args(hint)[0]])
+        else:
+            arrow_type = arrow_types[hint]
+        nullable = name not in ProductRecord.__required_keys__
+        fields.append(pa.field(name, arrow_type, nullable=nullable))
+    return pa.schema(fields)
+
+
+class ParquetSink(BaseSink):
+    """
+    Writes records as Parquet row groups of ``row_group_size`` rows.
+
+    Parquet files cannot be appended to, so every run writes a new file. The
+    columns follow the ProductRecord schema.
+    """
+
+    name = "parquet"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        row_group_size: int = Config.PARQUET_ROW_GROUP_SIZE,
+    ) -> None:
+        if pa is None:
+            raise ImportError("The parquet sink needs pyarrow: pip install pyarrow")
+        self.path = path or time.strftime(Config.PARQUET_SINK_PATH)
+        ensure_parent_dir(self.path)
+        self.row_group_size = row_group_size
+        self.rows: List[dict] = []
+        self.schema = build_parquet_schema()
+        self.writer = None
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def add(self, data: dict) -> bool:
+        with self.lock:
+            self.rows.append(data)
+            if len(self.rows) >= self.row_group_size:
+                self.write_row_group()
+        return True
+
+    def write_row_group(self) -> None:
+        """
+        Writes the buffered rows as one row group. Call with the lock held.
+        """
+        if not self.rows:
+            return
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, self.schema)
+        table = pa.Table.from_pylist(self.rows, schema=self.schema)
+        self.writer.write_table(table)
+        self.written += len(self.rows)
+        self.rows = []
+
+    def flush(self) -> None:
+        with self.lock:
+            self.write_row_group()
+
+    def close(self) -> None:
+        with self.lock:
+            self.write_row_group()
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+        logger.info(f"Parquet sink closed: {self.written} records in {self.path}.")
+
+
+class SqliteSink(BaseSink):
+    """
+    Upserts records into a local SQLite table, one transaction per batch.
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str = Config.SQLITE_SINK_PATH,
+        batch_size: int = Config.SQLITE_SINK_BATCH_SIZE,
+    ) -> None:
+        ensure_parent_dir(path)
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            "product_id TEXT PRIMARY KEY, fields TEXT NOT NULL, "
+            "written_at REAL NOT NULL)"
+        )
+        self.connection.commit()
+        self.batch_size = batch_size
+        self.rows: List[tuple] = []
+        self.lock = threading.Lock()
+        self.written = 0
+
+    def add(self, data: dict) -> bool:
+        row = (
+            data.get("product id"),
+            json.dumps(data, ensure_ascii=False),
+            time.time(),
+        )
+        with self.lock:
+            self.rows.append(row)
+            if len(self.rows) >= self.batch_size:
+                self.write_batch()
+        return True
+
+    def write_batch(self) -> None:
+        """
+        Commits the buffered rows in a single transaction. Call with the lock held.
+        """
+        if not self.rows:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO products VALUES (?, ?, ?)", self.rows
+            )
+        self.written += len(self.rows)
+        self.rows = []
+
+    def flush(self) -> None:
+        with self.lock:
+            self.write_batch()
+
+    def close(self) -> None:
+        with self.lock:
+            self.write_batch()
+            self.connection.close()
+        logger.info(f"SQLite sink closed: {self.written} records in {self.path}.")
+
+
+class FanOutSink(BaseSink):
+    """
+    Sends every record to several sinks; one failing sink does not stop the rest.
+    """
+
+    name = "fanout"
+
+    def __init__(self, sinks: List[BaseSink]) -> None:
+        self.sinks = sinks
+        self.errors = 0
+
+    @property
+    def failed(self) -> int:
+        return self.errors + sum(sink.failed for sink in self.sinks)
+
+    def add(self, data: dict) -> bool:
+        accepted = False
+        for sink in self.sinks:
+            try:
+                accepted = sink.add(data) or accepted
+            except Exception as err:
+                self.errors += 1
+                logger.error(f"Error while writing to the {sink.name} sink: {err}")
+        return accepted
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            try:
+                sink.flush()
+            except Exception as err:
+                self.errors += 1
+                logger.error(f"Error while flushing the {sink.name} sink: {err}")
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as err:
+                self.errors += 1
+                logger.error(f"Error while closing the {sink.name} sink: {err}")
+
+
+def close_sink(sink: BaseSink) -> bool:
+    """
+    Closes a sink, flushing what it still buffers.
+
+    Args:
+        sink (BaseSink): The sink to close.
+
+    Returns:
+        bool: True if every accepted record was written, False otherwise.
+    """
+    try:
+        sink.close()
+    except Exception as err:
+        logger.error(f"Error while closing the {sink.name} sink: {err}")
+        return False
+    if sink.failed:
+        logger.error(f"The {sink.name} sink failed to write {sink.failed} records.")
+        return False
+    return True
+
+
+SINK_TYPES = {
+    "airtable": BufferedAirTableWriter,
+    "jsonl": JsonlSink,
+    "parquet": ParquetSink,
+    "sqlite": SqliteSink,
+    "null": NullSink,
+}
+
+
+def build_sink(names: str = Config.OUTPUT_SINKS) -> BaseSink:
+    """
+    Builds the sinks named in a comma-separated list, e.g. "jsonl,airtable".
+
+    Args:
+        names (str): The sink names; see ``SINK_TYPES``.
+
+    Returns:
+        BaseSink: The single sink, or a FanOutSink over all of them.
+    """
+    sinks = []
+    for name in (name.strip() for name in names.split(",")):
+        if not name:
+            continue
+        if name not in SINK_TYPES:
+            raise ValueError(f"Unknown output sink: {name}")
+        sinks.append(SINK_TYPES[name]())
+    if not sinks:
+        raise ValueError("No output sink configured.")
+    return sinks[0] if len(sinks) == 1 else FanOutSink(sinks)
+
+
+def load_jsonl_to_airtable(path: str = Config.JSONL_SINK_PATH) -> int:
+    """
+    Bulk-loads a JSONL sink file into Airtable after a local crawl.
+
+    Later lines win over earlier ones for the same product, and records the
+    product cache has already seen unchanged are skipped.
+
+    Args:
+        path (str): The JSONL file to load.
+
+    Returns:
+        int: The number of records handed to the Airtable writer.
+    """
+    records = {}
+    with open(path, encoding="utf-8") as jsonl_file:
+        for line_number, line in enumerate(jsonl_file, start=1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed line {line_number} of {path}.")
+                continue
+            records[record.get("product id")] = record
+
+    writer = BufferedAirTableWriter()
+    try:
+        for record in records.values():
+            writer.add(record)
+    finally:
+        writer.close()
+    logger.info(f"Loaded {len(records)} records from {path} into Airtable.")
+    return len(records)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Output sink utilities")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    load_parser = subparsers.add_parser(
+        "load-airtable", help="bulk-load a JSONL sink file into Airtable"
+    )
+    load_parser.add_argument("path", nargs="?", default=Config.JSONL_SINK_PATH)
+    args = parser.parse_args()
+
+    load_jsonl_to_airtable(args.path)
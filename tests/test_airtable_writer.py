@@ -0,0 +1,149 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from airtable_manager import AirTableManager, BufferedAirTableWriter
+from config import Config
+
+
+class StubAirtable(ThreadingHTTPServer):
+    """
+    A local stand-in for the Airtable records endpoint that remembers every
+    upsert batch and answers the first ``rate_limited`` requests with a 429.
+    """
+
+    def __init__(self, rate_limited: int = 0) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.rate_limited = rate_limited
+        self.requests = 0
+        self.batches = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_PATCH(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+            if self.server.requests <= self.server.rate_limited:
+                self.reply(429, {"errors": [{"error": "RATE_LIMIT_REACHED"}]})
+                return
+            self.server.batches.append(body["records"])
+        records = [
+            {"id": f"rec{index}", "createdTime": "", "fields": record["fields"]}
+            for index, record in enumerate(body["records"])
+        ]
+        self.reply(
+            200, {"records": records, "createdRecords": [], "updatedRecords": []}
+        )
+
+    def reply(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_airtable(monkeypatch):
+    servers = []
+
+    def start(rate_limited: int = 0) -> StubAirtable:
+        server = StubAirtable(rate_limited=rate_limited)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        monkeypatch.setattr(Config, "AIRTABLE_ENDPOINT_URL", server.url)
+        monkeypatch.setattr(Config, "AIRTABLE_API_KEY", "test-key")
+        monkeypatch.setattr(Config, "AIRTABLE_BASE_ID", "appTest")
+        monkeypatch.setattr(Config, "PRODUCT_CACHE_PATH", "")
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_writer(**kwargs) -> BufferedAirTableWriter:
+    return BufferedAirTableWriter(
+        manager=AirTableManager(rate_limit=1000),
+        product_cache=None,
+        **kwargs,
+    )
+
+
+def product(index: int, price: str = "$1.00") -> dict:
+    return {
+        "product id": f"id-{index}",
+        "product name": f"Product {index}",
+        "product price": price,
+        "product rating": "4.5",
+        "image url": "",
+    }
+
+
+def test_records_are_sent_in_airtable_sized_batches(stub_airtable):
+    server = stub_airtable()
+    writer = make_writer(flush_interval=60)
+    for index in range(25):
+        writer.add(product(index))
+    writer.close()
+
+    assert sorted(len(batch) for batch in server.batches) == [5, 10, 10]
+    assert writer.written == 25
+    assert writer.failed == 0
+
+
+def test_rate_limited_batch_is_retried(stub_airtable):
+    server = stub_airtable(rate_limited=1)
+    writer = make_writer(flush_interval=60)
+    for index in range(3):
+        writer.add(product(index))
+    writer.close()
+
+    assert server.requests == 2
+    assert [len(batch) for batch in server.batches] == [3]
+    assert writer.written == 3
+
+
+def test_close_flushes_partial_batch(stub_airtable):
+    server = stub_airtable()
+    writer = make_writer(flush_interval=60)
+    for index in range(3):
+        writer.add(product(index))
+    assert server.batches == []
+
+    writer.close()
+
+    assert [len(batch) for batch in server.batches] == [3]
+    with pytest.raises(RuntimeError):
+        writer.add(product(4))
+
+
+def test_buffer_is_collapsed_by_product_id(stub_airtable):
+    server = stub_airtable()
+    writer = make_writer(flush_interval=60)
+    writer.add(product(1, price="$1.00"))
+    writer.add(product(2))
+    writer.add(product(1, price="$2.00"))
+    writer.close()
+
+    assert len(server.batches) == 1
+    assert len(server.batches[0]) == 2
+    sent = {
+        record["fields"]["product id"]: record["fields"]
+        for record in server.batches[0]
+    }
+    assert sent["id-1"]["product price"] == "$2.00"
+    assert writer.collapsed == 1
@@ -0,0 +1,83 @@
+import pytest
+
+from card_parser import CardParser, get_product_key
+from search_urls import amazon_url
+
+NEXT_LINK = (
+    '<ul><li class="s-list-item-margin-right-adjustment">'
+    '<span><a href="/s?k=widgets&page=2">Next</a></span></li></ul>'
+)
+RESULTS_PAGE = """
+<html><body>
+<div role="listitem"><div><div data-asin="B000000001">
+  <h2 aria-label="Widget One"><span>Widget One</span></h2>
+  <a class="a-link-normal s-no-outline" href="/Widget-One/dp/B000000001/ref=sr_1_1">
+    <div class="a-section aok-relative s-image-fixed-height">
+      <img class="s-image" src="https://example.com/one.jpg">
+    </div>
+  </a>
+  <span class="a-price"><span class="a-offscreen">$19.99</span></span>
+  <i data-cy="reviews-ratings-slot">
+    <span class="a-icon-alt">4.5 out of 5 stars</span>
+  </i>
+  <a href="/Widget-One/dp/B000000001#customerReviews">
+    <span class="a-size-base s-underline-text">1,234</span>
+  </a>
+</div></div></div>
+<div role="listitem"><div><div data-asin="">
+  <span>Sponsored banner</span>
+</div></div></div>
+<div role="listitem"><div><div data-asin="">
+  <h2 aria-label="Widget Two"><span>Widget Two</span></h2>
+</div></div></div>
+{next_link}
+</body></html>
+"""
+
+
+@pytest.fixture
+def parser():
+    return CardParser()
+
+
+def test_parse_results_page_extracts_named_cards(parser):
+    products, has_next = parser.parse_results_page(
+        RESULTS_PAGE.format(next_link=NEXT_LINK)
+    )
+
+    assert has_next
+    assert [product["Product Name"] for product in products] == [
+        "Widget One",
+        "Widget Two",
+    ]
+    first, second = products
+    assert first["Product_id"] == "B000000001"
+    assert first["Product Price"] == "$19.99"
+    assert first["Product_rating"] == "4.5 out of 5 stars"
+    assert first["Review_count"] == "1,234"
+    assert first["Image_URL"] == "https://example.com/one.jpg"
+    assert first["product url"] == amazon_url("/Widget-One/dp/B000000001/ref=sr_1_1")
+    assert second["Product Price"] == "Price not found!"
+    assert second["ASIN"] is None
+    assert second["Product_id"] == get_product_key(None, None, "Widget Two")
+
+
+def test_last_page_has_no_next_page(parser):
+    document = parser.load_document(RESULTS_PAGE.format(next_link=""))
+
+    assert not parser.has_next_page(document)
+    assert len(parser.parse_cards(document)) == 2
+
+
+def test_unparsable_page_yields_nothing(parser):
+    assert parser.parse_results_page("") == ([], False)
+
+
+def test_product_key_is_stable():
+    url = "https://www.amazon.com/Widget/dp/B000000002/ref=sr_1_2"
+
+    assert get_product_key(" B000000001 ", url, "Widget") == "B000000001"
+    assert get_product_key("", url, "Widget") == "B000000002"
+    assert get_product_key(None, "https://example.com/w", None) == get_product_key(
+        None, "https://example.com/w", "Other name"
+    )
@@ -0,0 +1,43 @@
+import pytest
+
+from crawl_state import CrawlStateStore, UnitClaim
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CrawlStateStore(str(tmp_path / "crawl_state.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_claim_reports_leased_and_finished_units(store):
+    assert store.claim_unit("shoes", 1, "host-a:1") is UnitClaim.CLAIMED
+    assert store.claim_unit("shoes", 1, "host-b:1") is UnitClaim.LEASED
+    assert store.claim_unit("shoes", 1, "host-a:1") is UnitClaim.CLAIMED
+
+    store.complete_page("shoes", 1, ["p1"], has_next=False)
+
+    assert store.claim_unit("shoes", 1, "host-b:1") is UnitClaim.FINISHED
+    assert store.claim_unit("shoes", 2, "host-b:1") is UnitClaim.FINISHED
+
+
+def test_restarted_host_takes_over_its_stale_leases(store):
+    store.claim_unit("shoes", 1, "host-a:1")
+    store.claim_unit("shoes", 2, "host-a:2")
+    store.claim_unit("shoes", 3, "host-ab:1")
+
+    assert store.release_leases("host-a:") == 2
+    assert store.claim_unit("shoes", 2, "host-a:1") is UnitClaim.CLAIMED
+    assert store.claim_unit("shoes", 3, "host-a:1") is UnitClaim.LEASED
+
+
+def test_is_finished_requires_every_unit_recorded(store):
+    store.complete_page("shoes", 1, ["p1"], has_next=True)
+    assert not store.is_finished(["shoes"])
+    assert store.is_finished([("shoes", 1)])
+    assert not store.is_finished([("shoes", 1), ("shoes", 2)])
+
+    store.finish_category("shoes", 2)
+
+    assert store.is_finished(["shoes"])
+    assert store.is_finished([("shoes", 1), ("shoes", 2), ("shoes", 3)])
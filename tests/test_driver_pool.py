@@ -0,0 +1,66 @@
+import queue
+
+import pytest
+
+from driver_pool import BrowserSession, DriverPool
+
+
+class FakeDriver:
+    def execute_script(self, script):
+        return 1
+
+    def execute_cdp_cmd(self, cmd, args):
+        return {"metrics": []}
+
+    def quit(self):
+        pass
+
+
+class FlakyPool(DriverPool):
+    """
+    A pool whose sessions are fakes and whose first ``failures`` starts fail.
+    """
+
+    def __init__(self, size: int, failures: int) -> None:
+        super().__init__(size, max_pages=0, max_heap_growth_mb=0)
+        self.failures = failures
+
+    def new_session(self, slot: int) -> BrowserSession:
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("chromium did not start")
+        return BrowserSession(slot, FakeDriver())
+
+
+def test_acquire_refills_slots_that_failed_to_warm():
+    pool = FlakyPool(size=2, failures=2)
+    pool.warm()
+    assert pool.idle.empty()
+    assert sorted(pool.free_slots) == [0, 1]
+
+    first = pool.acquire(timeout=0.1)
+    second = pool.acquire(timeout=0.1)
+
+    assert {first.slot, second.slot} == {0, 1}
+    assert pool.free_slots == []
+
+
+def test_acquire_raises_when_a_refill_fails():
+    pool = FlakyPool(size=1, failures=2)
+    pool.warm()
+
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0.1)
+    assert pool.free_slots == [0]
+    assert pool.acquire(timeout=0.1).slot == 0
+
+
+def test_acquire_times_out_when_every_slot_is_checked_out():
+    pool = FlakyPool(size=1, failures=0)
+    pool.warm()
+    session = pool.acquire(timeout=0.1)
+
+    with pytest.raises(queue.Empty):
+        pool.acquire(timeout=0.1)
+    pool.release(session, pages=1)
+    assert pool.acquire(timeout=0.1) is session
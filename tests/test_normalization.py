@@ -0,0 +1,101 @@
+import pytest
+
+from models import validate_records
+from normalization import (
+    normalize_records,
+    parse_currency,
+    parse_price_cents,
+    parse_rating,
+    parse_review_count,
+    summarize_records,
+)
+
+
+@pytest.fixture
+def product():
+    return {
+        "Product_id": "B000000001",
+        "Product Name": "Widget",
+        "Product Price": "$1,019.99",
+        "Product_rating": "4.5 out of 5 stars",
+        "Image_URL": "https://example.com/widget.jpg",
+        "product url": "https://www.amazon.com/dp/B000000001",
+        "ASIN": "B000000001",
+        "Review_count": "(12.3K)",
+    }
+
+
+@pytest.mark.parametrize(
+    "displayed, cents",
+    [
+        ("$1,019.99", 101999),
+        ("$5.5", 550),
+        ("$7", 700),
+        ("Price not found!", None),
+        (None, None),
+    ],
+)
+def test_parse_price_cents(displayed, cents):
+    assert parse_price_cents(displayed) == cents
+
+
+@pytest.mark.parametrize(
+    "displayed, currency",
+    [("$19.99", "USD"), ("£3.50", "GBP"), ("EUR 12.00", "EUR"), ("19.99", None)],
+)
+def test_parse_currency(displayed, currency):
+    assert parse_currency(displayed) == currency
+
+
+def test_parse_rating():
+    assert parse_rating("4.5 out of 5 stars") == 4.5
+    assert parse_rating("3 out of 5 stars") == 3.0
+    assert parse_rating("Product rating not found") is None
+    assert parse_rating(None) is None
+
+
+@pytest.mark.parametrize(
+    "displayed, count",
+    [("1,234", 1234), ("(12.3K)", 12300), ("2M", 2_000_000), ("", None), (None, None)],
+)
+def test_parse_review_count(displayed, count):
+    assert parse_review_count(displayed) == count
+
+
+def test_normalize_and_summarize_records(product):
+    placeholder = dict(product, **{"Product Price": "Price not found!"})
+    normalize_records([product, placeholder])
+
+    assert product["Price Cents"] == 101999
+    assert product["Currency"] == "USD"
+    assert product["Rating"] == 4.5
+    assert product["Review Count"] == 12300
+    assert placeholder["Price Cents"] is None
+
+    summary = summarize_records([product, placeholder])
+    assert summary["products"] == 2
+    assert summary["priced"] == 1
+    assert summary["mean_price_cents"] == 101999
+    assert summary["total_reviews"] == 24600
+
+
+def test_validate_records_maps_aliases_to_sink_columns(product):
+    valid, errors = validate_records(normalize_records([product]))
+
+    assert errors == []
+    assert valid[0]["product id"] == "B000000001"
+    assert valid[0]["product price"] == "$1,019.99"
+    assert valid[0]["price cents"] == 101999
+    assert valid[0]["review count"] == 12300
+    assert "Product_id" not in valid[0]
+
+
+def test_validate_records_drops_only_the_invalid_product(product):
+    broken = dict(product)
+    del broken["Product Name"]
+
+    valid, errors = validate_records([broken, product])
+
+    assert [record["product id"] for record in valid] == ["B000000001"]
+    assert len(errors) == 1
+    assert errors[0].startswith("record 0: Product Name")
@@ -0,0 +1,45 @@
+import pytest
+
+from page_classifier import AdaptiveThrottle, PageKind, classify_page
+
+RESULTS = '<div role="listitem"><div data-component-type="s-search-result"></div></div>'
+CAPTCHA = '<form action="/errors/validateCaptcha"></form>'
+DOG_PAGE = "<h1>Sorry! Something went wrong!</h1><img alt='Dogs of Amazon'>"
+
+
+@pytest.mark.parametrize(
+    "page_source, kind",
+    [
+        (RESULTS, PageKind.RESULTS),
+        (CAPTCHA, PageKind.CAPTCHA),
+        (DOG_PAGE, PageKind.DOG_PAGE),
+        ("<html><body>No results for widgets.</body></html>", PageKind.EMPTY),
+        # A block page that still carries result markup is a block.
+        (CAPTCHA + RESULTS, PageKind.CAPTCHA),
+    ],
+)
+def test_classify_page(page_source, kind):
+    assert classify_page(page_source) is kind
+
+
+def test_only_captcha_and_dog_pages_are_blocks():
+    assert PageKind.CAPTCHA.is_block
+    assert PageKind.DOG_PAGE.is_block
+    assert not PageKind.RESULTS.is_block
+    assert not PageKind.EMPTY.is_block
+
+
+def test_throttle_backs_off_on_blocks_and_decays_on_clean_pages():
+    throttle = AdaptiveThrottle(min_step=1.0, max_delay=3.0, decay=0.5)
+
+    throttle.record(PageKind.CAPTCHA)
+    assert throttle.delay == 1.0
+    throttle.record(PageKind.DOG_PAGE)
+    assert throttle.delay == 2.0
+    throttle.record(PageKind.CAPTCHA)
+    assert throttle.delay == 3.0
+
+    throttle.record(PageKind.RESULTS)
+    throttle.record(PageKind.EMPTY)
+    assert throttle.delay == 0.75
+    assert 0 < throttle.block_rate < 1
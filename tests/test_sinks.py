@@ -0,0 +1,62 @@
+import pytest
+
+from sinks import BaseSink, FanOutSink, NullSink, ParquetSink, close_sink
+
+
+def record(product_id: str, **fields) -> dict:
+    return {
+        "product id": product_id,
+        "product name": f"Product {product_id}",
+        "product price": "$1.00",
+        "product rating": "4.5",
+        "image url": "",
+        **fields,
+    }
+
+
+class BrokenSink(NullSink):
+    name = "broken"
+
+    def flush(self) -> None:
+        raise OSError("disk full")
+
+
+class RecordingSink(NullSink):
+    flushed = False
+
+    def flush(self) -> None:
+        self.flushed = True
+
+
+def test_base_sink_requires_add():
+    with pytest.raises(TypeError):
+        BaseSink()
+
+
+def test_fan_out_flush_survives_a_failing_sink():
+    healthy = RecordingSink()
+    fan_out = FanOutSink([BrokenSink(), healthy])
+
+    fan_out.flush()
+
+    assert healthy.flushed
+
+
+def test_close_sink_reports_failed_writes():
+    assert close_sink(NullSink())
+    assert not close_sink(FanOutSink([BrokenSink(), RecordingSink()]))
+
+
+def test_parquet_columns_follow_the_record_schema(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "products.parquet"
+    sink = ParquetSink(path=str(path), row_group_size=1)
+    sink.add(record("1"))
+    sink.add(record("2", rating=4.5, features=["Waterproof"]))
+    sink.close()
+
+    table = pq.read_table(path)
+    assert table.num_rows == 2
+    assert "review count" in table.column_names
+    assert table.schema.field("features").type.value_type == "string"
+    assert table.column("rating").to_pylist() == [None, 4.5]
@@ -0,0 +1,161 @@
+import time
+
+import pytest
+
+import work_queue
+from sinks import NullSink
+from work_queue import QueueWorker, RedisWorkQueue, SqliteWorkQueue, WorkQueue
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def make_queue(request, tmp_path, monkeypatch):
+    if request.param == "redis":
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        if work_queue.redis is None:
+            pytest.skip("redis is not installed")
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(
+            work_queue.redis.Redis,
+            "from_url",
+            lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs),
+        )
+    queues = []
+
+    def make(**kwargs) -> WorkQueue:
+        if request.param == "redis":
+            queue = RedisWorkQueue("redis://localhost/0", **kwargs)
+        else:
+            queue = SqliteWorkQueue(str(tmp_path / "work_queue.sqlite3"), **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()
+
+
+def test_lease_hands_out_each_unit_once(make_queue):
+    queue = make_queue()
+    assert queue.put([("shoes", 1), ("shoes", 2)]) == 2
+    assert queue.put([("shoes", 1)]) == 0
+
+    first = queue.lease("worker-1")
+    second = queue.lease("worker-2")
+
+    assert (first.category, first.page, first.attempts) == ("shoes", 1, 1)
+    assert (second.category, second.page) == ("shoes", 2)
+    assert queue.lease("worker-3") is None
+    assert queue.counts() == {"leased": 2}
+
+
+def test_heartbeat_extends_only_the_holders_lease(make_queue):
+    queue = make_queue(lease_seconds=0.2)
+    queue.put([("shoes", 1)])
+    unit = queue.lease("worker-1")
+
+    assert not queue.heartbeat(unit, "worker-2")
+    time.sleep(0.15)
+    assert queue.heartbeat(unit, "worker-1")
+    time.sleep(0.1)
+
+    assert queue.lease("worker-2") is None
+
+
+def test_expired_lease_is_reclaimed_for_another_worker(make_queue):
+    queue = make_queue(lease_seconds=0.05)
+    queue.put([("shoes", 1)])
+    stale = queue.lease("worker-1")
+    time.sleep(0.1)
+
+    queue.reclaim()
+    assert queue.counts() == {"pending": 1}
+    unit = queue.lease("worker-2")
+
+    assert unit.attempts == 2
+    assert not queue.heartbeat(stale, "worker-1")
+    assert not queue.complete(stale, "worker-1", {"products": 1})
+    assert queue.complete(unit, "worker-2", {"products": 3})
+    assert queue.results() == [("shoes", 1, "done", {"products": 3})]
+
+
+def test_unit_fails_after_max_attempts(make_queue):
+    queue = make_queue(max_attempts=2)
+    queue.put([("shoes", 1)])
+
+    queue.fail(queue.lease("worker-1"), "worker-1", "timeout")
+    assert queue.counts() == {"pending": 1}
+    queue.fail(queue.lease("worker-1"), "worker-1", "timeout again")
+
+    assert queue.counts() == {"failed": 1}
+    assert queue.lease("worker-1") is None
+    assert queue.results() == [("shoes", 1, "failed", {"error": "timeout again"})]
+
+
+def test_queue_drains_once_every_unit_is_finished(make_queue):
+    queue = make_queue()
+    queue.put([("shoes", 1), ("shoes", 2)])
+    first = queue.lease("worker-1")
+    assert not queue.is_drained()
+
+    queue.complete(first, "worker-1", {"products": 1})
+    second = queue.lease("worker-1")
+    assert not queue.is_drained()
+    queue.end_category("shoes", 2)
+    assert queue.is_past_end(second)
+    queue.complete(second, "worker-1", {"products": 0, "skipped": True})
+
+    assert queue.is_drained()
+    assert queue.counts() == {"done": 2}
+
+
+def test_end_page_only_ever_lowers(make_queue):
+    queue = make_queue()
+    queue.end_category("shoes", 5)
+    queue.end_category("shoes", 3)
+    queue.end_category("shoes", 7)
+
+    assert queue.get_end_page("shoes") == 3
+    assert queue.get_end_page("hats") is None
+
+
+def test_queues_share_one_backend(make_queue):
+    first = make_queue()
+    second = make_queue()
+
+    assert first.put([("shoes", 1), ("shoes", 2)]) == 2
+    assert second.put([("shoes", 2), ("shoes", 3)]) == 1
+    assert second.put([]) == 0
+
+    leased = {first.lease("worker-1").page, second.lease("worker-2").page}
+    assert leased == {1, 2}
+    assert first.counts() == {"leased": 2, "pending": 1}
+
+
+class CrashingCrawler:
+    def __init__(self, **kwargs):
+        pass
+
+    def start_session(self):
+        raise RuntimeError("Chromium failed to launch")
+
+    def close(self):
+        pass
+
+
+def test_worker_that_dies_fails_the_run(make_queue, monkeypatch):
+    monkeypatch.setattr(work_queue, "AmazonCrawler", CrashingCrawler)
+    queue = make_queue()
+    queue.put([("shoes", 1)])
+    queue.mark_ready()
+
+    worker = QueueWorker(queue, workers=1, sink=NullSink())
+
+    assert not worker.run()
+    assert worker.dead_workers == 1
+    assert queue.counts() == {"pending": 1}
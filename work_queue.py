@@ -0,0 +1,845 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from complete_carwler import AmazonCrawler
+from config import Config
+from constants import AmazonRequestConstants
+from driver_pool import DriverPool
+from log_handler import logger
+from search_urls import build_work_units
+from sinks import BaseSink, build_sink, close_sink
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import redis
+except ImportError:  # Only needed for a redis:// work queue.
+    redis = None
+
+# Page 0 stands for a whole category, crawled by following "Next".
+WHOLE_CATEGORY = 0
+
+
+class LeasedUnit:
+    """
+    A work unit a worker holds a lease on.
+    """
+
+    def __init__(self, unit_id: str, category: str, page: int, attempts: int) -> None:
+        self.unit_id = unit_id
+        self.category = category
+        self.page = page
+        self.attempts = attempts
+
+    def __repr__(self) -> str:
+        return f"({self.category!r}, page {self.page}, attempt {self.attempts})"
+
+
+class WorkQueue(ABC):
+    """
+    A queue of (category, page) units shared by workers in any number of
+    processes or containers.
+
+    Workers lease a unit, heartbeat while crawling it and then complete or fail
+    it. A lease that is not heartbeated within ``lease_seconds`` is reclaimed,
+    so the units of a dead worker go back to the queue. Units that failed or
+    lost their lease ``max_attempts`` times are marked failed.
+    """
+
+    name = "base"
+
+    def __init__(
+        self,
+        lease_seconds: float = Config.WORK_LEASE_SECONDS,
+        max_attempts: int = Config.WORK_MAX_ATTEMPTS,
+    ) -> None:
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    @abstractmethod
+    def put(self, units: Iterable[Tuple[str, int]]) -> int:
+        """
+        Enqueues units; units already in the queue are left as they are.
+
+        Args:
+            units (Iterable[Tuple[str, int]]): (category, page) pairs.
+
+        Returns:
+            int: The number of units added.
+        """
+
+    @abstractmethod
+    def lease(self, worker: str) -> Optional[LeasedUnit]:
+        """
+        Reclaims expired leases, then leases the oldest pending unit.
+
+        Args:
+            worker (str): The identifier of the leasing worker.
+
+        Returns:
+            Optional[LeasedUnit]: The unit, or None if nothing is pending.
+        """
+
+    @abstractmethod
+    def reclaim(self) -> None:
+        """
+        Returns the units of expired leases to the queue.
+        """
+
+    @abstractmethod
+    def heartbeat(self, unit: LeasedUnit, worker: str) -> bool:
+        """
+        Extends a lease by ``lease_seconds``.
+
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+
+    @abstractmethod
+    def complete(self, unit: LeasedUnit, worker: str, result: dict) -> bool:
+        """
+        Marks a leased unit done and stores its result.
+
+        Returns:
+            bool: False if the lease was lost and the result was dropped.
+        """
+
+    @abstractmethod
+    def fail(self, unit: LeasedUnit, worker: str, error: str) -> None:
+        """
+        Gives a unit back for another attempt, or marks it failed after the last.
+        """
+
+    @abstractmethod
+    def end_category(self, category: str, end_page: int) -> None:
+        """
+        Records the first page past the end of a category.
+        """
+
+    @abstractmethod
+    def get_end_page(self, category: str) -> Optional[int]:
+        """
+        Returns the first page past the end of a category, if it is known yet.
+        """
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """
+        Returns the number of units per status.
+        """
+
+    @abstractmethod
+    def results(self) -> List[Tuple[str, int, str, dict]]:
+        """
+        Returns (category, page, status, result or error) for every finished unit.
+        """
+
+    @abstractmethod
+    def mark_ready(self, ready: bool = True) -> None:
+        """
+        Tells the workers every initial unit is enqueued, or, with False, that
+        the run is over and they should wait for the next one.
+        """
+
+    @abstractmethod
+    def is_ready(self) -> bool:
+        """
+        Checks whether the coordinator has seeded the current run.
+        """
+
+    @abstractmethod
+    def reset(self) -> None:
+        """
+        Drops every unit and result, so a new run can be seeded.
+        """
+
+    def close(self) -> None:
+        """
+        Releases the connection to the queue's storage.
+        """
+
+    def is_past_end(self, unit: LeasedUnit) -> bool:
+        end_page = self.get_end_page(unit.category)
+        return end_page is not None and unit.page >= end_page
+
+    def is_drained(self) -> bool:
+        counts = self.counts()
+        return not counts.get("pending") and not counts.get("leased")
+
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    A work queue in a SQLite file, shared through a volume by the containers of
+    one host. SQLite locking is not reliable over network filesystems, so use
+    the Redis queue to spread workers over several hosts.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = Config.WORK_QUEUE_URL, **kwargs) -> None:
+        super().__init__(**kwargs)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS work_units (
+                unit_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT,
+                UNIQUE (category, page)
+            );
+            CREATE INDEX IF NOT EXISTS work_units_status
+                ON work_units (status, unit_id);
+            CREATE TABLE IF NOT EXISTS work_category_ends (
+                category TEXT PRIMARY KEY,
+                end_page INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS work_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            """
+        )
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs the block in one write transaction, holding the lock.
+        """
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def put(self, units: Iterable[Tuple[str, int]]) -> int:
+        with self.transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO work_units (category, page) VALUES (?, ?)",
+                list(units),
+            )
+            return connection.total_changes - before
+
+    def reclaim_expired(self, connection: sqlite3.Connection) -> None:
+        """
+        Returns expired leases to the queue. Call inside a transaction.
+        """
+        connection.execute(
+            "UPDATE work_units SET worker = NULL, lease_until = NULL, "
+            "error = 'lease expired', status = CASE WHEN attempts >= ? "
+            "THEN 'failed' ELSE 'pending' END "
+            "WHERE status = 'leased' AND lease_until < ?",
+            (self.max_attempts, time.time()),
+        )
+
+    def reclaim(self) -> None:
+        with self.transaction() as connection:
+            self.reclaim_expired(connection)
+
+    def lease(self, worker: str) -> Optional[LeasedUnit]:
+        with self.transaction() as connection:
+            self.reclaim_expired(connection)
+            row = connection.execute(
+                "SELECT unit_id, category, page, attempts FROM work_units "
+                "WHERE status = 'pending' ORDER BY unit_id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE work_units SET status = 'leased', worker = ?, "
+                "lease_until = ?, attempts = attempts + 1 WHERE unit_id = ?",
+                (worker, time.time() + self.lease_seconds, row[0]),
+            )
+        return LeasedUnit(str(row[0]), row[1], row[2], row[3] + 1)
+
+    def heartbeat(self, unit: LeasedUnit, worker: str) -> bool:
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE work_units SET lease_until = ? "
+                "WHERE unit_id = ? AND worker = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, int(unit.unit_id), worker),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, unit: LeasedUnit, worker: str, result: dict) -> bool:
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                "UPDATE work_units SET status = 'done', lease_until = NULL, "
+                "result = ?, error = NULL "
+                "WHERE unit_id = ? AND worker = ? AND status = 'leased'",
+                (json.dumps(result), int(unit.unit_id), worker),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, unit: LeasedUnit, worker: str, error: str) -> None:
+        with self.transaction() as connection:
+            connection.execute(
+                "UPDATE work_units SET worker = NULL, lease_until = NULL, error = ?, "
+                "status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END "
+                "WHERE unit_id = ? AND worker = ? AND status = 'leased'",
+                (error, self.max_attempts, int(unit.unit_id), worker),
+            )
+
+    def end_category(self, category: str, end_page: int) -> None:
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO work_category_ends VALUES (?, ?) ON CONFLICT(category) "
+                "DO UPDATE SET end_page = MIN(end_page, excluded.end_page)",
+                (category, end_page),
+            )
+
+    def get_end_page(self, category: str) -> Optional[int]:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT end_page FROM work_category_ends WHERE category = ?",
+                (category,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def counts(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(
+                self.connection.execute(
+                    "SELECT status, COUNT(*) FROM work_units GROUP BY status"
+                ).fetchall()
+            )
+
+    def results(self) -> List[Tuple[str, int, str, dict]]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT category, page, status, result, error FROM work_units "
+                "WHERE status IN ('done', 'failed') ORDER BY unit_id"
+            ).fetchall()
+        return [
+            (
+                category,
+                page,
+                status,
+                json.loads(result) if status == "done" else {"error": error},
+            )
+            for category, page, status, result, error in rows
+        ]
+
+    def mark_ready(self, ready: bool = True) -> None:
+        with self.transaction() as connection:
+            if ready:
+                connection.execute(
+                    "INSERT OR REPLACE INTO work_meta VALUES ('ready', ?)",
+                    (str(time.time()),),
+                )
+            else:
+                connection.execute("DELETE FROM work_meta WHERE key = 'ready'")
+
+    def is_ready(self) -> bool:
+        with self.lock:
+            return bool(
+                self.connection.execute(
+                    "SELECT 1 FROM work_meta WHERE key = 'ready'"
+                ).fetchone()
+            )
+
+    def reset(self) -> None:
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM work_units")
+            connection.execute("DELETE FROM work_category_ends")
+            connection.execute("DELETE FROM work_meta")
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+# Returns expired leases to the front of the queue.
+# KEYS: pending, leases, owners, attempts, status
+# ARGV: now
+REDIS_RECLAIM_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, unit_id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], unit_id)
+    redis.call('HDEL', KEYS[3], unit_id)
+    redis.call('HSET', KEYS[5], unit_id, 'pending')
+    redis.call('RPUSH', KEYS[1], unit_id)
+end
+"""
+# Extends a lease if the worker still holds it.
+# KEYS: leases, owners; ARGV: unit_id, worker, lease_until
+REDIS_HEARTBEAT_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], 'XX', ARGV[3], ARGV[1])
+return 1
+"""
+# Ends a lease with a new status and stores the result, if the worker still
+# holds the lease; 'pending' puts the unit back at the end of the queue.
+# KEYS: leases, owners, status, results, pending
+# ARGV: unit_id, worker, status, result
+REDIS_RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+redis.call('HSET', KEYS[4], ARGV[1], ARGV[4])
+if ARGV[3] == 'pending' then
+    redis.call('LPUSH', KEYS[5], ARGV[1])
+end
+return 1
+"""
+# Reclaims expired leases and leases the next pending unit in one atomic step.
+# KEYS: as above; ARGV: now, lease_until, worker, max_attempts
+REDIS_LEASE_SCRIPT = REDIS_RECLAIM_SCRIPT + """
+while true do
+    local unit_id = redis.call('RPOP', KEYS[1])
+    if not unit_id then
+        return false
+    end
+    local attempts = redis.call('HINCRBY', KEYS[4], unit_id, 1)
+    if attempts > tonumber(ARGV[4]) then
+        redis.call('HSET', KEYS[5], unit_id, 'failed')
+    else
+        redis.call('HSET', KEYS[5], unit_id, 'leased')
+        redis.call('HSET', KEYS[3], unit_id, ARGV[3])
+        redis.call('ZADD', KEYS[2], ARGV[2], unit_id)
+        return {unit_id, attempts}
+    end
+end
+"""
+# Adds the units that are new to the queue; returns how many were added.
+# KEYS: status, pending; ARGV: unit_ids
+REDIS_PUT_SCRIPT = """
+local added = 0
+for _, unit_id in ipairs(ARGV) do
+    if redis.call('HSETNX', KEYS[1], unit_id, 'pending') == 1 then
+        redis.call('LPUSH', KEYS[2], unit_id)
+        added = added + 1
+    end
+end
+return added
+"""
+# Lowers a category's end page; a larger end page never replaces a smaller one.
+# KEYS: ends; ARGV: category, end_page
+REDIS_END_CATEGORY_SCRIPT = """
+local end_page = redis.call('HGET', KEYS[1], ARGV[1])
+if not end_page or tonumber(ARGV[2]) < tonumber(end_page) then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+"""
+
+
+class RedisWorkQueue(WorkQueue):
+    """
+    A work queue in Redis, for workers spread over several hosts.
+
+    Unit ids are "category|page"; the pending ids live in a list, the leases in
+    a sorted set scored by expiry, and statuses, owners, attempts and results
+    in hashes.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = Config.WORK_QUEUE_URL, **kwargs) -> None:
+        super().__init__(**kwargs)
+        if redis is None:
+            raise ImportError("A redis:// work queue needs redis: pip install redis")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.keys = {
+            name: f"crawler:work:{name}"
+            for name in (
+                "pending",
+                "leases",
+                "owners",
+                "attempts",
+                "status",
+                "results",
+                "ends",
+                "ready",
+            )
+        }
+        self.script_keys = [
+            self.keys[name]
+            for name in ("pending", "leases", "owners", "attempts", "status")
+        ]
+        self.release_keys = [
+            self.keys[name]
+            for name in ("leases", "owners", "status", "results", "pending")
+        ]
+        self.reclaim_script = self.client.register_script(REDIS_RECLAIM_SCRIPT)
+        self.lease_script = self.client.register_script(REDIS_LEASE_SCRIPT)
+        self.heartbeat_script = self.client.register_script(REDIS_HEARTBEAT_SCRIPT)
+        self.release_script = self.client.register_script(REDIS_RELEASE_SCRIPT)
+        self.put_script = self.client.register_script(REDIS_PUT_SCRIPT)
+        self.end_category_script = self.client.register_script(
+            REDIS_END_CATEGORY_SCRIPT
+        )
+
+    def put(self, units: Iterable[Tuple[str, int]]) -> int:
+        unit_ids = [f"{category}|{page}" for category, page in units]
+        if not unit_ids:
+            return 0
+        return int(
+            self.put_script(
+                keys=[self.keys["status"], self.keys["pending"]], args=unit_ids
+            )
+        )
+
+    def lease(self, worker: str) -> Optional[LeasedUnit]:
+        now = time.time()
+        leased = self.lease_script(
+            keys=self.script_keys,
+            args=[now, now + self.lease_seconds, worker, self.max_attempts],
+        )
+        if not leased:
+            return None
+        unit_id, attempts = leased
+        category, page = unit_id.rsplit("|", 1)
+        return LeasedUnit(unit_id, category, int(page), int(attempts))
+
+    def reclaim(self) -> None:
+        self.reclaim_script(keys=self.script_keys, args=[time.time()])
+
+    def heartbeat(self, unit: LeasedUnit, worker: str) -> bool:
+        return bool(
+            self.heartbeat_script(
+                keys=[self.keys["leases"], self.keys["owners"]],
+                args=[unit.unit_id, worker, time.time() + self.lease_seconds],
+            )
+        )
+
+    def release(
+        self, unit: LeasedUnit, worker: str, status: str, result: dict
+    ) -> bool:
+        """
+        Ends the worker's lease on a unit and stores its result in one atomic
+        step, unless the lease was lost to another worker meanwhile.
+
+        Returns:
+            bool: False if the worker no longer held the lease.
+        """
+        return bool(
+            self.release_script(
+                keys=self.release_keys,
+                args=[unit.unit_id, worker, status, json.dumps(result)],
+            )
+        )
+
+    def complete(self, unit: LeasedUnit, worker: str, result: dict) -> bool:
+        return self.release(unit, worker, "done", result)
+
+    def fail(self, unit: LeasedUnit, worker: str, error: str) -> None:
+        status = "failed" if unit.attempts >= self.max_attempts else "pending"
+        self.release(unit, worker, status, {"error": error})
+
+    def end_category(self, category: str, end_page: int) -> None:
+        self.end_category_script(keys=[self.keys["ends"]], args=[category, end_page])
+
+    def get_end_page(self, category: str) -> Optional[int]:
+        end_page = self.client.hget(self.keys["ends"], category)
+        return int(end_page) if end_page is not None else None
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for status in self.client.hvals(self.keys["status"]):
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def results(self) -> List[Tuple[str, int, str, dict]]:
+        statuses = self.client.hgetall(self.keys["status"])
+        results = self.client.hgetall(self.keys["results"])
+        finished = []
+        for unit_id, status in statuses.items():
+            if status not in ("done", "failed"):
+                continue
+            category, page = unit_id.rsplit("|", 1)
+            finished.append(
+                (category, int(page), status, json.loads(results.get(unit_id, "{}")))
+            )
+        return finished
+
+    def mark_ready(self, ready: bool = True) -> None:
+        if ready:
+            self.client.set(self.keys["ready"], time.time())
+        else:
+            self.client.delete(self.keys["ready"])
+
+    def is_ready(self) -> bool:
+        return bool(self.client.exists(self.keys["ready"]))
+
+    def reset(self) -> None:
+        self.client.delete(*self.keys.values())
+
+    def close(self) -> None:
+        self.client.close()
+
+
+def open_work_queue(url: str = Config.WORK_QUEUE_URL) -> WorkQueue:
+    """
+    Opens the Redis queue for a redis:// URL, the SQLite queue for a path.
+    """
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(url)
+    return SqliteWorkQueue(url)
+
+
+def worker_name(worker_id: int) -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{worker_id}"
+
+
+@contextmanager
+def keep_lease(queue: WorkQueue, unit: LeasedUnit, worker: str) -> Iterator[None]:
+    """
+    Heartbeats a lease on a background thread while the block runs.
+    """
+    stop = threading.Event()
+
+    def beat() -> None:
+        while not stop.wait(Config.WORK_HEARTBEAT_SECONDS):
+            try:
+                if not queue.heartbeat(unit, worker):
+                    logger.warning(f"Lost the lease on {unit} to another worker.")
+                    return
+            except Exception as err:
+                logger.error(f"Error while heartbeating {unit}: {err}")
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{worker}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+class QueueWorker:
+    """
+    Crawls units leased from a shared work queue until the queue is drained.
+
+    Each of the ``workers`` threads owns a crawler and writes through one
+    shared sink. Whole-category units (page 0) are crawled by following
+    "Next"; page units enqueue their next page themselves, so categories
+    without ``MAX_PAGES`` still spread page by page over the workers.
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        workers: int = 1,
+        sink: Optional[BaseSink] = None,
+        driver_pool: Optional[DriverPool] = None,
+    ) -> None:
+        self.queue = queue
+        self.workers = max(1, workers)
+        self.sink = sink or build_sink()
+        self.driver_pool = driver_pool
+        self.lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.dead_workers = 0
+
+    def crawl_unit(self, crawler: AmazonCrawler, unit: LeasedUnit) -> dict:
+        """
+        Crawls one unit and returns its result.
+        """
+        if unit.page == WHOLE_CATEGORY:
+            return {"products": crawler.crawl_category(unit.category)}
+
+        processed = crawler.crawl_page(unit.category, unit.page)
+        if processed is None:
+            self.queue.end_category(unit.category, unit.page)
+            return {"products": 0, "has_next": False}
+        has_next = crawler.next_page_available
+        if not has_next:
+            self.queue.end_category(unit.category, unit.page + 1)
+        elif not Config.MAX_PAGES or unit.page < Config.MAX_PAGES:
+            self.queue.put([(unit.category, unit.page + 1)])
+        return {"products": processed, "has_next": has_next}
+
+    def run_worker(self, worker_id: int) -> None:
+        """
+        Leases and crawls units until nothing is pending or leased any more.
+
+        Args:
+            worker_id (int): The index of the worker thread.
+        """
+        worker = worker_name(worker_id)
+        crawler = AmazonCrawler(sink=self.sink, driver_pool=self.driver_pool)
+        last_category = None
+        try:
+            if not crawler.start_session():
+                logger.error(f"Worker {worker} could not start its session.")
+                with self.lock:
+                    self.dead_workers += 1
+                return
+            while True:
+                unit = self.queue.lease(worker)
+                if unit is None:
+                    if self.queue.is_drained():
+                        return
+                    # Other workers still hold leases that may add or return units.
+                    time.sleep(Config.WORK_POLL_SECONDS)
+                    continue
+                if self.queue.is_past_end(unit):
+                    self.queue.complete(unit, worker, {"products": 0, "skipped": True})
+                    continue
+                logger.info(f"Worker {worker} leased unit {unit}")
+                # Whole categories release their memory themselves.
+                if unit.page != WHOLE_CATEGORY:
+                    if last_category and unit.category != last_category:
+                        crawler.try_release_memory()
+                    last_category = unit.category
+                try:
+                    with keep_lease(self.queue, unit, worker):
+                        result = self.crawl_unit(crawler, unit)
+                except Exception as err:
+                    logger.error(f"Worker {worker} failed on unit {unit}: {err}")
+                    self.queue.fail(unit, worker, str(err))
+                    with self.lock:
+                        self.failed += 1
+                    continue
+                if not self.queue.complete(unit, worker, result):
+                    logger.warning(f"Result of {unit} dropped: its lease expired.")
+                with self.lock:
+                    self.completed += 1
+        finally:
+            crawler.close()
+
+    def run(self) -> bool:
+        """
+        Waits for the coordinator to seed the queue, then crawls it.
+
+        Returns:
+            bool: True if none of this node's units or workers failed and every
+            record was written.
+        """
+        while not self.queue.is_ready():
+            logger.info("Waiting for the coordinator to seed the work queue.")
+            time.sleep(Config.WORK_POLL_SECONDS)
+
+        logger.info(
+            f"Crawling from the {self.queue.name} work queue with "
+            f"{self.workers} workers."
+        )
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="queue-worker"
+            ) as executor:
+                futures = [
+                    executor.submit(self.run_worker, worker_id)
+                    for worker_id in range(1, self.workers + 1)
+                ]
+            for worker_id, future in enumerate(futures, start=1):
+                try:
+                    future.result()
+                except Exception as err:
+                    logger.error(f"Worker {worker_name(worker_id)} died: {err}")
+                    with self.lock:
+                        self.dead_workers += 1
+        finally:
+            written = close_sink(self.sink)
+        logger.info(
+            f"Work queue drained: {self.completed} units completed here, "
+            f"{self.failed} attempts failed, {self.dead_workers} workers died."
+        )
+        return written and not self.failed and not self.dead_workers
+
+
+def seed_units(categories: List[str]) -> List[Tuple[str, int]]:
+    """
+    Builds the initial units: every page up to ``MAX_PAGES``, the first page of
+    each category, or whole categories when pages cannot be loaded by URL.
+    """
+    if Config.NAVIGATION_MODE != "url":
+        return [(category, WHOLE_CATEGORY) for category in categories]
+    if Config.MAX_PAGES:
+        return build_work_units(categories, Config.MAX_PAGES)
+    return [(category, 1) for category in categories]
+
+
+def coordinate(queue: WorkQueue) -> bool:
+    """
+    Seeds a fresh run into the queue and waits until the workers drain it,
+    reclaiming the leases of dead workers on the way.
+
+    Args:
+        queue (WorkQueue): The shared work queue.
+
+    Returns:
+        bool: True if every unit was crawled, False if some failed.
+    """
+    queue.reset()
+    categories = AmazonRequestConstants.categories_to_process.value
+    added = queue.put(seed_units(categories))
+    queue.mark_ready()
+    logger.info(f"Seeded {added} units for {len(categories)} categories.")
+
+    while True:
+        queue.reclaim()
+        counts = queue.counts()
+        logger.info(
+            "Work queue: " + ", ".join(f"{n} {s}" for s, n in sorted(counts.items()))
+        )
+        if not counts.get("pending") and not counts.get("leased"):
+            break
+        time.sleep(Config.WORK_POLL_SECONDS)
+
+    # Workers that start from now on wait for the next run to be seeded.
+    queue.mark_ready(False)
+    results = queue.results()
+    products = sum(result.get("products", 0) for *_, result in results)
+    failed = [
+        (category, page, result.get("error"))
+        for category, page, status, result in results
+        if status == "failed"
+    ]
+    logger.info(
+        f"Distributed crawl finished: {products} products, "
+        f"{len(failed)} units failed."
+    )
+    for category, page, error in failed:
+        logger.error(f"Unit failed: {category} page {page}: {error}")
+    return not failed
+
+
+def main(
+    role: str, workers: int = 1, driver_pool: Optional[DriverPool] = None
+) -> bool:
+    """
+    Runs this process as the coordinator or as a worker node of a shared queue.
+
+    Args:
+        role (str): "coordinator" or "worker".
+        workers (int): Crawler threads on a worker node.
+        driver_pool (Optional[DriverPool]): A pool of warm sessions to borrow from.
+
+    Returns:
+        bool: True if the crawl (or this node's share of it) succeeded.
+    """
+    queue = open_work_queue()
+    try:
+        if role == "coordinator":
+            return coordinate(queue)
+        return QueueWorker(queue, workers=workers, driver_pool=driver_pool).run()
+    finally:
+        queue.close()